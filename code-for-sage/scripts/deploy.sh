@@ -27,10 +27,18 @@ if [ "$ENV" != "production" ]; then
     pytest
 fi
 
+# Compile roles, prompts and skills into the snapshot workers map
+echo "Building data snapshot..."
+python -m src.batch.build_snapshot
+
 # Start the application
 echo "Starting application in $ENV mode..."
 if [ "$ENV" = "production" ]; then
-    gunicorn -w 4 -b 0.0.0.0:$PORT "src.app:create_app()"
+    # Workers share metrics through this directory; stale files from the last run would be counted again
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/sage_metrics}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    gunicorn -c scripts/gunicorn.conf.py -w 4 -b 0.0.0.0:$PORT "src.app:create_app()"
 else
     flask run --host=0.0.0.0 --port=$PORT
 fi
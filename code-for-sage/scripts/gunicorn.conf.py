@@ -0,0 +1,10 @@
+"""
+Gunicorn settings for production (see deploy.sh)
+"""
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live metrics from /metrics; its counters and histograms are kept"""
+    multiprocess.mark_process_dead(worker.pid)
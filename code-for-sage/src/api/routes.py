@@ -2,29 +2,19 @@
 Flask routes for Sage - handles all chat and course/job recommendation interactions
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from src.bot.integrations.linkedin_handler import JobDataError, DataValidationError
-from src.bot.openai_handler import SageAI
-from src.bot.course_recommender import CourseRecommender, LearningPace, JobMatchLevel
-from src.bot.integrations.linkedin_handler import LinkedInDataHandler
+from src.bot.course_recommender import LearningPace, JobMatchLevel
 from src.config import Config
-from src.bot.safety_checker import SafetyChecker
 from src.models.chat_history import ChatHistory
-from flask import current_app
 from src.database import db
-
-# Initialize services
-sage_ai = SageAI()
-safety_checker = SafetyChecker()
+from src.services import get_sage_ai, get_safety_checker, get_performance_monitor
+import json
 
 # Create blueprint for all Sage routes
+# Services come from the lazy registry in src.services and are built on first use
 sage_bp = Blueprint('sage', __name__)
 
-# Initialize services
-sage_ai = SageAI()
-course_recommender = CourseRecommender()
-linkedin_handler = LinkedInDataHandler()
-
 @sage_bp.route('/chat', methods=['POST'])
 async def chat():
     """Main chat endpoint"""
@@ -44,35 +34,36 @@ async def chat():
         ip = request.remote_addr
         user_id = request.headers.get('X-User-ID', f'temp_{ip}')
         
-        # Check rate limits
-        is_allowed, limit_message = safety_checker.check_rate_limit(user_id, ip)
+        # Check rate limits and log the request in one step
+        safety_checker = get_safety_checker()
+        is_allowed, limit_message = safety_checker.check_and_log(user_id, ip, 'chat')
         if not is_allowed:
+            get_performance_monitor().record_rate_limit_rejection('chat')
             return jsonify({
                 'error': limit_message,
                 'code': Config.ERROR_CODES['RATE_LIMIT']
             }), 429
-            
-        # Log the request
-        safety_checker.log_request(user_id, ip, 'chat')
+        
+        moderation = safety_checker.moderate(message)
+        if not moderation.is_safe:
+            return _moderation_error(moderation.issues)
         
         # Get AI response
         current_app.logger.info("Calling OpenAI API...")
         try:
-            response = sage_ai.chat(message)
+            response = await get_sage_ai().chat_async(message, user_id)
             current_app.logger.info("Got response from OpenAI")
         except Exception as e:
             current_app.logger.error(f"OpenAI API error: {str(e)}")
             raise
         
         # Store in chat history
-        chat_history = ChatHistory(
-            user_id=user_id,
-            message=message,
-            response=response,
-            prompt_type='general'
-        )
-        db.session.add(chat_history)
-        db.session.commit()
+        try:
+            _save_chat_history(user_id, message, response)
+        except Exception:
+            db.session.rollback()
+            get_performance_monitor().record_db_error('save_chat_history')
+            raise
         
         return jsonify({
             'response': response
@@ -85,3 +76,90 @@ async def chat():
             'code': Config.ERROR_CODES['API_ERROR'],
             'message': Config.ERROR_MESSAGES[Config.ERROR_CODES['API_ERROR']]
         }), 500
+
+@sage_bp.route('/chat/cache', methods=['GET'])
+def chat_cache_stats():
+    """Response cache counters for tuning size and similarity threshold"""
+    sage_ai = get_sage_ai()
+    stats = sage_ai.response_cache.stats()
+    stats['single_flight'] = sage_ai.single_flight.stats()
+    return jsonify(stats)
+
+@sage_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Streaming chat endpoint - relays completion deltas as Server-Sent Events"""
+    data = request.json or {}
+    message = data.get('message')
+    
+    if not message:
+        return jsonify({
+            'error': 'No message provided'
+        }), 400
+        
+    ip = request.remote_addr
+    user_id = request.headers.get('X-User-ID', f'temp_{ip}')
+    
+    # Check rate limits and log the request in one step
+    safety_checker = get_safety_checker()
+    is_allowed, limit_message = safety_checker.check_and_log(user_id, ip, 'chat_stream')
+    if not is_allowed:
+        get_performance_monitor().record_rate_limit_rejection('chat_stream')
+        return jsonify({
+            'error': limit_message,
+            'code': Config.ERROR_CODES['RATE_LIMIT']
+        }), 429
+    
+    moderation = safety_checker.moderate(message)
+    if not moderation.is_safe:
+        return _moderation_error(moderation.issues)
+    
+    sage_ai = get_sage_ai()
+    
+    def generate():
+        parts = []
+        for delta in sage_ai.stream_chat(message, user_id):
+            parts.append(delta)
+            yield _format_sse({'delta': delta})
+        
+        response = ''.join(parts)
+        try:
+            _save_chat_history(user_id, message, response)
+        except Exception as e:
+            db.session.rollback()
+            get_performance_monitor().record_db_error('save_chat_history')
+            current_app.logger.error(f"Error saving streamed chat: {str(e)}")
+            
+        yield _format_sse({'response': response}, event='done')
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop proxies from buffering the stream
+        }
+    )
+
+def _moderation_error(issues: list):
+    """Reject a message that matched the moderation lexicon"""
+    return jsonify({
+        'error': 'Message contains content Sage cannot respond to',
+        'issues': issues,
+        'code': Config.ERROR_CODES['INVALID_INPUT']
+    }), 400
+
+def _format_sse(payload: dict, event: str = None) -> str:
+    """Encode a payload as a Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(payload)}\n\n"
+
+def _save_chat_history(user_id: str, message: str, response: str):
+    """Persist a completed exchange to the chat history table"""
+    chat_history = ChatHistory(
+        user_id=user_id,
+        message=message,
+        response=response,
+        prompt_type='general'
+    )
+    db.session.add(chat_history)
+    db.session.commit()
@@ -2,7 +2,7 @@
 Main Flask application for Sage career mentor bot
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, g, jsonify, request, render_template
 from src.database import db, init_db
 from flask_cors import CORS
 from src.api.routes import sage_bp
@@ -11,10 +11,8 @@ from src.models.user import User  # Import models from their own files
 from src.models.chat_history import ChatHistory
 import logging
 import os
-from src.bot.integrations.linkedin_handler import LinkedInDataHandler
-from src.bot.performance_monitor import PerformanceMonitor
-from src.bot.market_insights import MarketInsights
-import openai
+import time
+from src.services import get_linkedin_handler, get_performance_monitor, get_market_insights
 
 openai_api_key = os.getenv('OPENAI_API_KEY')
 
@@ -35,11 +33,6 @@ class SageApp:
         # Initialize database
         init_db(self.app)
         
-        # Initialize services
-        self.linkedin_handler = LinkedInDataHandler()
-        self.performance_monitor = PerformanceMonitor()
-        self.market_insights = MarketInsights()
-        
         # Configure CORS
         CORS(self.app, resources={
             r"/*": {  # Allow CORS for all routes
@@ -54,7 +47,44 @@ class SageApp:
         
         # Register additional routes
         self.register_routes()
+        self.register_metrics()
+        
+    # Services are built lazily by the registry and shared with the blueprint
+    @property
+    def linkedin_handler(self):
+        return get_linkedin_handler()
+    
+    @property
+    def performance_monitor(self):
+        return get_performance_monitor()
+    
+    @property
+    def market_insights(self):
+        return get_market_insights()
         
+    def register_metrics(self):
+        """Time every request and expose Prometheus metrics at /metrics"""
+        @self.app.before_request
+        def start_timer():
+            g.request_start = time.perf_counter()
+
+        @self.app.after_request
+        def record_request(response):
+            start = g.pop('request_start', None)
+            if start is not None:
+                # Label by URL rule, not raw path, to keep label cardinality bounded.
+                # Streamed responses are timed to their first byte.
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                get_performance_monitor().record_request(
+                    route, request.method, response.status_code, time.perf_counter() - start
+                )
+            return response
+
+        @self.app.route('/metrics', methods=['GET'])
+        def metrics():
+            body, content_type = get_performance_monitor().export()
+            return Response(body, content_type=content_type)
+
     def register_routes(self):
         @self.app.route('/health', methods=['GET'])
         def health_check():
@@ -128,6 +158,7 @@ class SageApp:
                     return jsonify({"message": "User Profile added successfully"}), 201
                 except Exception as db_error:
                     db.session.rollback()
+                    get_performance_monitor().record_db_error('add_user')
                     logging.error(f"Database error: {str(db_error)}")  # Add logging
                     return jsonify({"error": "Database error occurred"}), 500
                     
@@ -159,6 +190,7 @@ class SageApp:
                     'longTermGoals': user.long_term_career_goals
                 } for user in users])
             except Exception as e:
+                get_performance_monitor().record_db_error('get_users')
                 logging.error(f"Error in get_users: {str(e)}")  # Add logging
                 return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,3 @@
+"""
+Batch Jobs Package
+"""
@@ -0,0 +1,117 @@
+"""
+Offline builder for the related-skill table used by RoleRecommender.
+
+Every role, course and (optionally) job listing is a document of canonical
+skills. Skills are compared by the documents they appear in: TF-IDF vectors
+(or plain co-occurrence counts) with cosine similarity, via scikit-learn.
+Each skill keeps its `--neighbors` most similar skills above
+`--min-similarity`, stored as int16/int32 indexes and float16 scores.
+
+    python -m src.batch.build_skill_similarity --jobs scraped_jobs.jsonl
+"""
+
+from typing import Iterable, Iterator, List, Optional
+import argparse
+import json
+import logging
+import sys
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.bot.course_catalog import CourseCatalog
+from src.bot.skill_dictionary import SkillDictionary, get_skill_dictionary
+from src.config import Config
+from .common import iter_file_records
+
+logger = logging.getLogger('sage.batch.skill_similarity')
+
+
+def role_documents(path: str, skills: SkillDictionary) -> Iterator[List[str]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            roles = json.load(f)
+    except FileNotFoundError:
+        return
+    for details in roles.values():
+        yield skills.canonical_list(details.get('required_skills', []))
+
+
+def course_documents(path: str, skills: SkillDictionary) -> Iterator[List[str]]:
+    for course in CourseCatalog.from_file(path, skills).courses:
+        yield course.skills
+
+
+def job_documents(path: str, skills: SkillDictionary) -> Iterator[List[str]]:
+    for job in iter_file_records(path):
+        listed = job.get('required_skills') or job.get('skills') or []
+        yield skills.canonical_list(listed + skills.find_in_text(job.get('description', '')))
+
+
+def build_similarity_table(
+    documents: Iterable[List[str]],
+    neighbors: int = 10,
+    min_similarity: float = 0.2,
+    method: str = 'tfidf'
+) -> dict:
+    """Arrays for the .npz file: names, neighbors (-1 padded) and float16 scores"""
+    documents = [document for document in documents if len(document) > 1]
+    vectorizer = TfidfVectorizer(
+        analyzer=lambda document: document,
+        use_idf=method == 'tfidf',
+        binary=True,
+        norm=None
+    )
+    document_matrix = vectorizer.fit_transform(documents)
+    names = vectorizer.get_feature_names_out()
+
+    # Skills are the rows now; cosine similarity normalizes them
+    similarities = cosine_similarity(document_matrix.T.tocsr(), dense_output=False).tocsr()
+    similarities.setdiag(0)
+    similarities.eliminate_zeros()
+
+    index_type = np.int16 if len(names) < np.iinfo(np.int16).max else np.int32
+    neighbor_table = np.full((len(names), neighbors), -1, dtype=index_type)
+    score_table = np.zeros((len(names), neighbors), dtype=np.float16)
+    for row in range(len(names)):
+        start, end = similarities.indptr[row], similarities.indptr[row + 1]
+        columns = similarities.indices[start:end]
+        scores = similarities.data[start:end]
+        keep = scores >= min_similarity
+        columns, scores = columns[keep], scores[keep]
+        order = np.lexsort((columns, -scores))[:neighbors]
+        neighbor_table[row, :len(order)] = columns[order]
+        score_table[row, :len(order)] = scores[order]
+
+    return {'names': np.asarray(names, dtype=str), 'neighbors': neighbor_table, 'scores': score_table}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the related-skill similarity table")
+    parser.add_argument('--roles', default='data/roles/tech_roles.json', help="Role taxonomy JSON")
+    parser.add_argument('--catalog', default=Config.COURSE_CATALOG_PATH, help="Course catalog")
+    parser.add_argument('--jobs', action='append', default=[], help="CSV/JSONL job listings (repeatable)")
+    parser.add_argument('--output', default=Config.SKILL_SIMILARITY_PATH)
+    parser.add_argument('--neighbors', type=int, default=10)
+    parser.add_argument('--min-similarity', type=float, default=0.2)
+    parser.add_argument('--method', choices=('tfidf', 'cooccurrence'), default='tfidf')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    skills = get_skill_dictionary()
+    documents = list(role_documents(args.roles, skills))
+    documents.extend(course_documents(args.catalog, skills))
+    for path in args.jobs:
+        documents.extend(job_documents(path, skills))
+
+    table = build_similarity_table(documents, args.neighbors, args.min_similarity, args.method)
+    with open(args.output, 'wb') as f:
+        np.savez_compressed(f, **table)
+    logger.info(f"Wrote {len(table['names'])} skills from {len(documents)} documents to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Compile the role taxonomy, prompt templates and skill dictionary into the
+binary data snapshot that web workers memory-map (see src.bot.data_snapshot).
+The file is replaced atomically, so running workers pick it up on their next
+mtime check without a restart.
+
+    python -m src.batch.build_snapshot
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import logging
+import sys
+
+from src.bot.data_snapshot import write_snapshot
+from src.config import Config
+
+logger = logging.getLogger('sage.batch.snapshot')
+
+
+def _load_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"{path} not found, leaving its section out of the snapshot")
+        return None
+
+
+def build_sections(roles_path: str, prompts_path: str, skills_path: str) -> Dict[str, Dict[str, Any]]:
+    """Snapshot sections for every source file that exists"""
+    sections = {}
+    for name, path in (('roles', roles_path), ('prompts', prompts_path), ('skills', skills_path)):
+        data = _load_json(path)
+        if data is not None:
+            sections[name] = data
+    return sections
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the binary data snapshot")
+    parser.add_argument('--roles', default='data/roles/tech_roles.json', help="Role taxonomy JSON")
+    parser.add_argument('--prompts', default='data/prompts/prompts_v1.0.0.json', help="Prompt templates JSON")
+    parser.add_argument('--skills', default=Config.SKILL_DICTIONARY_PATH, help="Skill dictionary JSON")
+    parser.add_argument('--output', default=Config.DATA_SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    sections = build_sections(args.roles, args.prompts, args.skills)
+    write_snapshot(args.output, sections)
+    logger.info(
+        f"Wrote {args.output}: "
+        + ', '.join(f"{name} ({len(records)})" for name, records in sections.items())
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
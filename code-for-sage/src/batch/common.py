@@ -0,0 +1,119 @@
+"""
+Building blocks shared by the batch jobs: streaming input, JSONL output,
+resumable checkpoints and process-pool fan-out.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import json
+import os
+
+
+def iter_file_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from a CSV file (with a header row) or a JSONL file, one at a time"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batched(records: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Checkpoint:
+    """
+    How many input records are done and how far the JSONL output reached.
+    Saved atomically after every batch; a resumed run skips the finished
+    records and truncates any output written after the last save.
+    """
+
+    def __init__(self, path: str, processed: int = 0, output_offset: int = 0):
+        self.path = path
+        self.processed = processed
+        self.output_offset = output_offset
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        return cls(path, int(data.get('processed', 0)), int(data.get('output_offset', 0)))
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'processed': self.processed, 'output_offset': self.output_offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+class JsonlSink:
+    """Append-only JSONL writer that starts at a checkpointed byte offset"""
+
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'wb')
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    @property
+    def offset(self) -> int:
+        return self._file.tell()
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        """Write and fsync one batch, so the checkpoint never runs ahead of the file"""
+        for record in records:
+            self._file.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def fan_out(
+    records: Iterable,
+    worker: Callable[[Any], Any],
+    workers: int,
+    batch_size: int,
+    initializer: Optional[Callable] = None,
+    initargs: Tuple = ()
+) -> Iterator[Tuple[List, List]]:
+    """
+    Yield (batch, results) in input order. With more than one worker the
+    records go to a process pool, and the next batch is already running
+    while the previous one is written out.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for batch in batched(records, batch_size):
+            yield batch, [worker(record) for record in batch]
+        return
+
+    chunksize = max(1, batch_size // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        in_flight = deque()
+        for batch in batched(records, batch_size):
+            in_flight.append((batch, pool.map(worker, batch, chunksize=chunksize)))
+            if len(in_flight) > 1:
+                done, results = in_flight.popleft()
+                yield done, list(results)
+        while in_flight:
+            done, results = in_flight.popleft()
+            yield done, list(results)
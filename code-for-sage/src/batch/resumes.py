@@ -0,0 +1,272 @@
+"""
+Bulk resume analysis for career-center uploads.
+
+Streams resumes from a directory of text files or a CSV/JSONL file, runs
+ResumeAnalyzer.analyze_resume over them in a process pool and appends each
+ResumeAnalysis to a JSONL file as batches finish. Progress is checkpointed
+after every batch.
+
+Results are cached by a hash of the normalized resume text, the target role,
+the analyzer's lexicons, the role taxonomy and the current year, so re-uploaded and duplicate resumes are never
+analyzed twice, within a run or across runs.
+
+    python -m src.batch.resumes --input uploads/ --output analyses.jsonl
+    python -m src.batch.resumes --input resumes.jsonl --output analyses.jsonl --target-role "Data Analyst"
+"""
+
+from dataclasses import asdict
+from datetime import date
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import unicodedata
+
+from src.config import Config
+from .common import Checkpoint, JsonlSink, fan_out, iter_file_records
+
+logger = logging.getLogger('sage.batch.resumes')
+
+RESUME_EXTENSIONS = ('.txt', '.md')
+
+# Bump when analyze_resume changes how it reads a resume, to retire cached analyses
+ANALYSIS_VERSION = 1
+
+# Per-process analyzer, built once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def iter_resume_files(directory: str) -> Iterator[Dict[str, Any]]:
+    """Text resumes under `directory`, in a stable (sorted path) order"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                yield {'id': os.path.relpath(path, directory), 'text': f.read()}
+
+
+def iter_resumes(path: str) -> Iterator[Dict[str, Any]]:
+    """Resumes as {'id', 'text', 'target_role'} from a directory or a CSV/JSONL file"""
+    if os.path.isdir(path):
+        yield from iter_resume_files(path)
+        return
+    for position, record in enumerate(iter_file_records(path)):
+        yield {
+            'id': record.get('id', record.get('resume_id', position)),
+            'text': record.get('text') or record.get('resume_text') or record.get('resume') or '',
+            'target_role': record.get('target_role')
+        }
+
+
+def normalize_resume_text(text: str) -> str:
+    """Unicode NFC with whitespace collapsed; case is kept, since "R" and "r" analyze differently"""
+    return " ".join(unicodedata.normalize('NFC', text).split())
+
+
+def analyzer_fingerprint(analyzer) -> str:
+    """
+    Changes whenever the skill dictionary, the resume lexicon, the role
+    taxonomy (behind skill_gaps), ANALYSIS_VERSION or the year (ranges
+    such as "2019 - Present" count up to it) does, retiring old cache entries
+    """
+    skills = analyzer.skills
+    lexicon = {
+        'version': ANALYSIS_VERSION,
+        'year': date.today().year,
+        'skills': [skills.names[:skills.known_count], {str(key): value for key, value in skills.aliases().items()}],
+        'action_verbs': analyzer.action_verbs,
+        'industry_keywords': analyzer.industry_keywords,
+        'roles': dict(analyzer.role_recommender.roles_data)
+    }
+    return hashlib.sha256(json.dumps(lexicon, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def resume_key(text: str, target_role: Optional[str], fingerprint: str) -> str:
+    """Cache key: what analyze_resume's result depends on"""
+    role = " ".join((target_role or '').lower().split())
+    content = f"{fingerprint}\0{role}\0{normalize_resume_text(text)}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Analyses by content hash, in SQLite so they outlive the run"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS resume_analyses (key TEXT PRIMARY KEY, analysis TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute("SELECT analysis FROM resume_analyses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, analyses: Dict[str, Dict[str, Any]]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO resume_analyses (key, analysis) VALUES (?, ?)",
+                [(key, json.dumps(analysis)) for key, analysis in analyses.items()]
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+def _init_worker(lexicon_path: Optional[str]):
+    # Imported here so each worker process builds the dictionary and automaton once
+    from src.bot.resume_analyzer import ResumeAnalyzer
+
+    _worker.update(analyzer=ResumeAnalyzer(lexicon_path=lexicon_path), loop=asyncio.new_event_loop())
+
+
+def analyze_document(document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Analysis of one resume. Cached results come back as they are, and
+    repeats of a resume still in flight return None (filled in by `run`).
+    """
+    if 'analysis' in document:
+        return {'id': document['id'], 'success': True, 'cached': True, 'analysis': document['analysis']}
+    if document.get('duplicate'):
+        return None
+    if not document['text'].strip():
+        return {'id': document['id'], 'success': False, 'error': "Empty resume"}
+    try:
+        analysis = _worker['loop'].run_until_complete(
+            _worker['analyzer'].analyze_resume(document['text'], document.get('target_role'))
+        )
+    except Exception as e:
+        return {'id': document['id'], 'success': False, 'error': str(e)}
+    return {'id': document['id'], 'success': True, 'cached': False, 'analysis': asdict(analysis)}
+
+
+def with_cache_keys(
+    documents: Iterable[Dict[str, Any]],
+    cache: Optional[ResultCache],
+    fingerprint: str,
+    default_role: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Key every document and attach cached analyses, so only unseen resumes reach the pool"""
+    seen: Set[str] = set()
+    for document in documents:
+        document['target_role'] = document.get('target_role') or default_role
+        document['key'] = key = resume_key(document['text'], document['target_role'], fingerprint)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            document['analysis'] = cached
+        elif key in seen:
+            document['duplicate'] = True
+        else:
+            seen.add(key)
+        # The pool only needs the text of resumes it has to analyze
+        if 'analysis' in document or document.get('duplicate'):
+            document['text'] = ''
+        yield document
+
+
+def run(
+    documents: Iterator[Dict[str, Any]],
+    sink: JsonlSink,
+    checkpoint: Checkpoint,
+    cache: Optional[ResultCache],
+    workers: int,
+    batch_size: int,
+    lexicon_path: Optional[str] = None
+) -> Dict[str, int]:
+    """Analyze keyed `documents` (already positioned after the checkpoint) into `sink`"""
+    totals = {'processed': 0, 'failed': 0, 'cached': 0}
+    analyses: Dict[str, Dict[str, Any]] = {}
+    for batch, results in fan_out(documents, analyze_document, workers, batch_size, _init_worker, (lexicon_path,)):
+        fresh: Dict[str, Dict[str, Any]] = {}
+        records = []
+        for document, result in zip(batch, results):
+            key = document['key']
+            if result is None:
+                # Same resume as one earlier in this run
+                analysis = fresh.get(key) or analyses.get(key) or (cache.get(key) if cache is not None else None)
+                result = (
+                    {'id': document['id'], 'success': True, 'cached': True, 'analysis': analysis}
+                    if analysis is not None else
+                    {'id': document['id'], 'success': False, 'error': "Duplicate of a failed resume"}
+                )
+            elif result['success'] and not result['cached']:
+                fresh[key] = result['analysis']
+            records.append(dict(result, content_hash=key))
+        # Without a cache, repeats later in the run are served from memory
+        if cache is not None:
+            cache.put_many(fresh)
+        else:
+            analyses.update(fresh)
+
+        sink.write(records)
+        checkpoint.processed += len(batch)
+        checkpoint.output_offset = sink.offset
+        checkpoint.save()
+        totals['processed'] += len(batch)
+        totals['failed'] += sum(1 for record in records if not record['success'])
+        totals['cached'] += sum(1 for record in records if record.get('cached'))
+        logger.info(f"{checkpoint.processed} resumes done ({totals['cached']} from cache this run)")
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a batch of resumes")
+    parser.add_argument('--input', required=True, help="Directory of .txt/.md resumes, or a CSV/JSONL file")
+    parser.add_argument('--output', required=True, help="JSONL file to write analyses to")
+    parser.add_argument('--target-role', help="Target role for resumes that do not name one")
+    parser.add_argument('--cache', default=Config.RESUME_CACHE_PATH, help="SQLite result cache")
+    parser.add_argument('--no-cache', action='store_true', help="Neither read nor write the result cache")
+    parser.add_argument('--lexicon', help="Resume lexicon (default: RESUME_LEXICON_PATH)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: next to the output)")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint and start over")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--limit', type=int, help="Stop after this many resumes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    checkpoint_path = args.checkpoint or f"{args.output}.resumes.checkpoint"
+    checkpoint = Checkpoint(checkpoint_path) if args.restart else Checkpoint.load(checkpoint_path)
+    if checkpoint.processed:
+        logger.info(f"Resuming after {checkpoint.processed} resumes")
+
+    # The parent only needs the lexicons' and roles' fingerprint; workers build their own analyzers
+    from src.bot.resume_analyzer import ResumeAnalyzer
+    fingerprint = analyzer_fingerprint(ResumeAnalyzer(lexicon_path=args.lexicon))
+
+    documents = islice(iter_resumes(args.input), checkpoint.processed, None)
+    if args.limit is not None:
+        documents = islice(documents, args.limit)
+
+    cache = None if args.no_cache else ResultCache(args.cache)
+    sink = JsonlSink(args.output, checkpoint.output_offset)
+    try:
+        totals = run(
+            with_cache_keys(documents, cache, fingerprint, args.target_role),
+            sink, checkpoint, cache, args.workers, args.batch_size, args.lexicon
+        )
+    finally:
+        sink.close()
+        if cache is not None:
+            cache.close()
+    logger.info(
+        f"Finished: {totals['processed']} resumes, {totals['cached']} from cache, {totals['failed']} failed"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Batch career roadmaps for whole cohorts.
+
+Streams users from the `users` table or a CSV/JSONL file, builds each
+user's career roadmap and role recommendations in a process pool, and
+writes the results as they finish, either to JSONL or to the
+`recommendations` table. Progress is checkpointed after every batch, so an
+interrupted run picks up where it stopped.
+
+    python -m src.batch.roadmaps --input cohort.csv --output roadmaps.jsonl
+    python -m src.batch.roadmaps --from-db instance/database.db --to-db instance/database.db
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+from .common import Checkpoint, JsonlSink, fan_out, iter_file_records
+
+logger = logging.getLogger('sage.batch.roadmaps')
+
+DEFAULT_HOURS_PER_WEEK = 10.0
+
+# Per-process recommenders, built once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def iter_db_users(database: str, offset: int = 0, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of the users table in id order, starting after the first `offset`.
+    Read a page at a time, so no read lock is held while results are written
+    back to the same database.
+    """
+    connection = sqlite3.connect(database)
+    connection.row_factory = sqlite3.Row
+    try:
+        while True:
+            rows = connection.execute(
+                "SELECT * FROM users ORDER BY id LIMIT ? OFFSET ?", (page_size, offset)
+            ).fetchall()
+            if not rows:
+                return
+            offset += len(rows)
+            for row in rows:
+                yield dict(row)
+    finally:
+        connection.close()
+
+
+def _split(value: Any) -> List[str]:
+    """Lists pass through; comma-separated text (as stored on User) is split"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [part.strip() for part in str(value).split(',') if part.strip()]
+
+
+def _init_worker(default_hours: float):
+    # Imported here so each worker process loads the catalog, dictionary and graph once
+    from src.bot.course_recommender import CourseRecommender
+    from src.bot.role_recommender import RoleRecommender
+
+    roles = RoleRecommender()
+    _worker.update(
+        courses=CourseRecommender(skills=roles.skills),
+        roles=roles,
+        roles_by_title={" ".join(title.lower().split()): details for title, details in roles.roles_data.items()},
+        default_hours=default_hours,
+        loop=asyncio.new_event_loop()
+    )
+
+
+def _target_job(title: str) -> Dict[str, Any]:
+    details = _worker['roles_by_title'].get(" ".join(title.lower().split()), {})
+    return {'title': title, 'required_skills': details.get('required_skills', [])}
+
+
+def build_user_plan(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Roadmap and role recommendations for one user record"""
+    user_id = user.get('id', user.get('user_id'))
+    skills = _split(user.get('skills'))
+    target_title = (
+        user.get('target_job') or user.get('job_preference') or user.get('short_term_career_goals') or ''
+    ).strip()
+    try:
+        hours = float(user.get('available_hours') or _worker['default_hours'])
+        loop = _worker['loop']
+        roadmap = loop.run_until_complete(
+            _worker['courses'].get_career_roadmap(skills, _target_job(target_title), hours)
+        )
+        roles = loop.run_until_complete(
+            _worker['roles'].get_role_recommendations(
+                skills,
+                _split(user.get('interests')),
+                user.get('experience_level') or 'entry'
+            )
+        )
+    except Exception as e:
+        return {'user_id': user_id, 'success': False, 'error': str(e)}
+
+    return {
+        'user_id': user_id,
+        'success': roadmap.get('success', False),
+        'target_job': target_title,
+        'roadmap': roadmap,
+        'roles': [
+            {'role': match['role'], 'match_score': match['match_score'], 'skill_gaps': match['skill_gaps']}
+            for match in roles
+        ]
+    }
+
+
+class RecommendationTable:
+    """Writes plans to the recommendations table, replacing a user's previous row"""
+
+    def __init__(self, database: str):
+        self.connection = sqlite3.connect(database)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations ("
+            "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users(id), "
+            "courses TEXT, companies TEXT, career_paths TEXT)"
+        )
+        self.connection.commit()
+
+    def write(self, plans: List[Dict[str, Any]]):
+        rows = []
+        for plan in plans:
+            if not plan.get('success') or plan.get('user_id') is None:
+                continue
+            roadmap = plan['roadmap']
+            rows.append((
+                int(plan['user_id']),
+                json.dumps(roadmap['recommended_courses'].get('recommendations', [])),
+                None,
+                json.dumps({
+                    'target_job': plan['target_job'],
+                    'current_match': roadmap['current_match'],
+                    'learning_timeline': roadmap['learning_timeline'],
+                    'estimated_job_readiness': roadmap['estimated_job_readiness'],
+                    'roles': plan['roles']
+                }, default=str)
+            ))
+        # One transaction per batch; re-running a batch replaces rather than duplicates
+        with self.connection:
+            self.connection.executemany("DELETE FROM recommendations WHERE user_id = ?", [(row[0],) for row in rows])
+            self.connection.executemany(
+                "INSERT INTO recommendations (user_id, courses, companies, career_paths) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    @property
+    def offset(self) -> int:
+        # Rows are replaced per user, so there is no partial output to truncate on resume
+        return 0
+
+    def close(self):
+        self.connection.close()
+
+
+def run(
+    source: Iterator[Dict[str, Any]],
+    sink,
+    checkpoint: Checkpoint,
+    workers: int,
+    batch_size: int,
+    default_hours: float = DEFAULT_HOURS_PER_WEEK
+) -> Dict[str, int]:
+    """Process `source` (already positioned after the checkpoint) into `sink`"""
+    totals = {'processed': 0, 'failed': 0}
+    for batch, plans in fan_out(source, build_user_plan, workers, batch_size, _init_worker, (default_hours,)):
+        sink.write(plans)
+        checkpoint.processed += len(batch)
+        checkpoint.output_offset = sink.offset
+        checkpoint.save()
+        totals['processed'] += len(batch)
+        totals['failed'] += sum(1 for plan in plans if not plan.get('success'))
+        logger.info(f"{checkpoint.processed} users done ({totals['failed']} failed this run)")
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate career roadmaps for a cohort of users")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="CSV or JSONL file of users")
+    source.add_argument('--from-db', metavar='DATABASE', help="SQLite database to read the users table from")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--output', help="JSONL file to write plans to")
+    target.add_argument('--to-db', metavar='DATABASE', help="SQLite database to write the recommendations table to")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: next to the output)")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint and start over")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--hours', type=float, default=DEFAULT_HOURS_PER_WEEK,
+                        help="Weekly learning hours for users that do not specify any")
+    parser.add_argument('--limit', type=int, help="Stop after this many users")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    checkpoint_path = args.checkpoint or f"{args.output or args.to_db}.roadmaps.checkpoint"
+    checkpoint = Checkpoint(checkpoint_path) if args.restart else Checkpoint.load(checkpoint_path)
+    if checkpoint.processed:
+        logger.info(f"Resuming after {checkpoint.processed} users")
+
+    if args.input:
+        users = islice(iter_file_records(args.input), checkpoint.processed, None)
+    else:
+        users = iter_db_users(args.from_db, checkpoint.processed)
+    if args.limit is not None:
+        users = islice(users, args.limit)
+
+    sink = JsonlSink(args.output, checkpoint.output_offset) if args.output else RecommendationTable(args.to_db)
+    try:
+        totals = run(users, sink, checkpoint, args.workers, args.batch_size, args.hours)
+    finally:
+        sink.close()
+    logger.info(f"Finished: {totals['processed']} users, {totals['failed']} failed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Per-user conversation memory for Sage with a token-budgeted sliding window
+"""
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List
+import re
+import threading
+
+# Chat formatting adds a few tokens around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1 + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class ConversationSession:
+    turns: Deque[Dict[str, str]] = field(default_factory=deque)
+    turn_tokens: int = 0
+    summary_lines: Deque[str] = field(default_factory=deque)
+    summary_tokens: int = 0
+
+
+class ConversationMemory:
+    """
+    Keeps each user's recent turns within a token budget. Turns that fall
+    out of the window are compacted into a short rolling summary, so the
+    prompt sent upstream stays roughly constant in size.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        summary_max_tokens: int = 300,
+        max_sessions: int = 10000
+    ):
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build_messages(
+        self,
+        user_id: str,
+        system_message: str,
+        user_message: str
+    ) -> List[Dict[str, str]]:
+        """Build the prompt for a new user message without recording it"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+                history = list(session.turns)
+                summary = "\n".join(session.summary_lines)
+            else:
+                history = []
+                summary = ""
+
+        messages = [{"role": "system", "content": system_message}]
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        messages.extend(history)
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def record_exchange(self, user_id: str, user_message: str, assistant_message: str):
+        """Add a completed exchange to the user's window and compact if needed"""
+        with self._lock:
+            session = self._get_or_create(user_id)
+            for role, content in (("user", user_message), ("assistant", assistant_message)):
+                session.turns.append({"role": role, "content": content})
+                session.turn_tokens += estimate_tokens(content)
+            self._compact(session)
+
+    def has_history(self, user_id: str) -> bool:
+        """Whether the user has an active conversation"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            return bool(session and (session.turns or session.summary_lines))
+
+    def clear(self, user_id: str):
+        """Forget a user's conversation"""
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def prompt_tokens(self, user_id: str) -> int:
+        """Estimated tokens of stored context for a user"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return 0
+            return session.turn_tokens + session.summary_tokens
+
+    def _get_or_create(self, user_id: str) -> ConversationSession:
+        session = self._sessions.get(user_id)
+        if session is None:
+            session = ConversationSession()
+            self._sessions[user_id] = session
+            # Evict the least recently active conversations
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(user_id)
+        return session
+
+    def _compact(self, session: ConversationSession):
+        """Fold the oldest turns into the summary until the window fits"""
+        while session.turn_tokens > self.max_tokens and len(session.turns) > 2:
+            turn = session.turns.popleft()
+            session.turn_tokens -= estimate_tokens(turn["content"])
+            line = self._summarize_turn(turn)
+            session.summary_lines.append(line)
+            session.summary_tokens += estimate_tokens(line)
+
+        while session.summary_tokens > self.summary_max_tokens and len(session.summary_lines) > 1:
+            dropped = session.summary_lines.popleft()
+            session.summary_tokens -= estimate_tokens(dropped)
+
+    def _summarize_turn(self, turn: Dict[str, str], max_chars: int = 160) -> str:
+        """Reduce a turn to its first sentence"""
+        text = " ".join(turn["content"].split())
+        first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        if len(first_sentence) > max_chars:
+            first_sentence = first_sentence[:max_chars].rstrip() + "..."
+        speaker = "User" if turn["role"] == "user" else "Sage"
+        return f"- {speaker}: {first_sentence}"
@@ -0,0 +1,206 @@
+"""
+Course catalog for Sage: courses loaded from a local data file and indexed
+by skill, topic and level so recommendations only touch relevant courses.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import heapq
+import json
+import math
+import re
+
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+
+# Pace scales the hours a learner can put in (same multipliers as the time breakdown)
+PACE_MULTIPLIERS = {
+    'slow': 0.5,
+    'moderate': 1.0,
+    'fast': 1.5
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(str(term).lower().split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Word tokens that keep names like c++, c# and node.js intact"""
+    return [token.rstrip('.') for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+@dataclass
+class Course:
+    course_id: str
+    title: str
+    provider: str
+    skills: List[str]
+    topics: List[str] = field(default_factory=list)
+    careers: List[str] = field(default_factory=list)
+    level: str = 'beginner'
+    duration_weeks: int = 4
+    weekly_hours: float = 5.0
+    description: str = ''
+    format: str = 'video'
+    rating: float = 0.0
+    url: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Course':
+        level = normalize_term(data.get('level', 'beginner'))
+        return cls(
+            course_id=str(data.get('id') or data.get('course_id') or data['title']),
+            title=data['title'],
+            provider=data.get('provider', ''),
+            skills=[normalize_term(skill) for skill in data.get('skills', [])],
+            topics=[normalize_term(topic) for topic in data.get('topics', [])],
+            careers=[normalize_term(career) for career in data.get('careers', [])],
+            level=level if level in LEVELS else 'beginner',
+            duration_weeks=int(data.get('duration_weeks', 4)),
+            weekly_hours=float(data.get('weekly_hours', 5)),
+            description=data.get('description', ''),
+            format=normalize_term(data.get('format', 'video')),
+            rating=float(data.get('rating', 0.0)),
+            url=data.get('url', '')
+        )
+
+
+class CourseCatalog:
+    """
+    Inverted indexes over the catalog:
+    - skill_index: canonical skill taught -> course positions
+    - topic_index: token of a topic, career or title -> course positions
+    - level_index: level -> course positions
+    """
+
+    def __init__(self, courses: Iterable[Course], max_candidates: int = 500, skills: Optional[SkillDictionary] = None):
+        self.courses: List[Course] = list(courses)
+        self.max_candidates = max_candidates
+        self.skills = skills if skills is not None else get_skill_dictionary()
+        self.skill_index: Dict[str, List[int]] = defaultdict(list)
+        self.topic_index: Dict[str, List[int]] = defaultdict(list)
+        self.level_index: Dict[str, List[int]] = defaultdict(list)
+        self._skill_sets: List[FrozenSet[str]] = []
+        self._level_ranks: List[int] = []
+
+        for position, course in enumerate(self.courses):
+            course.skills = self.skills.canonical_list(course.skills)
+            skills = frozenset(course.skills)
+            self._skill_sets.append(skills)
+            self._level_ranks.append(LEVELS.index(course.level))
+            for skill in skills:
+                self.skill_index[skill].append(position)
+            tokens = set(tokenize(course.title))
+            for phrase in course.topics + course.careers:
+                tokens.update(tokenize(phrase))
+            for token in tokens:
+                self.topic_index[token].append(position)
+            self.level_index[course.level].append(position)
+
+        self.skill_index = dict(self.skill_index)
+        self.topic_index = dict(self.topic_index)
+        self.level_index = dict(self.level_index)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    @classmethod
+    def from_file(cls, path: str, skills: Optional[SkillDictionary] = None) -> 'CourseCatalog':
+        """Load a JSON list (or {"courses": [...]}) or JSONL file; a missing file gives an empty catalog"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.endswith('.jsonl'):
+                    records = [json.loads(line) for line in f if line.strip()]
+                else:
+                    records = json.load(f)
+                    if isinstance(records, dict):
+                        records = records.get('courses', [])
+        except FileNotFoundError:
+            return cls([], skills=skills)
+        return cls((Course.from_dict(record) for record in records), skills=skills)
+
+    def top_courses(
+        self,
+        user_skills: Iterable[str],
+        career_goal: str,
+        available_hours_per_week: float,
+        learning_pace: str = 'moderate',
+        preferred_format: Optional[str] = None,
+        k: int = 5
+    ) -> List[Tuple[float, Course]]:
+        """Best `k` courses for this learner as (score, course), best first"""
+        known_skills = set(self.skills.normalize_list(user_skills))
+        relevance = self._goal_relevance(career_goal, known_skills)
+        if not relevance:
+            return []
+
+        # Cheap pre-selection by relevance keeps ranking cost flat for very common goals
+        if len(relevance) > self.max_candidates:
+            candidates = heapq.nlargest(self.max_candidates, relevance.items(), key=lambda item: item[1])
+        else:
+            candidates = relevance.items()
+
+        known_in_catalog = sum(1 for skill in known_skills if skill in self.skill_index)
+        user_level = 0 if known_in_catalog < 2 else 1 if known_in_catalog < 5 else 2
+        effective_hours = max(available_hours_per_week, 0) * PACE_MULTIPLIERS.get(learning_pace, 1.0)
+        preferred_format = normalize_term(preferred_format) if preferred_format else None
+
+        def score(item: Tuple[int, float]) -> float:
+            position, goal_score = item
+            course = self.courses[position]
+            skills = self._skill_sets[position]
+            novelty = len(skills - known_skills) / len(skills) if skills else 0.5
+            level_fit = 1.0 - 0.5 * abs(self._level_ranks[position] - user_level)
+            if course.weekly_hours <= 0 or course.weekly_hours <= effective_hours:
+                time_fit = 1.0
+            else:
+                time_fit = effective_hours / course.weekly_hours
+            total = (
+                0.45 * goal_score +
+                0.20 * novelty +
+                0.15 * level_fit +
+                0.15 * time_fit +
+                0.05 * min(course.rating, 5.0) / 5.0
+            )
+            if preferred_format and course.format == preferred_format:
+                total += 0.1
+            return total
+
+        ranked = heapq.nlargest(k, candidates, key=score)
+        return [(round(score(item), 4), self.courses[item[0]]) for item in ranked]
+
+    def _goal_relevance(self, career_goal: str, known_skills: Set[str]) -> Dict[int, float]:
+        """Relevance in [0, 1] of every course that shares a goal token, weighted by IDF"""
+        tokens = set(tokenize(career_goal or ''))
+        goal_skill = self.skills.lookup(career_goal or '')
+        goal_phrase = self.skills.names[goal_skill] if goal_skill is not None else None
+        total_courses = len(self.courses) or 1
+        weights: Dict[str, float] = {}
+        for token in tokens:
+            postings = self.topic_index.get(token)
+            if postings:
+                weights[token] = math.log(1 + total_courses / len(postings))
+
+        relevance: Dict[int, float] = defaultdict(float)
+        if weights:
+            total_weight = sum(weights.values())
+            for token, weight in weights.items():
+                share = weight / total_weight
+                for position in self.topic_index[token]:
+                    relevance[position] += share
+        # A goal that names a skill directly ("python") pulls in courses teaching it
+        for position in self.skill_index.get(goal_phrase, ()):
+            relevance[position] = max(relevance[position], 1.0)
+
+        if not relevance:
+            # Nothing matched the goal: build on what the learner already knows
+            for skill in known_skills:
+                for position in self.skill_index.get(skill, ()):
+                    relevance[position] += 0.1
+        return relevance
@@ -1,6 +1,13 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from enum import Enum
+import math
+from .course_catalog import CourseCatalog, PACE_MULTIPLIERS
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+from .skill_graph import SkillGraph
+from ..config import Config
+from ..utils.time_calculator import optimize_weekly_schedule, parse_busy_interval
+from ..utils.ttl_cache import TTLCache
 
 
 class LearningPace(Enum):
@@ -14,8 +21,30 @@ class JobMatchLevel(Enum):
     INTERMEDIATE = "intermediate"
     SENIOR = "senior"
 
+# Match percentage multipliers per experience level
+LEVEL_ADJUSTMENTS = {
+    JobMatchLevel.ENTRY: 1.2,  # More forgiving for entry level
+    JobMatchLevel.INTERMEDIATE: 1.0,
+    JobMatchLevel.SENIOR: 0.8  # Stricter for senior roles
+}
+
 class CourseRecommender:
-    def __init__(self):
+    def __init__(self, catalog: Optional[CourseCatalog] = None, skills: Optional[SkillDictionary] = None, skill_graph: Optional[SkillGraph] = None):
+        # Canonical skill names and IDs shared by catalog, job matching and time estimates
+        self.skills = skills if skills is not None else get_skill_dictionary()
+        
+        # Indexed course catalog loaded from the local data file
+        self.catalog = catalog if catalog is not None else CourseCatalog.from_file(Config.COURSE_CATALOG_PATH, self.skills)
+        
+        # Prerequisites between skills, for ordering learning plans
+        self.skill_graph = skill_graph if skill_graph is not None else SkillGraph.from_file(Config.SKILL_GRAPH_PATH, self.skills)
+        
+        # Sparse skill matrix (JobSkillMatrix) of the most recently matched job listings
+        self.job_matrix = None
+        
+        # Finished roadmaps, shared by learners with the same skills, target job and hours bucket
+        self.roadmap_cache = TTLCache(maxsize=Config.ROADMAP_CACHE_SIZE, ttl=Config.ROADMAP_CACHE_TTL)
+        
         # Initialize any necessary variables or configurations here
         self.categories = {
             'programming': {
@@ -35,6 +64,12 @@ class CourseRecommender:
                 }
             }
         }
+        
+        # Skill ID -> category, so time estimates are a dict lookup per skill
+        self.topic_categories: Dict[int, str] = {}
+        for category, data in self.categories.items():
+            for topic in data['topics']:
+                self.topic_categories.setdefault(self.skills.intern(topic), category)
 
     def calculate_job_readiness_date(self, weeks_needed: int) -> str:
         """
@@ -62,48 +97,93 @@ class CourseRecommender:
             'daily_hours': weekly_hours / 7
         }
 
-    async def get_personalized_courses(self, user_skills: List[str], career_goal: str, available_hours_per_week: int, learning_pace: str, current_commitments: List[str], preferred_learning_style: str) -> Dict[str, Any]:
+    async def get_personalized_courses(self, user_skills: List[str], career_goal: str, available_hours_per_week: int, learning_pace: str, current_commitments: Optional[List[str]] = None, preferred_learning_style: Optional[str] = None, k: int = 5) -> Dict[str, Any]:
         """
         Get personalized course recommendations based on user input
         """
-        # Placeholder for actual recommendation logic
-        recommendations = [
-            {
-                'course_name': 'Introduction to Python',
-                'provider': 'Coursera',
-                'duration_weeks': 6,
-                'weekly_hours': 5,
-                'description': 'Learn the basics of Python programming.'
-            },
-            {
-                'course_name': 'Data Science Fundamentals',
-                'provider': 'edX',
-                'duration_weeks': 10,
-                'weekly_hours': 8,
-                'description': 'An introduction to data science concepts and techniques.'
-            }
-        ]
+        pace = getattr(learning_pace, 'value', learning_pace)
+        effective_hours = available_hours_per_week * PACE_MULTIPLIERS.get(pace, 1.0)
+        
+        ranked = self.catalog.top_courses(
+            user_skills,
+            career_goal,
+            available_hours_per_week,
+            learning_pace=pace,
+            preferred_format=preferred_learning_style,
+            k=k
+        )
+        
+        recommendations = []
+        for score, course in ranked:
+            # Courses that need more hours than the learner has take proportionally longer
+            estimated_weeks = course.duration_weeks
+            if effective_hours > 0 and course.weekly_hours > effective_hours:
+                estimated_weeks = math.ceil(course.duration_weeks * course.weekly_hours / effective_hours)
+            recommendations.append({
+                'course_id': course.course_id,
+                'course_name': course.title,
+                'provider': course.provider,
+                'duration_weeks': course.duration_weeks,
+                'weekly_hours': course.weekly_hours,
+                'estimated_weeks': estimated_weeks,
+                'level': course.level,
+                'format': course.format,
+                'skills': course.skills,
+                'description': course.description,
+                'url': course.url,
+                'match_score': score
+            })
         
         # Calculate job readiness date based on the longest course duration
-        max_duration_weeks = max(course['duration_weeks'] for course in recommendations)
+        max_duration_weeks = max((course['estimated_weeks'] for course in recommendations), default=0)
         job_readiness_date = self.calculate_job_readiness_date(max_duration_weeks)
         
         return {
+            'success': True,
             'recommendations': recommendations,
-            'job_readiness_date': job_readiness_date
+            'job_readiness_date': job_readiness_date,
+            'time_commitment_breakdown': self._generate_time_breakdown(available_hours_per_week, pace),
+            'schedule_analysis': await self.analyze_user_schedule(
+                available_hours_per_week, pace, current_commitments or []
+            )
         }
 
-    async def analyze_user_schedule(self, available_hours_per_week: int, preferred_pace: str, current_commitments: List[str]) -> Dict[str, Any]:
+    async def analyze_user_schedule(self, available_hours_per_week: int, preferred_pace: str, current_commitments: List[str], preferred_times: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Analyze user's schedule and provide a learning plan
+        Analyze user's schedule and provide a learning plan.
+        Commitments like "Weekdays 9:00-17:00 work" are blocked out of the week
+        and study blocks are packed into the free time, peak energy hours first.
         """
         time_breakdown = self._generate_time_breakdown(available_hours_per_week, preferred_pace)
         
-        # Placeholder for actual analysis logic
+        busy_intervals = []
+        unrecognized = []
+        for commitment in current_commitments:
+            try:
+                busy_intervals.extend(parse_busy_interval(commitment))
+            except ValueError:
+                unrecognized.append(commitment)
+        weekly_schedule = optimize_weekly_schedule(available_hours_per_week, busy_intervals, preferred_times)
+        
+        suggestions = []
+        if weekly_schedule['unscheduled_hours']:
+            suggestions.append(
+                f"Only {weekly_schedule['scheduled_hours']:g} of {weekly_schedule['requested_hours']:g} hours "
+                "fit around your commitments; lower your weekly target or free up some time."
+            )
+        if weekly_schedule['scheduled_hours'] and weekly_schedule['preferred_share'] < 0.5:
+            suggestions.append("Most study blocks fall outside your peak energy hours.")
+        if unrecognized:
+            suggestions.append("Add days and times to your commitments (e.g. 'Weekdays 9:00-17:00') to plan around them.")
+        if not suggestions:
+            suggestions.append("Your study blocks fit around your commitments; keep them at the same times each week.")
+        
         analysis = {
             'time_breakdown': time_breakdown,
             'commitments': current_commitments,
-            'suggestions': 'Adjust your schedule to allocate more consistent study hours.'
+            'weekly_schedule': weekly_schedule,
+            'unrecognized_commitments': unrecognized,
+            'suggestions': " ".join(suggestions)
         }
         
         return analysis
@@ -113,33 +193,39 @@ class CourseRecommender:
         Match scraped job listings to user's skills and learning path
         """
         try:
-            # Calculate skill match percentages
-            matched_jobs = []
-            for job in job_listings:
-                match_score = self._calculate_job_match(
-                    user_skills,
-                    job.get('required_skills', []),
-                    experience_level
-                )
-                
-                if match_score['match_percentage'] > 50:  # Only include good matches
-                    matched_jobs.append({
-                        'job_title': job.get('title'),
-                        'company': job.get('company'),
-                        'match_score': match_score,
-                        'missing_skills': match_score['missing_skills'],
-                        'learning_time_estimate': self._estimate_skill_acquisition_time(
-                            match_score['missing_skills']
-                        )
-                    })
+            # Score the user against every job at once; only good matches (> 50%) count
+            top_jobs, total_matches = self.index_jobs(job_listings).top_matches(
+                user_skills,
+                LEVEL_ADJUSTMENTS[experience_level],
+                threshold=50,
+                k=5  # Top 5 matches
+            )
             
-            # Sort by match percentage
-            matched_jobs.sort(key=lambda x: x['match_score']['match_percentage'], reverse=True)
+            user_skill_ids = self.skills.lookup_ids(user_skills)
+            matched_jobs = []
+            for position, match_percentage in top_jobs:
+                job = job_listings[position]
+                required_skill_ids = [self.skills.intern(skill) for skill in job.get('required_skills', [])]
+                match_score = {
+                    'match_percentage': match_percentage,
+                    'matching_skills': [self.skills.names[skill_id] for skill_id in required_skill_ids if skill_id in user_skill_ids],
+                    'missing_skills': [self.skills.names[skill_id] for skill_id in required_skill_ids if skill_id not in user_skill_ids],
+                    'experience_level': experience_level.value
+                }
+                matched_jobs.append({
+                    'job_title': job.get('title'),
+                    'company': job.get('company'),
+                    'match_score': match_score,
+                    'missing_skills': match_score['missing_skills'],
+                    'learning_time_estimate': self._estimate_skill_acquisition_time(
+                        match_score['missing_skills']
+                    )
+                })
             
             return {
                 'success': True,
-                'matched_jobs': matched_jobs[:5],  # Top 5 matches
-                'total_matches': len(matched_jobs)
+                'matched_jobs': matched_jobs,
+                'total_matches': total_matches
             }
             
         except Exception as e:
@@ -148,13 +234,57 @@ class CourseRecommender:
                 'error': str(e)
             }
 
+    def index_jobs(self, job_listings: List[Dict]):
+        """
+        Build the sparse skill matrix for these job listings. The matrix is
+        reused while the same list is passed in; pass a new list after editing.
+        """
+        # numpy/scipy are only loaded once job matching is actually used
+        from .job_matcher import JobSkillMatrix
+        
+        if self.job_matrix is None or self.job_matrix.jobs is not job_listings or len(self.job_matrix) != len(job_listings):
+            self.job_matrix = JobSkillMatrix(job_listings, self.skills)
+        return self.job_matrix
+
+    def reload_catalog(self, catalog: Optional[CourseCatalog] = None):
+        """
+        Swap in a new course catalog (re-read from the data file by default)
+        and drop roadmaps that recommended courses from the old one
+        """
+        self.catalog = catalog if catalog is not None else CourseCatalog.from_file(Config.COURSE_CATALOG_PATH, self.skills)
+        self.invalidate_roadmaps()
+
+    def invalidate_roadmaps(self):
+        """Forget every cached roadmap"""
+        self.roadmap_cache.clear()
+
+    def _hours_bucket(self, available_hours: float) -> float:
+        """
+        Weekly hours rounded down to the bucket size. Roadmaps are keyed and
+        planned by bucket, so a cached roadmap never assumes more time than
+        any learner sharing it has
+        """
+        bucket_size = Config.ROADMAP_HOURS_BUCKET
+        if bucket_size <= 0:
+            return available_hours
+        bucketed = available_hours // bucket_size * bucket_size
+        return bucketed if bucketed > 0 else available_hours
+
+    def _roadmap_key(self, current_skills: List[str], target_job: Dict[str, Any], hours: float) -> tuple:
+        return (
+            frozenset(self.skills.normalize_list(current_skills)),
+            " ".join(str(target_job.get('title', '')).lower().split()),
+            tuple(self.skills.canonical(skill) for skill in target_job.get('required_skills', [])),
+            hours
+        )
+
     def _calculate_job_match(self, user_skills: List[str], required_skills: List[str], experience_level: JobMatchLevel) -> Dict[str, Any]:
         """
         Calculate how well user's skills match job requirements
         """
-        # Normalize skills for comparison
-        user_skills_normalized = [skill.lower() for skill in user_skills]
-        required_skills_normalized = [skill.lower() for skill in required_skills]
+        # Canonicalize skills for comparison ("JS" and "JavaScript" are the same skill)
+        user_skills_normalized = [self.skills.canonical(skill) for skill in user_skills]
+        required_skills_normalized = [self.skills.canonical(skill) for skill in required_skills]
         
         # Find matching and missing skills
         matching_skills = [
@@ -168,16 +298,10 @@ class CourseRecommender:
         ]
         
         # Calculate match percentage with experience level weighting
-        base_match = len(matching_skills) / len(required_skills) * 100
+        base_match = len(matching_skills) / len(required_skills) * 100 if required_skills else 0.0
         
         # Adjust match based on experience level
-        level_adjustments = {
-            JobMatchLevel.ENTRY: 1.2,  # More forgiving for entry level
-            JobMatchLevel.INTERMEDIATE: 1.0,
-            JobMatchLevel.SENIOR: 0.8  # Stricter for senior roles
-        }
-        
-        adjusted_match = base_match * level_adjustments[experience_level]
+        adjusted_match = base_match * LEVEL_ADJUSTMENTS[experience_level]
         
         return {
             'match_percentage': round(min(adjusted_match, 100), 1),
@@ -195,15 +319,14 @@ class CourseRecommender:
         
         for skill in missing_skills:
             # Find category containing the skill
-            for category, data in self.categories.items():
-                if skill.lower() in [t.lower() for t in data['topics']]:
-                    weeks = data['levels']['beginner']['duration_weeks']
-                    total_weeks += weeks
-                    skill_breakdown[skill] = {
-                        'estimated_weeks': weeks,
-                        'category': category
-                    }
-                    break
+            category = self.topic_categories.get(self.skills.lookup(skill))
+            if category is not None:
+                weeks = self.categories[category]['levels']['beginner']['duration_weeks']
+                total_weeks += weeks
+                skill_breakdown[skill] = {
+                    'estimated_weeks': weeks,
+                    'category': category
+                }
             else:
                 # Default if skill not found in categories
                 total_weeks += 4
@@ -222,18 +345,23 @@ class CourseRecommender:
         """
         Suggest optimal order for learning missing skills
         """
-        # Sort skills by estimated time (shorter first) and dependencies
+        # Prerequisites first; among skills that are ready to learn, shorter ones first
         ordered_skills = []
-        skills = list(skill_breakdown.items())
-        
-        # Sort by weeks needed
-        skills.sort(key=lambda x: x[1]['estimated_weeks'])
+        order = self.skill_graph.learning_order({
+            skill: details['estimated_weeks'] for skill, details in skill_breakdown.items()
+        })
         
-        for skill, details in skills:
+        for skill in order:
+            details = skill_breakdown[skill]
+            prerequisite_ids = self.skill_graph.prerequisites_of(skill)
             ordered_skills.append({
                 'skill': skill,
                 'weeks_needed': details['estimated_weeks'],
                 'category': details['category'],
+                'prerequisites': [
+                    other for other in order
+                    if other != skill and self.skills.lookup(other) in prerequisite_ids
+                ],
                 'suggested_resources': self._get_skill_resources(
                     skill,
                     details['category']
@@ -255,9 +383,17 @@ class CourseRecommender:
 
     async def get_career_roadmap(self, current_skills: List[str], target_job: Dict[str, Any], available_hours: int) -> Dict[str, Any]:
         """
-        Create a complete roadmap from current skills to target job
+        Create a complete roadmap from current skills to target job, planned
+        for the weekly hours rounded down to their bucket. Cached roadmaps
+        are shared; treat the returned dict as read-only.
         """
         try:
+            planned_hours = self._hours_bucket(available_hours)
+            cache_key = self._roadmap_key(current_skills, target_job, planned_hours)
+            cached = self.roadmap_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Calculate skill gaps
             match_analysis = self._calculate_job_match(
                 current_skills,
@@ -274,12 +410,12 @@ class CourseRecommender:
             courses = await self.get_personalized_courses(
                 current_skills,
                 target_job.get('title', ''),
-                available_hours,
+                planned_hours,
                 'moderate',
-                []
+                current_commitments=[]
             )
             
-            return {
+            roadmap = {
                 'success': True,
                 'current_match': match_analysis,
                 'learning_timeline': timeline,
@@ -288,6 +424,9 @@ class CourseRecommender:
                     timeline['total_weeks']
                 )
             }
+            if courses.get('success'):
+                self.roadmap_cache.set(cache_key, roadmap)
+            return roadmap
             
         except Exception as e:
             return {
@@ -0,0 +1,242 @@
+"""
+Compiled data snapshot for Sage: roles, prompts and the skill dictionary in
+one binary file that workers memory-map read-only. Prefork workers share
+the mapped pages, and a rebuilt snapshot (written to a temp file and
+renamed into place) is picked up by checking the file's mtime.
+
+Layout (little-endian):
+    header   MAGIC, section count (u32), reserved (u32)
+    sections name (32 bytes, NUL padded), offset (u64), record count (u32), reserved (u32)
+    section  record index: key offset, key length, value offset, value length (u32 each)
+             key order: record positions sorted by key (u32 each)
+             blobs: UTF-8 keys and JSON values
+Records keep their source order; lookups binary-search the key order.
+
+Long-lived readers hold a section through `view`, which decodes one record
+per lookup, so workers do not each keep a private decoded copy.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+from ..config import Config
+
+MAGIC = b'SAGESNP1'
+_HEADER = struct.Struct('<8sII')
+_SECTION = struct.Struct('<32sQII')
+_RECORD = struct.Struct('<IIII')
+_POSITION = struct.Struct('<I')
+
+
+def write_snapshot(path: str, sections: Dict[str, Dict[str, Any]]):
+    """Compile {section: {key: JSON-serializable value}} and atomically replace `path`"""
+    bodies = []
+    for records in sections.values():
+        keys = [str(key).encode('utf-8') for key in records]
+        values = [json.dumps(value, separators=(',', ':')).encode('utf-8') for value in records.values()]
+        blob_start = len(keys) * (_RECORD.size + _POSITION.size)
+        index = bytearray()
+        blobs = bytearray()
+        for key, value in zip(keys, values):
+            key_offset = blob_start + len(blobs)
+            blobs += key
+            index += _RECORD.pack(key_offset, len(key), key_offset + len(key), len(value))
+            blobs += value
+        for position in sorted(range(len(keys)), key=keys.__getitem__):
+            index += _POSITION.pack(position)
+        bodies.append((len(keys), bytes(index + blobs)))
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = bytearray(_HEADER.pack(MAGIC, len(sections), 0))
+    for name, (count, body) in zip(sections, bodies):
+        table += _SECTION.pack(name.encode('utf-8'), offset, count, 0)
+        offset += len(body)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(table)
+        for _, body in bodies:
+            f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    # Mapped readers keep the old inode until they reload
+    os.replace(temp_path, path)
+
+
+class _Mapping:
+    """One opened snapshot file"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, _ = _HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Sage data snapshot")
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for position in range(count):
+            name, offset, records, _ = _SECTION.unpack_from(self.buffer, _HEADER.size + position * _SECTION.size)
+            self.sections[name.rstrip(b'\0').decode('utf-8')] = (offset, records)
+
+    def record(self, section: Tuple[int, int], position: int) -> Tuple[int, int, int, int]:
+        offset, _ = section
+        key_offset, key_length, value_offset, value_length = _RECORD.unpack_from(
+            self.buffer, offset + position * _RECORD.size
+        )
+        return offset + key_offset, key_length, offset + value_offset, value_length
+
+    def key(self, section: Tuple[int, int], position: int) -> bytes:
+        key_offset, key_length, _, _ = self.record(section, position)
+        return self.buffer[key_offset:key_offset + key_length]
+
+    def value(self, section: Tuple[int, int], position: int) -> Any:
+        _, _, value_offset, value_length = self.record(section, position)
+        return json.loads(self.buffer[value_offset:value_offset + value_length])
+
+    def find(self, section: Tuple[int, int], key: bytes) -> Optional[int]:
+        offset, count = section
+        order_start = offset + count * _RECORD.size
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            position, = _POSITION.unpack_from(self.buffer, order_start + middle * _POSITION.size)
+            if self.key(section, position) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < count:
+            position, = _POSITION.unpack_from(self.buffer, order_start + low * _POSITION.size)
+            if self.key(section, position) == key:
+                return position
+        return None
+
+
+class SnapshotSection(Mapping):
+    """
+    Read-only dict view of one section of one mapped file. Records are
+    decoded on access; the file it was taken from stays mapped while the
+    view is alive, so a reload does not change it underneath its reader.
+    """
+
+    def __init__(self, mapping: _Mapping, name: str):
+        self._mapping = mapping
+        self._section = mapping.sections[name]
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._mapping.find(self._section, key.encode('utf-8')) if isinstance(key, str) else None
+        if position is None:
+            raise KeyError(key)
+        return self._mapping.value(self._section, position)
+
+    def __iter__(self) -> Iterator[str]:
+        for position in range(self._section[1]):
+            yield self._mapping.key(self._section, position).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._section[1]
+
+
+class DataSnapshot:
+    """
+    Read-only view of a snapshot file. `version` goes up every time a new
+    file is mapped, so callers can rebuild what they derived from it.
+    A missing file is an empty snapshot until one appears.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.logger = logging.getLogger('sage.ai.snapshot')
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0
+        self._mapping: Optional[_Mapping] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload_if_changed(force=True)
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Map the file again if it changed; returns True if a new snapshot was loaded"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._reload_lock:
+            self._last_check = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return False
+            if mtime == self._mtime and not force:
+                return False
+            try:
+                mapping = _Mapping(self.path)
+            except (OSError, ValueError, struct.error) as e:
+                self.logger.error(f"Could not load data snapshot {self.path}: {str(e)}")
+                return False
+            # Old mappings are closed when the last reader drops them
+            self._mapping = mapping
+            self._mtime = mtime
+            self.version += 1
+            self.logger.info(f"Loaded data snapshot {self.path} (sections: {', '.join(mapping.sections)})")
+            return True
+
+    def has_section(self, name: str) -> bool:
+        return self._mapping is not None and name in self._mapping.sections
+
+    def keys(self, name: str) -> List[str]:
+        mapping = self._mapping
+        if mapping is None or name not in mapping.sections:
+            return []
+        section = mapping.sections[name]
+        return [mapping.key(section, position).decode('utf-8') for position in range(section[1])]
+
+    def items(self, name: str) -> Iterator[Tuple[str, Any]]:
+        """(key, value) of every record in source order"""
+        mapping = self._mapping
+        if mapping is None or name not in mapping.sections:
+            return
+        section = mapping.sections[name]
+        for position in range(section[1]):
+            yield mapping.key(section, position).decode('utf-8'), mapping.value(section, position)
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """A whole section decoded into a dict"""
+        return dict(self.items(name))
+
+    def view(self, name: str) -> Mapping:
+        """A section of the current file as a lazily decoded mapping ({} if it is missing)"""
+        mapping = self._mapping
+        if mapping is None or name not in mapping.sections:
+            return {}
+        return SnapshotSection(mapping, name)
+
+    def get(self, name: str, key: str, default: Any = None) -> Any:
+        """One record, decoded on its own"""
+        mapping = self._mapping
+        if mapping is None or name not in mapping.sections:
+            return default
+        section = mapping.sections[name]
+        position = mapping.find(section, key.encode('utf-8'))
+        return default if position is None else mapping.value(section, position)
+
+
+_default_snapshot: Optional[DataSnapshot] = None
+_default_lock = threading.Lock()
+
+
+def get_data_snapshot() -> DataSnapshot:
+    """The process-wide snapshot at DATA_SNAPSHOT_PATH, mapped on first use"""
+    global _default_snapshot
+    if _default_snapshot is None:
+        with _default_lock:
+            if _default_snapshot is None:
+                _default_snapshot = DataSnapshot(Config.DATA_SNAPSHOT_PATH, Config.DATA_SNAPSHOT_CHECK_INTERVAL)
+    return _default_snapshot
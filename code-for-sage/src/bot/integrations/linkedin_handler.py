@@ -4,11 +4,15 @@ LinkedIn job data integration handler with validation and error handling
 
 from typing import Dict, List, Any, Optional
 import asyncio
+from collections import Counter
 from datetime import datetime
 from dataclasses import dataclass
 import logging
+import re
 from enum import Enum
 
+from ..skill_dictionary import SkillDictionary, get_skill_dictionary
+
 class JobDataError(Exception):
     """Custom exception for job data processing errors"""
     pass
@@ -32,10 +36,11 @@ class ProcessingMetrics:
     errors: List[str]
 
 class LinkedInDataHandler:
-    def __init__(self):
+    def __init__(self, skills: Optional[SkillDictionary] = None):
         self.cache_duration = 3600  # 1 hour cache
         self.cached_data = {}
         self.logger = logging.getLogger('linkedin.handler')
+        self.skills = skills if skills is not None else get_skill_dictionary()
         
         # Required fields for validation
         self.required_fields = {
@@ -133,6 +138,48 @@ class LinkedInDataHandler:
             self.logger.error(f"Error processing LinkedIn data: {str(e)}")
             raise JobDataError(f"Failed to process job data: {str(e)}")
 
+    def _job_skills(self, job: Dict) -> List[str]:
+        """Canonical skills of a job: listed skills first, then skills named in the description"""
+        listed = job.get('required_skills') or job.get('skills') or []
+        return self.skills.canonical_list(listed + self.skills.find_in_text(job.get('description', '')))
+
+    def _process_jobs(self, jobs: List[Dict]) -> List[Dict]:
+        """Jobs with their required skills canonicalized, ready for job matching"""
+        return [{**job, 'required_skills': self._job_skills(job)} for job in jobs]
+
+    def _extract_skills(self, jobs: List[Dict]) -> Dict[str, int]:
+        """Number of jobs asking for each canonical skill, most in demand first"""
+        demand = Counter(skill for job in jobs for skill in self._job_skills(job))
+        return dict(demand.most_common())
+
+    def _analyze_companies(self, jobs: List[Dict]) -> Dict[str, int]:
+        """Number of open jobs per company, most active first"""
+        return dict(Counter(job['company'] for job in jobs).most_common())
+
+    def _analyze_salaries(self, jobs: List[Dict]) -> Dict[str, float]:
+        """Lowest, highest and average midpoint of the advertised salary ranges"""
+        ranges = [
+            self._parse_salary(job['salary'])
+            for job in jobs
+            if job.get('salary')
+        ]
+        if not ranges:
+            return {}
+        return {
+            'min': min(low for low, _ in ranges),
+            'max': max(high for _, high in ranges),
+            'average': round(sum((low + high) / 2 for low, high in ranges) / len(ranges), 2),
+            'count': len(ranges)
+        }
+
+    def _parse_salary(self, salary: str) -> tuple:
+        """(low, high) from "$100K-$150K" or "$100,000"; a single figure is both ends"""
+        amounts = []
+        for number, thousands in re.findall(r'(\d{1,3}(?:,\d{3})*)(K?)', salary):
+            amount = float(number.replace(',', ''))
+            amounts.append(amount * 1000 if thousands else amount)
+        return amounts[0], amounts[-1]
+
     def _log_processing_metrics(self, metrics: ProcessingMetrics):
         """Log processing metrics"""
         self.logger.info(
@@ -0,0 +1,78 @@
+"""
+Vectorized job matching for Sage.
+Job requirements are kept as a sparse job x skill matrix over the skill
+dictionary's integer IDs, so one user is scored against every job with a
+single sparse matrix-vector product.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+
+
+class JobSkillMatrix:
+    """Sparse index of the required skills of a list of job listings"""
+
+    def __init__(self, job_listings: Sequence[Dict], skills: Optional[SkillDictionary] = None):
+        self.jobs = job_listings
+        self.skills = skills if skills is not None else get_skill_dictionary()
+
+        indptr = [0]
+        indices: List[int] = []
+        for job in job_listings:
+            job_skill_ids = self.skills.ids(job.get('required_skills', []) or [])
+            indices.extend(sorted(job_skill_ids))
+            indptr.append(len(indices))
+
+        self.matrix = csr_matrix(
+            (
+                np.ones(len(indices), dtype=np.float32),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int64)
+            ),
+            shape=(len(job_listings), max(len(self.skills), 1))
+        )
+        self.required_counts = np.diff(self.matrix.indptr).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def match_percentages(self, user_skills: Iterable[str], adjustment: float = 1.0) -> np.ndarray:
+        """Share of each job's required skills the user has, in percent, scaled and capped at 100"""
+        user_vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        # Skills first seen after the matrix was built cannot be required by any job
+        known_ids = [skill_id for skill_id in self.skills.lookup_ids(user_skills) if skill_id < len(user_vector)]
+        user_vector[known_ids] = 1.0
+
+        matched = self.matrix @ user_vector
+        percentages = np.zeros(len(self.jobs), dtype=np.float32)
+        np.divide(matched * 100.0, self.required_counts, out=percentages, where=self.required_counts > 0)
+        return np.round(np.minimum(percentages * adjustment, 100.0), 1)
+
+    def top_matches(
+        self,
+        user_skills: Iterable[str],
+        adjustment: float = 1.0,
+        threshold: float = 50.0,
+        k: int = 5
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        The `k` best jobs above `threshold` as (job position, percentage), best
+        first (ties keep listing order), plus how many jobs passed the threshold
+        """
+        percentages = self.match_percentages(user_skills, adjustment)
+        qualifying = np.flatnonzero(percentages > threshold)
+        if len(qualifying) > k:
+            # Partial selection: O(jobs) instead of sorting everything.
+            # Jobs tied with the k-th score are taken in listing order.
+            scores = percentages[qualifying]
+            kth_score = -np.partition(-scores, k - 1)[k - 1]
+            above = qualifying[scores > kth_score]
+            tied = qualifying[scores == kth_score][:k - len(above)]
+            top = np.concatenate([above, tied])
+        else:
+            top = qualifying
+        order = np.lexsort((top, -percentages[top]))
+        return [(int(top[i]), float(percentages[top[i]])) for i in order], int(len(qualifying))
@@ -0,0 +1,285 @@
+"""
+Model routing for Sage: an ordered list of models/endpoints with per-model
+timeouts, automatic fallback and optional hedged requests.
+Any OpenAI-compatible server (e.g. a local stand-in) can be used as a route.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+import asyncio
+import json
+import time
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from .resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, UpstreamUnavailableError
+
+
+@dataclass
+class ModelEndpoint:
+    model: str
+    base_url: Optional[str] = None  # None means the public OpenAI API
+    api_key: Optional[str] = None   # None means the default OPENAI_API_KEY
+    timeout: float = 30.0
+
+
+@dataclass
+class RoutedCompletion:
+    content: str
+    model: str
+    latency: float
+    response: Any
+
+
+def parse_model_routes(spec: Optional[str], default_model: str, default_timeout: float) -> List[ModelEndpoint]:
+    """
+    Parse SAGE_MODEL_ROUTES, a JSON list such as
+    [{"model": "gpt-3.5-turbo", "timeout": 20},
+     {"model": "llama3", "base_url": "http://localhost:8000/v1", "api_key": "local"}]
+    """
+    if not spec:
+        return [ModelEndpoint(model=default_model, timeout=default_timeout)]
+    try:
+        entries = json.loads(spec)
+        endpoints = [
+            ModelEndpoint(
+                model=entry['model'],
+                base_url=entry.get('base_url'),
+                api_key=entry.get('api_key'),
+                timeout=float(entry.get('timeout', default_timeout))
+            )
+            for entry in entries
+        ]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid SAGE_MODEL_ROUTES configuration: {str(e)}")
+    if not endpoints:
+        raise ValueError("SAGE_MODEL_ROUTES must list at least one model")
+    return endpoints
+
+
+def is_upstream_overload(error: BaseException) -> bool:
+    """429s, 5xx responses, timeouts and connection failures mean the upstream is struggling"""
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class ModelRoute:
+    """One endpoint with its own concurrency limit, breaker and latency history"""
+
+    def __init__(
+        self,
+        endpoint: ModelEndpoint,
+        limiter: AdaptiveConcurrencyLimiter,
+        circuit_breaker: CircuitBreaker,
+        latency_window: int = 200
+    ):
+        self.endpoint = endpoint
+        self.limiter = limiter
+        self.circuit_breaker = circuit_breaker
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+
+    @property
+    def model(self) -> str:
+        return self.endpoint.model
+
+    async def acquire(self) -> float:
+        """Pass the circuit breaker and wait for a concurrency slot; returns the start time"""
+        if not self.circuit_breaker.allow_request():
+            raise UpstreamUnavailableError(f"{self.model} is unhealthy, failing fast")
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.circuit_breaker.record_neutral()
+            raise
+        return time.monotonic()
+
+    def release(self, latency: Optional[float], error: Optional[BaseException] = None):
+        """Return the slot and feed the call's outcome to the limiter and breaker"""
+        overloaded = error is not None and is_upstream_overload(error)
+        if error is None and latency is not None:
+            self.latencies.append(latency)
+        self.limiter.release(latency if error is None else None, overloaded)
+        if overloaded:
+            self.circuit_breaker.record_failure()
+        elif error is None:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_neutral()
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Recent latency at `quantile`, or None without enough samples"""
+        if len(self.latencies) < 20:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency_quantile(0.95)
+        return {
+            'model': self.model,
+            'base_url': self.endpoint.base_url,
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+            'limiter': self.limiter.stats(),
+            'circuit_breaker': self.circuit_breaker.stats()
+        }
+
+
+class ModelRouter:
+    """
+    Tries routes in order. A route that errors, times out or has an open
+    circuit falls through to the next one. With hedging on, a duplicate
+    request is sent once the first has run past the route's p95 latency,
+    and whichever answer arrives first wins.
+    """
+
+    def __init__(
+        self,
+        routes: List[ModelRoute],
+        client_factory: Callable[[ModelEndpoint], Any],
+        hedge_enabled: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 1.0
+    ):
+        if not routes:
+            raise ValueError("ModelRouter needs at least one route")
+        self.routes = routes
+        self.client_factory = client_factory
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.fallbacks = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    @property
+    def primary(self) -> ModelRoute:
+        return self.routes[0]
+
+    async def complete(self, messages: List[Dict[str, str]], **params) -> RoutedCompletion:
+        """Get a completion from the first route that can serve it"""
+        last_error: Optional[BaseException] = None
+        for index, route in enumerate(self.routes):
+            if index > 0:
+                self.fallbacks += 1
+            try:
+                if self.hedge_enabled:
+                    return await self._hedged_attempt(route, messages, params)
+                return await self._attempt(route, messages, params)
+            except Exception as error:
+                last_error = error
+        raise last_error
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        on_route: Optional[Callable[[str], None]] = None,
+        **params
+    ) -> AsyncIterator[str]:
+        """
+        Yield content deltas. A route that fails before its first token falls
+        through to the next one; after that the error is raised.
+        `on_route` is told which model is serving once its first token arrives.
+        """
+        last_error: Optional[BaseException] = None
+        for index, route in enumerate(self.routes):
+            if index > 0:
+                self.fallbacks += 1
+            try:
+                start_time = await route.acquire()
+            except UpstreamUnavailableError as error:
+                last_error = error
+                continue
+
+            first_token_latency = None
+            stream_error = None
+            try:
+                client = self.client_factory(route.endpoint)
+                stream = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=route.model,
+                        messages=messages,
+                        stream=True,
+                        **params
+                    ),
+                    route.endpoint.timeout
+                )
+                async for chunk in stream:
+                    if first_token_latency is None:
+                        first_token_latency = time.monotonic() - start_time
+                        if on_route is not None:
+                            on_route(route.model)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            except BaseException as error:
+                stream_error = error
+                if first_token_latency is not None or not isinstance(error, Exception):
+                    raise
+                last_error = error
+            finally:
+                # The slot is held for the whole stream; health is judged on time to first token
+                route.release(first_token_latency, stream_error)
+
+            if stream_error is None:
+                return
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'routes': [route.stats() for route in self.routes],
+            'fallbacks': self.fallbacks,
+            'hedged_requests': self.hedged_requests,
+            'hedge_wins': self.hedge_wins
+        }
+
+    async def _attempt(self, route: ModelRoute, messages: List[Dict[str, str]], params: Dict) -> RoutedCompletion:
+        start_time = await route.acquire()
+        try:
+            client = self.client_factory(route.endpoint)
+            response = await asyncio.wait_for(
+                client.chat.completions.create(model=route.model, messages=messages, **params),
+                route.endpoint.timeout
+            )
+        except BaseException as error:
+            route.release(None, error)
+            raise
+        latency = time.monotonic() - start_time
+        route.release(latency)
+        return RoutedCompletion(
+            content=response.choices[0].message.content,
+            model=route.model,
+            latency=latency,
+            response=response
+        )
+
+    async def _hedged_attempt(self, route: ModelRoute, messages: List[Dict[str, str]], params: Dict) -> RoutedCompletion:
+        p95 = route.latency_quantile(self.hedge_quantile)
+        hedge_delay = max(self.hedge_min_delay, p95 if p95 is not None else route.endpoint.timeout / 2)
+
+        primary = asyncio.ensure_future(self._attempt(route, messages, params))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            self.hedged_requests += 1
+            backup = asyncio.ensure_future(self._attempt(route, messages, params))
+            pending.add(backup)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,176 @@
+"""
+Moderation lexicon for Sage: thousands of blocked terms matched with an
+Aho-Corasick automaton, so matching time depends on the text length (plus
+the number of hits), not on the size of the lexicon.
+
+Lexicon files are either JSON ({"category": ["term", ...]}) or plain text
+with one `category<TAB>term` per line (blank lines and # comments ignored).
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+
+class AhoCorasick:
+    """
+    Case-insensitive multi-term matcher. Built once; immutable afterwards,
+    so it can be shared between threads and swapped out wholesale.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, object]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (term length, payload) for every term ending at a node, including via fail links
+        self._outputs: List[List[Tuple[int, object]]] = [[]]
+        self.size = 0
+
+        for term, payload in terms:
+            term = term.strip().lower()
+            if not term:
+                continue
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                node = next_node
+            self._outputs[node].append((len(term), payload))
+            self.size += 1
+
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """Yield (start, end, payload) for every occurrence of every term"""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        node = 0
+        for index, char in enumerate(text):
+            char = char.lower()
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, payload in outputs[node]:
+                yield index + 1 - length, index + 1, payload
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class ModerationLexicon:
+    """
+    A category-tagged term list behind an Aho-Corasick automaton.
+    The file is re-read when its mtime changes (checked at most every
+    `check_interval` seconds); the new automaton replaces the old one in a
+    single assignment, so matching never sees a half-built lexicon.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0):
+        self.logger = logging.getLogger('sage.ai.safety')
+        self.path = path
+        self.check_interval = check_interval
+        self._automaton = AhoCorasick([])
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        if path:
+            self.reload_if_changed(force=True)
+
+    @property
+    def size(self) -> int:
+        return self._automaton.size
+
+    def load_terms(self, terms: Dict[str, Iterable[str]]):
+        """Replace the lexicon with {category: [terms]}"""
+        self._automaton = AhoCorasick(
+            (term, category) for category, category_terms in terms.items() for term in category_terms
+        )
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Rebuild from `path` if the file changed; returns True if a new lexicon was loaded"""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+        with self._reload_lock:
+            self._last_check = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return False
+            if mtime == self._mtime and not force:
+                return False
+            try:
+                terms = self._read_file(self.path)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not load moderation lexicon {self.path}: {str(e)}")
+                return False
+            self.load_terms(terms)
+            self._mtime = mtime
+            self.logger.info(f"Loaded moderation lexicon with {self.size} terms from {self.path}")
+            return True
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Non-overlapping whole-word matches as (start, end, category),
+        preferring the leftmost and then the longest term
+        """
+        self.reload_if_changed()
+        candidates = [
+            (start, end, category)
+            for start, end, category in self._automaton.iter_matches(text)
+            if (start == 0 or not _is_word_char(text[start - 1]))
+            and (end == len(text) or not _is_word_char(text[end]))
+        ]
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        position = 0
+        for start, end, category in candidates:
+            if start >= position:
+                matches.append((start, end, category))
+                position = end
+        return matches
+
+    @staticmethod
+    def _read_file(path: str) -> Dict[str, List[str]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("JSON lexicon must map categories to lists of terms")
+                return {str(category): list(terms) for category, terms in data.items()}
+
+            terms: Dict[str, List[str]] = {}
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                category, separator, term = line.partition('\t')
+                if not separator:
+                    raise ValueError(f"line {line_number}: expected 'category<TAB>term'")
+                terms.setdefault(category.strip(), []).append(term)
+            return terms
@@ -3,64 +3,210 @@ OpenAI integration for Sage career mentor bot.
 Handles all interactions with the OpenAI API securely.
 """
 
-from openai import OpenAI, AuthenticationError, RateLimitError
+from openai import OpenAI, AsyncOpenAI, AuthenticationError, RateLimitError
 from dotenv import load_dotenv
+import asyncio
+import concurrent.futures
+import httpx
+import logging
 import os
-import time
-from typing import Dict, Optional, List
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, List, Tuple
+from .conversation_memory import ConversationMemory, estimate_tokens
+from .model_router import ModelEndpoint, ModelRoute, ModelRouter, parse_model_routes
 from .personality import SAGE_PERSONALITY
 from .performance_monitor import PerformanceMonitor
 from .prompt_manager import PromptManager
+from .resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, UpstreamUnavailableError
+from .response_cache import ResponseCache
 from .safety_checker import SafetyChecker
+from ..config import Config
 
 # Load environment variables
 load_dotenv()
 
-class SageAI:
+# Session used when the caller does not identify the user
+DEFAULT_SESSION_ID = 'default'
+
+# All async OpenAI traffic runs on one background event loop so that the
+# AsyncOpenAI clients (and their pooled HTTP connections) are shared by every
+# SageAI instance and every request thread in the process.
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_async_clients: Dict[Tuple[str, Optional[str]], AsyncOpenAI] = {}
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop used for OpenAI calls, starting it on first use"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name='sage-openai-loop',
+                daemon=True
+            ).start()
+            _shared_loop = loop
+        return _shared_loop
+
+
+def get_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Return the process-wide AsyncOpenAI client for an endpoint.
+    Clients for different endpoints share one pooled HTTP transport.
+    Must be called from the shared event loop, which owns that transport.
+    """
+    global _http_client
+    key = (api_key, base_url)
+    client = _async_clients.get(key)
+    if client is None:
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(Config.OPENAI_TIMEOUT, connect=5.0)
+            )
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=_http_client)
+        _async_clients[key] = client
+    return client
+
+
+def run_on_event_loop(coro: Awaitable) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared OpenAI event loop"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def _reset_after_fork():
+    """Forked workers must not reuse the parent's loop thread or sockets"""
+    global _shared_loop, _shared_loop_lock, _http_client
+    _shared_loop = None
+    _shared_loop_lock = threading.Lock()
+    _http_client = None
+    _async_clients.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+    Followers await the leader's task, so cancelling one caller never
+    cancels the shared call. Must be used from a single event loop.
+    """
+
     def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `func` once per key at a time and share its result"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for coalesced upstream calls"""
+        return {
+            'in_flight': len(self._in_flight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced
+        }
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+
+class SageAI:
+    def __init__(
+        self,
+        performance_monitor: Optional[PerformanceMonitor] = None,
+        safety_checker: Optional[SafetyChecker] = None
+    ):
+        self.logger = logging.getLogger('sage.ai')
+        
         # Securely get API key from environment
         self.api_key = os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.")
         
+        # No network calls here; use verify_connection() to test the key
         try:
             self.client = OpenAI(api_key=self.api_key)
-            # Test the API key with a minimal request
-            self.client.models.list()
-        except AuthenticationError:
-            raise ValueError("Invalid OpenAI API key. Please check your API key configuration.")
-        except RateLimitError:
-            raise ValueError("OpenAI API key has exceeded its quota or rate limit")
         except Exception as e:
             raise ValueError(f"Error initializing OpenAI client: {str(e)}")
             
-        self.model = "gpt-3.5-turbo"  # Using GPT-3.5-turbo as default model
+        # Ordered model routes: the first is preferred, the rest are fallbacks
+        self.router = self._build_router(
+            parse_model_routes(Config.SAGE_MODEL_ROUTES, "gpt-3.5-turbo", Config.OPENAI_TIMEOUT)
+        )
+        self.model = self.router.primary.model
         
         # Set a simple personality string for now
         self.personality = "You are Sage, a helpful career mentor chatbot. Provide friendly and professional responses to help users with their career-related questions."
         
-        self.conversation_history = []
-        self.last_api_call = 0
-        self.min_time_between_calls = 1  # Minimum seconds between API calls
+        self.memory = ConversationMemory(
+            max_tokens=Config.CHAT_MEMORY_MAX_TOKENS,
+            summary_max_tokens=Config.CHAT_SUMMARY_MAX_TOKENS,
+            max_sessions=Config.CHAT_MAX_SESSIONS
+        )
+        self.response_cache = ResponseCache(
+            maxsize=Config.RESPONSE_CACHE_SIZE,
+            ttl=Config.RESPONSE_CACHE_TTL,
+            similarity_threshold=Config.RESPONSE_CACHE_SIMILARITY,
+            order_threshold=Config.RESPONSE_CACHE_ORDER_SIMILARITY
+        )
+        self.single_flight = SingleFlight()
         
-        # Initialize new components
-        self.performance_monitor = PerformanceMonitor()
+        # Initialize new components (shared instances may be passed in)
+        self.performance_monitor = performance_monitor or PerformanceMonitor()
         self.prompt_manager = PromptManager()
-        self.safety_checker = SafetyChecker()
-        
-    def _rate_limit_check(self):
-        """Ensure we don't exceed API rate limits"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
+        self.safety_checker = safety_checker or SafetyChecker()
         
-        if time_since_last_call < self.min_time_between_calls:
-            time.sleep(self.min_time_between_calls - time_since_last_call)
-            
-        self.last_api_call = time.time()
+    def _build_router(self, endpoints: List[ModelEndpoint]) -> ModelRouter:
+        """Give every endpoint its own adaptive concurrency limit (AIMD) and circuit breaker"""
+        routes = [
+            ModelRoute(
+                endpoint,
+                AdaptiveConcurrencyLimiter(
+                    initial_limit=Config.OPENAI_CONCURRENCY_INITIAL,
+                    max_limit=Config.OPENAI_CONCURRENCY_MAX,
+                    latency_target=Config.OPENAI_LATENCY_TARGET,
+                    queue_timeout=Config.OPENAI_QUEUE_TIMEOUT
+                ),
+                CircuitBreaker(
+                    failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                    reset_timeout=Config.CIRCUIT_RESET_TIMEOUT
+                )
+            )
+            for endpoint in endpoints
+        ]
+        return ModelRouter(
+            routes,
+            client_factory=lambda endpoint: get_async_client(endpoint.api_key or self.api_key, endpoint.base_url),
+            hedge_enabled=Config.OPENAI_HEDGE_ENABLED,
+            hedge_quantile=Config.OPENAI_HEDGE_QUANTILE,
+            hedge_min_delay=Config.OPENAI_HEDGE_MIN_DELAY
+        )
 
     def _handle_api_error(self, error: Exception) -> str:
         """Handle different types of API errors"""
-        if isinstance(error, RateLimitError):
+        if isinstance(error, UpstreamUnavailableError):
+            return " ".join(SAGE_PERSONALITY['error_messages']['api_error'].split())
+        elif isinstance(error, RateLimitError):
             return "The OpenAI API key has exceeded its quota. Please check your billing details at https://platform.openai.com/account/billing"
         elif isinstance(error, AuthenticationError):
             return "Invalid OpenAI API key. Please check your API key configuration."
@@ -69,52 +215,168 @@ class SageAI:
         else:
             return f"An error occurred while processing your request: {str(error)}"
 
-    def chat(self, user_message: str) -> str:
+    def chat(self, user_message: str, user_id: str = DEFAULT_SESSION_ID) -> str:
         """
-        Send a message to OpenAI API and get a response
+        Send a message to OpenAI API and get a response (blocking)
         """
+        return run_on_event_loop(self._chat(user_message, user_id)).result()
+
+    async def chat_async(self, user_message: str, user_id: str = DEFAULT_SESSION_ID) -> str:
+        """
+        Send a message to OpenAI API and get a response without blocking.
+        The request runs on the shared event loop, so many chats from
+        different threads can be in flight over the same connection pool.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is not None and running_loop is _shared_loop:
+            return await self._chat(user_message, user_id)
+        return await asyncio.wrap_future(run_on_event_loop(self._chat(user_message, user_id)))
+
+    def stream_chat(self, user_message: str, user_id: str = DEFAULT_SESSION_ID) -> Iterator[str]:
+        """
+        Send a message to OpenAI API and yield response deltas as they arrive.
+        Blocking iterator for WSGI streaming responses; the completion itself
+        streams on the shared event loop.
+        """
+        stream = self._stream_chat(user_message, user_id)
+        try:
+            while True:
+                try:
+                    yield run_on_event_loop(stream.__anext__()).result()
+                except StopAsyncIteration:
+                    break
+        finally:
+            run_on_event_loop(stream.aclose()).result()
+
+    def _build_messages(self, user_message: str, user_id: str) -> List[Dict[str, str]]:
+        """Build the prompt from the personality and the user's own conversation"""
+        # Ensure personality is a string
+        system_message = str(self.personality) if isinstance(self.personality, dict) else self.personality
+        
+        return self.memory.build_messages(user_id, system_message, user_message)
+
+    def _is_cacheable(self, user_id: str) -> bool:
+        """Only standalone questions may be answered from the response cache"""
+        return not self.memory.has_history(user_id)
+
+    async def _stream_chat(self, user_message: str, user_id: str) -> AsyncIterator[str]:
+        """Stream a single chat completion on the shared event loop"""
         try:
-            print(f"Attempting to send message: {user_message}")  # Debug log
-            self._rate_limit_check()
+            cacheable = self._is_cacheable(user_id)
+            if cacheable:
+                cached_response = self.response_cache.get(user_message)
+                if cached_response is not None:
+                    self.performance_monitor.record_cache_hit('response')
+                    self.memory.record_exchange(user_id, user_message, cached_response)
+                    yield cached_response
+                    return
             
-            # Add message to conversation history
-            self.conversation_history.append({"role": "user", "content": user_message})
+            messages = self._build_messages(user_message, user_id)
             
-            # Ensure personality is a string
-            system_message = str(self.personality) if isinstance(self.personality, dict) else self.personality
+            parts = []
+            shown = []
+            output_filter = self.safety_checker.stream_filter() if Config.FILTER_MODEL_OUTPUT else None
+            served_by = []
+            start_time = self.performance_monitor.start_request()
+            stream = self.router.stream(
+                messages,
+                on_route=served_by.append,
+                temperature=0.7,
+                max_tokens=1000
+            )
+            try:
+                async for delta in stream:
+                    parts.append(delta)
+                    if output_filter is not None:
+                        delta = output_filter.feed(delta)
+                        if not delta:
+                            continue
+                    shown.append(delta)
+                    yield delta
+            finally:
+                await stream.aclose()
+            if output_filter is not None:
+                tail = output_filter.flush()
+                if tail:
+                    shown.append(tail)
+                    yield tail
             
-            # Create messages array with personality prompt and conversation history
-            messages = [
-                {"role": "system", "content": system_message}
-            ] + self.conversation_history
+            # Add the exchange to the user's history once the stream ends
+            assistant_message = "".join(shown)
+            # Streamed responses carry no usage block, so token counts are estimated
+            self.performance_monitor.record_completion(
+                self.performance_monitor.metrics_from_counts(
+                    self.performance_monitor.elapsed(start_time),
+                    sum(estimate_tokens(message['content']) for message in messages),
+                    estimate_tokens("".join(parts)),
+                    served_by[0] if served_by else self.model
+                ),
+                'chat_stream'
+            )
+            self.memory.record_exchange(user_id, user_message, assistant_message)
+            if cacheable:
+                self.response_cache.set(user_message, assistant_message)
             
-            print(f"Sending messages to OpenAI: {messages}")  # Debug log
+        except Exception as e:
+            self.logger.error(f"Streaming error: {str(e)}")
+            yield self._handle_api_error(e)
+
+    async def _chat(self, user_message: str, user_id: str) -> str:
+        """Run a single chat completion on the shared event loop"""
+        try:
+            self.logger.debug(f"Attempting to send message: {user_message}")
             
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1000
+            cacheable = self._is_cacheable(user_id)
+            if cacheable:
+                cached_response = self.response_cache.get(user_message)
+                if cached_response is not None:
+                    self.performance_monitor.record_cache_hit('response')
+                    self.memory.record_exchange(user_id, user_message, cached_response)
+                    return cached_response
+            
+            messages = self._build_messages(user_message, user_id)
+            
+            if cacheable:
+                # Identical standalone questions in flight share one upstream call
+                assistant_message = await self.single_flight.do(
+                    self.response_cache.key_for(user_message),
+                    lambda: self._complete(messages)
                 )
-                
-                # Get the response content
-                assistant_message = response.choices[0].message.content
-                print(f"Received response: {assistant_message}")  # Debug log
-                
-                # Add assistant's response to history
-                self.conversation_history.append({"role": "assistant", "content": assistant_message})
-                
-                return assistant_message
-                
-            except Exception as api_error:
-                print(f"API Error Details: {str(api_error)}")  # Add detailed logging
-                raise api_error
+            else:
+                assistant_message = await self._complete(messages)
+            if Config.FILTER_MODEL_OUTPUT:
+                assistant_message = self.safety_checker.filter_content(assistant_message).filtered_content
+            
+            # Add the exchange to the user's history
+            self.memory.record_exchange(user_id, user_message, assistant_message)
+            if cacheable:
+                self.response_cache.set(user_message, assistant_message)
+            
+            return assistant_message
                 
         except Exception as e:
-            print(f"Full error details: {str(e)}")  # Add detailed logging
+            self.logger.error(f"Chat error: {str(e)}")
             return self._handle_api_error(e)
 
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        """Call the completion API (with fallback and hedging) and return the assistant message"""
+        self.logger.debug(f"Sending messages to OpenAI: {messages}")
+        
+        start_time = self.performance_monitor.start_request()
+        completion = await self.router.complete(messages, temperature=0.7, max_tokens=1000)
+        self.performance_monitor.record_completion(
+            self.performance_monitor.calculate_metrics(start_time, completion.response, completion.model),
+            'chat'
+        )
+        
+        # Get the response content
+        assistant_message = completion.content
+        self.logger.debug(f"Received response: {assistant_message}")
+        return assistant_message
+
     def verify_connection(self) -> bool:
         """
         Verify that the connection to OpenAI API is working
@@ -2,11 +2,17 @@
 AI Performance Monitoring for Sage
 """
 
+import os
 import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 from dataclasses import dataclass
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST, multiprocess
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+COST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
 
 @dataclass
 class ResponseMetrics:
@@ -49,10 +55,50 @@ class PerformanceMonitor:
                 'completion': 0.002
             }
         }
+        
+        # Prometheus metrics live in their own registry so each monitor exports only its own numbers,
+        # except under PROMETHEUS_MULTIPROC_DIR, where export() merges every worker's files
+        self.registry = CollectorRegistry()
+        self.request_latency = Histogram(
+            'sage_request_latency_seconds', 'HTTP request latency by route',
+            ['route', 'method', 'status'], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.openai_latency = Histogram(
+            'sage_openai_latency_seconds', 'Completion latency by model',
+            ['model', 'request_type'], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.prompt_tokens = Histogram(
+            'sage_prompt_tokens', 'Prompt tokens per completion',
+            ['model'], buckets=TOKEN_BUCKETS, registry=self.registry
+        )
+        self.completion_tokens = Histogram(
+            'sage_completion_tokens', 'Completion tokens per completion',
+            ['model'], buckets=TOKEN_BUCKETS, registry=self.registry
+        )
+        self.request_cost = Histogram(
+            'sage_request_cost_dollars', 'Estimated cost per completion',
+            ['model'], buckets=COST_BUCKETS, registry=self.registry
+        )
+        self.cache_hits = Counter(
+            'sage_cache_hits', 'Answers served without an upstream call',
+            ['cache'], registry=self.registry
+        )
+        self.rate_limit_rejections = Counter(
+            'sage_rate_limit_rejections', 'Requests rejected by the rate limiter',
+            ['route'], registry=self.registry
+        )
+        self.db_errors = Counter(
+            'sage_db_errors', 'Failed database operations',
+            ['operation'], registry=self.registry
+        )
     
     def start_request(self) -> float:
-        """Start timing a request"""
-        return time.time()
+        """Start timing a request, on a monotonic clock"""
+        return time.perf_counter()
+    
+    def elapsed(self, start_time: float) -> float:
+        """Seconds since `start_time` from start_request"""
+        return time.perf_counter() - start_time
     
     def calculate_metrics(
         self,
@@ -61,13 +107,23 @@ class PerformanceMonitor:
         model: str
     ) -> ResponseMetrics:
         """Calculate performance metrics for a response"""
-        end_time = time.time()
-        response_time = end_time - start_time
+        response_time = self.elapsed(start_time)
         
-        # Calculate token counts and costs
-        prompt_tokens = completion.usage.prompt_tokens
-        completion_tokens = completion.usage.completion_tokens
+        # Calculate token counts and costs (some OpenAI-compatible servers omit usage)
+        usage = getattr(completion, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
         
+        return self.metrics_from_counts(response_time, prompt_tokens, completion_tokens, model)
+    
+    def metrics_from_counts(
+        self,
+        response_time: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+        model: str
+    ) -> ResponseMetrics:
+        """Build metrics from known (or estimated) token counts"""
         # Calculate cost
         model_costs = self.token_costs.get(model, self.token_costs['gpt-3.5-turbo'])
         total_cost = (
@@ -93,3 +149,36 @@ class PerformanceMonitor:
             f"Tokens: {metrics.token_count} | "
             f"Cost: ${metrics.total_cost:.4f}"
         )
+    
+    def record_completion(self, metrics: ResponseMetrics, request_type: str):
+        """Log a completion and add it to the latency, token and cost histograms"""
+        self.log_metrics(metrics, request_type)
+        self.openai_latency.labels(metrics.model, request_type).observe(metrics.response_time)
+        self.prompt_tokens.labels(metrics.model).observe(metrics.prompt_tokens)
+        self.completion_tokens.labels(metrics.model).observe(metrics.completion_tokens)
+        self.request_cost.labels(metrics.model).observe(metrics.total_cost)
+    
+    def record_request(self, route: str, method: str, status: int, duration: float):
+        """Record an HTTP request's latency"""
+        self.request_latency.labels(route, method, str(status)).observe(duration)
+    
+    def record_cache_hit(self, cache: str):
+        self.cache_hits.labels(cache).inc()
+    
+    def record_rate_limit_rejection(self, route: str):
+        self.rate_limit_rejections.labels(route).inc()
+    
+    def record_db_error(self, operation: str):
+        self.db_errors.labels(operation).inc()
+    
+    def export(self) -> Tuple[bytes, str]:
+        """
+        Render all metrics in the Prometheus text format. With
+        PROMETHEUS_MULTIPROC_DIR set (gunicorn), the metrics of every
+        worker are merged, so a scrape does not depend on which one answers.
+        """
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
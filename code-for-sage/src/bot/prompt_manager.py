@@ -2,23 +2,33 @@
 Prompt Management and Version Control for Sage
 """
 
-from typing import Dict, Optional
+from typing import Dict, Mapping, Optional
 import json
+import logging
 import os
 from datetime import datetime
 
+from .data_snapshot import get_data_snapshot
+
 class PromptManager:
     def __init__(self):
+        self.logger = logging.getLogger('sage.ai.prompts')
         self.prompts_dir = "data/prompts/"
         self.current_version = "1.0.0"
+        self.snapshot_version = 0
         self.prompts = self._load_prompts()
         
-    def _load_prompts(self) -> Dict:
-        """Load prompt templates from file"""
+    def _load_prompts(self) -> Mapping:
+        """Load prompt templates from the data snapshot, or from file without one"""
+        snapshot = get_data_snapshot()
+        self.snapshot_version = snapshot.version
+        if snapshot.has_section('prompts'):
+            return snapshot.view('prompts')
         try:
             with open(f"{self.prompts_dir}prompts_v{self.current_version}.json", 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
+            self.logger.warning(f"No prompt templates found (snapshot or prompts_v{self.current_version}.json)")
             return {}
     
     def get_prompt(
@@ -27,6 +37,11 @@ class PromptManager:
         variables: Optional[Dict] = None
     ) -> str:
         """Get a prompt template and fill in variables"""
+        snapshot = get_data_snapshot()
+        snapshot.reload_if_changed()
+        if snapshot.version != self.snapshot_version and snapshot.has_section('prompts'):
+            self.prompts = self._load_prompts()
+            
         template = self.prompts.get(prompt_type, {}).get('template', '')
         if not template:
             raise ValueError(f"No prompt template found for type: {prompt_type}")
@@ -46,6 +61,9 @@ class PromptManager:
         """Add or update a prompt template"""
         if version:
             self.current_version = version
+        if not isinstance(self.prompts, dict):
+            # Snapshot views are read-only; edits work on a copy
+            self.prompts = dict(self.prompts)
             
         self.prompts[prompt_type] = {
             'template': template,
@@ -0,0 +1,240 @@
+"""
+Sliding-window rate limiting for Sage.
+Each key keeps two fixed-window counters; the previous window's count is
+weighted by how much of it still overlaps the sliding window. Checks and
+hits are O(1).
+
+Two interchangeable stores are provided:
+- SlidingWindowRateLimiter: in-process memory, bounded by `max_keys`
+- SQLiteRateLimitStore: a SQLite file in WAL mode shared by every worker
+  process on the host, so limits hold however many workers run
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+
+def _rolled(window_index: int, current: int, previous: int, now_index: int) -> Tuple[int, int]:
+    """(current, previous) counts of a counter moved forward to window `now_index`"""
+    if now_index == window_index:
+        return current, previous
+    if now_index == window_index + 1:
+        return 0, current
+    return 0, 0
+
+
+class _WindowCounter:
+    __slots__ = ('window_index', 'current', 'previous')
+
+    def __init__(self, window_index: int):
+        self.window_index = window_index
+        self.current = 0
+        self.previous = 0
+
+
+class SlidingWindowRateLimiter:
+    """
+    Approximate sliding-window counts per key, held in this process.
+    Keys idle for two windows carry no state worth keeping, so the least
+    recently used key is dropped when more than `max_keys` are tracked.
+    """
+
+    def __init__(
+        self,
+        window: float = 3600.0,
+        max_keys: int = 100000,
+        timer: Callable[[], float] = time.time
+    ):
+        self.window = window
+        self.max_keys = max_keys
+        self._timer = timer
+        self._counters: "OrderedDict[Hashable, _WindowCounter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, key: Hashable) -> float:
+        """Estimated number of hits for `key` in the last `window` seconds"""
+        now = self._timer()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                return 0.0
+            return self._estimate(counter, now)
+
+    def hit(self, key: Hashable, amount: int = 1):
+        """Record `amount` hits for `key`"""
+        now = self._timer()
+        with self._lock:
+            self._counter_for(key, now).current += amount
+
+    def hit_if_below(self, limits: List[Tuple[Hashable, int]]) -> Optional[Hashable]:
+        """
+        Atomically record one hit on every key if all are under their limit.
+        Returns the first key that is at its limit (recording nothing), or None.
+        """
+        now = self._timer()
+        with self._lock:
+            counters = [(self._counter_for(key, now), key, limit) for key, limit in limits]
+            for counter, key, limit in counters:
+                if self._estimate(counter, now) >= limit:
+                    return key
+            for counter, _, _ in counters:
+                counter.current += 1
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _counter_for(self, key: Hashable, now: float) -> _WindowCounter:
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = _WindowCounter(int(now // self.window))
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            self._roll(counter, now)
+        return counter
+
+    def _roll(self, counter: _WindowCounter, now: float):
+        window_index = int(now // self.window)
+        counter.current, counter.previous = _rolled(
+            counter.window_index, counter.current, counter.previous, window_index
+        )
+        counter.window_index = window_index
+
+    def _estimate(self, counter: _WindowCounter, now: float) -> float:
+        self._roll(counter, now)
+        overlap = 1.0 - (now % self.window) / self.window
+        return counter.previous * overlap + counter.current
+
+
+class SQLiteRateLimitStore:
+    """
+    The same sliding-window counters kept in a SQLite database in WAL mode.
+    Check-and-increment runs inside BEGIN IMMEDIATE, so it is atomic across
+    threads and processes. Rows idle for two windows are pruned
+    periodically, which keeps the table bounded by the active keys.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        window: float = 3600.0,
+        prune_every: int = 1000,
+        timer: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.window = window
+        self.prune_every = prune_every
+        self._timer = timer
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, window_index INTEGER NOT NULL, "
+            "current INTEGER NOT NULL, previous INTEGER NOT NULL)"
+        )
+
+    def count(self, key: str) -> float:
+        """Estimated number of hits for `key` in the last `window` seconds"""
+        now = self._timer()
+        row = self._connection().execute(
+            "SELECT window_index, current, previous FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        return self._estimate(row, now)
+
+    def hit(self, key: str, amount: int = 1):
+        """Record `amount` hits for `key`"""
+        self._hit([(key, None)], amount)
+
+    def hit_if_below(self, limits: List[Tuple[str, int]]) -> Optional[str]:
+        """
+        Atomically record one hit on every key if all are under their limit.
+        Returns the first key that is at its limit (recording nothing), or None.
+        """
+        return self._hit(limits, 1)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+    def _hit(self, limits: List[Tuple[str, Optional[int]]], amount: int) -> Optional[str]:
+        """Check and increment every key in one write transaction; a None limit is never exceeded"""
+        conn = self._connection()
+        now = self._timer()
+        now_index = int(now // self.window)
+        keys = [key for key, _ in limits]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            placeholders = ",".join("?" * len(keys))
+            rows = {
+                row[0]: row[1:]
+                for row in conn.execute(
+                    f"SELECT key, window_index, current, previous FROM rate_limits WHERE key IN ({placeholders})",
+                    keys
+                )
+            }
+            for key, limit in limits:
+                if limit is not None and self._estimate(rows.get(key), now) >= limit:
+                    conn.execute("ROLLBACK")
+                    return key
+
+            for key in keys:
+                window_index, current, previous = rows.get(key, (now_index, 0, 0))
+                current, previous = _rolled(window_index, current, previous, now_index)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window_index, current, previous) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, now_index, current + amount, previous)
+                )
+            self._maybe_prune(conn, now_index)
+            conn.execute("COMMIT")
+            return None
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _maybe_prune(self, conn: sqlite3.Connection, now_index: int):
+        self._local.writes = getattr(self._local, 'writes', 0) + 1
+        if self._local.writes % self.prune_every == 0:
+            conn.execute("DELETE FROM rate_limits WHERE window_index < ?", (now_index - 1,))
+
+    def _estimate(self, row: Optional[Tuple[int, int, int]], now: float) -> float:
+        if row is None:
+            return 0.0
+        current, previous = _rolled(row[0], row[1], row[2], int(now // self.window))
+        overlap = 1.0 - (now % self.window) / self.window
+        return previous * overlap + current
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, reopened in forked worker processes"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+def create_rate_limit_store(backend: str, path: Optional[str] = None, window: float = 3600.0):
+    """Build the store named by `backend` ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return SlidingWindowRateLimiter(window=window)
+    if backend == 'sqlite':
+        if not path:
+            raise ValueError("The sqlite rate-limit backend needs a database path")
+        return SQLiteRateLimitStore(path, window=window)
+    raise ValueError(f"Unknown rate-limit backend: {backend}")
@@ -0,0 +1,176 @@
+"""
+Adaptive concurrency limiting and circuit breaking for upstream AI calls.
+Both are meant to be used from the single shared event loop in openai_handler.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional
+import asyncio
+import time
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when a call is refused because the upstream is unhealthy or saturated"""
+    pass
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit. Each healthy completion (latency under target)
+    grows the limit by 1/limit, i.e. about +1 per round of calls; each
+    overload signal (429, 5xx, timeout, slow call) cuts it by `backoff_ratio`,
+    at most once per `decrease_cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target: float = 8.0,
+        backoff_ratio: float = 0.5,
+        queue_timeout: float = 30.0,
+        decrease_cooldown: float = 1.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.queue_timeout = queue_timeout
+        self.decrease_cooldown = decrease_cooldown
+        self._limit = float(initial_limit)
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    async def acquire(self):
+        """Wait for a free slot; raises UpstreamUnavailableError on queue timeout"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as we gave up; hand it back
+                self.release(latency=None)
+            else:
+                waiter.cancel()
+                self._discard(waiter)
+            if isinstance(error, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise UpstreamUnavailableError("Timed out waiting for an upstream slot")
+
+    def release(self, latency: Optional[float], overloaded: bool = False):
+        """Free a slot and adapt the limit from the call's outcome"""
+        self.in_flight -= 1
+        if latency is not None:
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                0.8 * self.latency_ewma + 0.2 * latency
+            )
+
+        if overloaded or (latency is not None and latency > self.latency_target):
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif latency is not None:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+        self._wake_waiters()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'queued': len(self._waiters),
+            'rejected': self.rejected,
+            'latency_ewma': round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+        }
+
+    def _wake_waiters(self):
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures and fails
+    fast for `reset_timeout` seconds. Then a single trial call is let
+    through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.short_circuited = 0
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream right now"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            self.short_circuited += 1
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self.state = CircuitState.CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_neutral(self):
+        """A call finished without telling us anything about upstream health"""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'short_circuited': self.short_circuited
+        }
@@ -0,0 +1,218 @@
+"""
+Response cache for repeated career questions.
+Exact lookups use a normalized prompt; near-duplicates are found with
+TF-IDF cosine similarity over a small inverted index, all computed locally.
+Bag-of-words similarity ignores word order ("from data science to web dev"
+vs "from web dev to data science"), so a near-duplicate must also use its
+shared words in much the same order.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+import math
+import re
+import threading
+
+from ..utils.ttl_cache import TTLCache
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'can', 'could', 'do', 'does',
+    'for', 'how', 'i', 'if', 'in', 'is', 'it', 'me', 'my', 'need', 'needed',
+    'of', 'on', 'or', 'should', 'so', 'the', 'to', 'what', 'which', 'would',
+    'you', 'your'
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_TOKEN_PATTERN.findall(prompt.lower()))
+
+
+def content_words(normalized_prompt: str) -> List[str]:
+    """Content words in prompt order, with naive plural folding"""
+    words = []
+    for token in normalized_prompt.split():
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        words.append(token)
+    return words
+
+
+def tokenize(normalized_prompt: str) -> Counter:
+    """Content-word term frequencies with naive plural folding"""
+    return Counter(content_words(normalized_prompt))
+
+
+def word_order_similarity(first: List[str], second: List[str]) -> float:
+    """
+    Share of the words two prompts have in common that they use in the
+    same order: the longest common subsequence of the shared words over
+    the longer of the two shared-word sequences
+    """
+    shared = set(first) & set(second)
+    first = [word for word in first if word in shared]
+    second = [word for word in second if word in shared]
+    if not first or not second:
+        return 0.0
+    previous = [0] * (len(second) + 1)
+    for word in first:
+        current = [0]
+        for position, other in enumerate(second):
+            current.append(previous[position] + 1 if word == other else max(previous[position + 1], current[-1]))
+        previous = current
+    return previous[-1] / max(len(first), len(second))
+
+
+@dataclass
+class CachedResponse:
+    response: str
+    terms: Counter
+    words: List[str]
+
+
+class ResponseCache:
+    """
+    Two-level cache in front of the completion call: an exact match on the
+    normalized prompt, then an approximate match above `similarity_threshold`
+    whose shared words are in the same order for at least `order_threshold`
+    of them. Entries expire after `ttl` seconds and are evicted least-recently-used.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 2048,
+        ttl: float = 6 * 3600,
+        similarity_threshold: float = 0.85,
+        max_candidates: int = 64,
+        order_threshold: float = 0.8
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.order_threshold = order_threshold
+        self.max_candidates = max_candidates
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._unindex)
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def key_for(self, prompt: str) -> str:
+        """Cache key for a prompt"""
+        return normalize_prompt(prompt)
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return a cached response for this prompt or a close paraphrase"""
+        key = self.key_for(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.exact_hits += 1
+                return entry.response
+
+            match = self._find_similar(content_words(key))
+            if match is not None:
+                self.semantic_hits += 1
+                # Refresh recency of the entry we served
+                return self._entries.get(match).response
+
+            self.misses += 1
+            return None
+
+    def set(self, prompt: str, response: str):
+        """Cache a response for a prompt"""
+        key = self.key_for(prompt)
+        if not key:
+            return
+        words = content_words(key)
+        terms = Counter(words)
+        with self._lock:
+            self._entries.set(key, CachedResponse(response=response, terms=terms, words=words))
+            for term in terms:
+                self._postings[term].add(key)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for tuning the threshold and size"""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            entry_stats = self._entries.stats()
+            return {
+                'size': entry_stats['size'],
+                'maxsize': entry_stats['maxsize'],
+                'evictions': entry_stats['evictions'],
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+                'similarity_threshold': self.similarity_threshold,
+                'order_threshold': self.order_threshold
+            }
+
+    def _find_similar(self, query_words: List[str]) -> Optional[str]:
+        """Best cached key whose TF-IDF cosine similarity and word order clear their thresholds"""
+        query_terms = Counter(query_words)
+        if not query_terms:
+            return None
+
+        total = max(len(self._entries), 1)
+        idf = {
+            term: math.log((1 + total) / (1 + len(self._postings.get(term, ())))) + 1
+            for term in query_terms
+        }
+
+        # Only entries sharing a term can score; start from the rarest terms
+        candidates = []
+        for term in sorted(query_terms, key=lambda t: len(self._postings.get(t, ()))):
+            candidates.extend(self._postings.get(term, ()))
+            if len(candidates) >= self.max_candidates:
+                break
+
+        query_norm = math.sqrt(sum((tf * idf[t]) ** 2 for t, tf in query_terms.items()))
+        best_key, best_score = None, self.similarity_threshold
+        for key in set(candidates[:self.max_candidates]):
+            entry = self._entries.peek(key)
+            if entry is None:
+                continue
+            score = self._cosine(query_terms, idf, query_norm, entry.terms, total)
+            if score >= best_score and word_order_similarity(query_words, entry.words) >= self.order_threshold:
+                best_key, best_score = key, score
+        return best_key
+
+    def _cosine(
+        self,
+        query_terms: Counter,
+        query_idf: Dict[str, float],
+        query_norm: float,
+        doc_terms: Counter,
+        total: int
+    ) -> float:
+        dot = 0.0
+        doc_norm_sq = 0.0
+        for term, tf in doc_terms.items():
+            weight = query_idf.get(term)
+            if weight is None:
+                weight = math.log((1 + total) / (1 + len(self._postings.get(term, ())))) + 1
+            else:
+                dot += query_terms[term] * tf * weight * weight
+            doc_norm_sq += (tf * weight) ** 2
+        if not dot or not query_norm or not doc_norm_sq:
+            return 0.0
+        return dot / (query_norm * math.sqrt(doc_norm_sq))
+
+    def _unindex(self, key: str, entry: CachedResponse):
+        for term in entry.terms:
+            keys = self._postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[term]
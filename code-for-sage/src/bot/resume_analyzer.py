@@ -2,10 +2,27 @@
 Resume analysis and skill extraction
 """
 
-from typing import Dict, List, Optional
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
 import re
 from dataclasses import dataclass
 
+from .moderation_lexicon import AhoCorasick
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+from ..config import Config
+
+# Same separators the skill dictionary ignores: "Node.js", "Node JS" and "node-js" scan alike
+_SEPARATORS = re.compile(r"[\s\-_.]+")
+_WORD_CHARS = frozenset("+#&")
+_YEARS = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+_YEAR_RANGE = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)\b",
+    re.IGNORECASE
+)
+
 @dataclass
 class ResumeAnalysis:
     extracted_skills: List[str]
@@ -15,11 +32,96 @@ class ResumeAnalysis:
     action_verbs: List[str]
     keyword_density: Dict[str, float]
 
+@dataclass
+class ResumeScan:
+    """Everything the lexicon automaton found in one pass over a resume"""
+    skills: List[str]
+    action_verbs: List[str]
+    keyword_counts: Dict[str, int]
+    word_count: int
+
+def _normalize(text: str) -> str:
+    """Collapse separator runs to one space, keeping every other character (and its case)"""
+    return _SEPARATORS.sub(' ', text)
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in _WORD_CHARS
+
+class ResumeLexicon:
+    """
+    Skill spellings, action verbs and industry keywords behind one
+    Aho-Corasick automaton, so a resume is scanned once however large the
+    lexicons grow. Matches must be whole words; very short skill aliases
+    ("go", "r") only count when written as acronyms, as in
+    SkillDictionary.find_in_text.
+    """
+
+    def __init__(self, skills: SkillDictionary, action_verbs: List[str], industry_keywords: List[str]):
+        self.skills = skills
+        self.action_verbs = action_verbs
+        self.industry_keywords = industry_keywords
+        self.automaton = AhoCorasick(self._terms())
+
+    def _terms(self) -> Iterator[Tuple[str, Tuple[str, Any]]]:
+        for aliases in self.skills.aliases().values():
+            for alias in aliases:
+                skill_id = self.skills.intern(alias)
+                if len(alias) <= 2 and alias.isalpha():
+                    yield alias, ('acronym', skill_id)
+                    continue
+                spelling = _normalize(alias).strip()
+                yield spelling, ('skill', skill_id)
+                # "nodejs" for "node.js"; the dictionary treats separators as optional
+                if ' ' in spelling:
+                    yield spelling.replace(' ', ''), ('skill', skill_id)
+        for position, verb in enumerate(self.action_verbs):
+            yield _normalize(verb).strip(), ('verb', position)
+        for keyword in self.industry_keywords:
+            yield _normalize(keyword).strip(), ('keyword', keyword)
+
+    def scan(self, text: str) -> ResumeScan:
+        normalized = _normalize(text)
+        skill_matches = []
+        verbs = set()
+        keyword_counts: Counter = Counter()
+        for start, end, (kind, value) in self.automaton.iter_matches(normalized):
+            if (start > 0 and _is_word_char(normalized[start - 1])) or (
+                end < len(normalized) and _is_word_char(normalized[end])
+            ):
+                continue
+            if kind == 'verb':
+                verbs.add(value)
+            elif kind == 'keyword':
+                keyword_counts[value] += 1
+            elif kind == 'skill' or normalized[start:end].isupper():
+                skill_matches.append((start, end, value))
+
+        # Leftmost-longest, non-overlapping skill mentions ("machine learning", not also "learning")
+        skill_matches.sort(key=lambda match: (match[0], -match[1]))
+        skill_ids = []
+        position = 0
+        for start, end, skill_id in skill_matches:
+            if start >= position:
+                skill_ids.append(skill_id)
+                position = end
+
+        return ResumeScan(
+            skills=[self.skills.names[skill_id] for skill_id in dict.fromkeys(skill_ids)],
+            action_verbs=[self.action_verbs[position] for position in sorted(verbs)],
+            keyword_counts=dict(keyword_counts),
+            word_count=len(text.split())
+        )
+
 class ResumeAnalyzer:
-    def __init__(self):
-        self.skill_patterns = self._load_skill_patterns()
-        self.action_verbs = self._load_action_verbs()
-        self.industry_keywords = self._load_industry_keywords()
+    def __init__(self, skills: Optional[SkillDictionary] = None, lexicon_path: Optional[str] = None):
+        self.logger = logging.getLogger('sage.ai.resume')
+        self.skills = skills if skills is not None else get_skill_dictionary()
+        self.lexicon_path = lexicon_path or Config.RESUME_LEXICON_PATH
+        lexicon = self._load_lexicon()
+        self.action_verbs = self._load_action_verbs(lexicon)
+        self.industry_keywords = self._load_industry_keywords(lexicon)
+        self.lexicon = ResumeLexicon(self.skills, self.action_verbs, self.industry_keywords)
+        self._role_recommender = None
 
     async def analyze_resume(
         self,
@@ -27,35 +129,71 @@ class ResumeAnalyzer:
         target_role: Optional[str] = None
     ) -> ResumeAnalysis:
         """Analyze resume content"""
-        skills = self._extract_skills(resume_text)
+        scan = self._scan(resume_text)
         experience = self._determine_experience_level(resume_text)
         
         analysis = ResumeAnalysis(
-            extracted_skills=skills,
+            extracted_skills=scan.skills,
             experience_level=experience,
             improvement_suggestions=self._generate_suggestions(
                 resume_text,
-                target_role
+                target_role,
+                scan.action_verbs
             ),
             skill_gaps=self._identify_skill_gaps(
-                skills,
+                scan.skills,
                 target_role
             ) if target_role else {},
-            action_verbs=self._extract_action_verbs(resume_text),
-            keyword_density=self._calculate_keyword_density(resume_text)
+            action_verbs=scan.action_verbs,
+            keyword_density=self._keyword_density(scan)
         )
         
         return analysis
 
+    def _scan(self, text: str) -> ResumeScan:
+        """Skills, action verbs and keyword counts from a single pass over the text"""
+        return self.lexicon.scan(text)
+
+    def _load_lexicon(self) -> Dict[str, List[str]]:
+        """Action verbs and industry keywords from RESUME_LEXICON_PATH"""
+        try:
+            with open(self.lexicon_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.logger.warning(f"Resume lexicon {self.lexicon_path} not found")
+            return {}
+
+    def _load_action_verbs(self, lexicon: Dict[str, List[str]]) -> List[str]:
+        """Action verbs, lowercased, without duplicates"""
+        return list(dict.fromkeys(verb.strip().lower() for verb in lexicon.get('action_verbs', []) if verb.strip()))
+
+    def _load_industry_keywords(self, lexicon: Dict[str, List[str]]) -> List[str]:
+        """Industry keywords, lowercased, without duplicates"""
+        return list(dict.fromkeys(
+            keyword.strip().lower() for keyword in lexicon.get('industry_keywords', []) if keyword.strip()
+        ))
+
     def _extract_skills(self, text: str) -> List[str]:
-        """Extract technical and soft skills from text"""
-        skills = []
-        
-        for pattern in self.skill_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            skills.extend(match.group(0) for match in matches)
+        """Extract technical and soft skills from text, as canonical skill names"""
+        return self._scan(text).skills
+
+    def _extract_years_experience(self, text: str) -> float:
+        """
+        Years of experience: the largest "N years" claim, or else the span
+        covered by date ranges such as "2019 - Present"
+        """
+        claimed = [float(years) for years in _YEARS.findall(text)]
+        if claimed:
+            return max(claimed)
         
-        return list(set(skills))
+        current_year = date.today().year
+        starts, ends = [], []
+        for start, end in _YEAR_RANGE.findall(text):
+            end_year = int(end) if end.isdigit() else current_year
+            if int(start) <= end_year <= current_year:
+                starts.append(int(start))
+                ends.append(end_year)
+        return float(max(ends) - min(starts)) if starts else 0.0
 
     def _determine_experience_level(self, text: str) -> str:
         """Determine experience level from resume"""
@@ -71,13 +209,16 @@ class ResumeAnalyzer:
     def _generate_suggestions(
         self,
         text: str,
-        target_role: Optional[str]
+        target_role: Optional[str],
+        action_verbs: Optional[List[str]] = None
     ) -> List[str]:
         """Generate resume improvement suggestions"""
         suggestions = []
         
         # Check action verb usage
-        if len(self._extract_action_verbs(text)) < 5:
+        if action_verbs is None:
+            action_verbs = self._extract_action_verbs(text)
+        if len(action_verbs) < 5:
             suggestions.append(
                 "Add more action verbs to describe your achievements"
             )
@@ -96,27 +237,46 @@ class ResumeAnalyzer:
         
         return suggestions
 
+    @property
+    def role_recommender(self):
+        """Role taxonomy used for skill gaps, loaded on first use"""
+        if self._role_recommender is None:
+            # Imported here: role matching loads the related-skill table
+            from .role_recommender import RoleRecommender
+            self._role_recommender = RoleRecommender(skills=self.skills)
+        return self._role_recommender
+
+    def _identify_skill_gaps(
+        self,
+        skills: List[str],
+        target_role: Optional[str]
+    ) -> Dict[str, List[str]]:
+        """Required skills of the target role the resume shows, and those it is missing"""
+        recommender = self.role_recommender
+        wanted = " ".join((target_role or '').lower().split())
+        for role in recommender.roles_data:
+            if role.lower() == wanted:
+                required = recommender.roles_data[role].get('required_skills', [])
+                missing = recommender._identify_skill_gaps(skills, required)
+                return {
+                    'matched_skills': [skill for skill in required if skill not in missing],
+                    'missing_skills': missing
+                }
+        return {}
+
     def _extract_action_verbs(self, text: str) -> List[str]:
         """Extract action verbs used in resume"""
-        used_verbs = []
-        
-        for verb in self.action_verbs:
-            if re.search(r'\b' + verb + r'\b', text, re.IGNORECASE):
-                used_verbs.append(verb)
-        
-        return used_verbs
+        return self._scan(text).action_verbs
+
+    def _keyword_density(self, scan: ResumeScan) -> Dict[str, float]:
+        """Occurrences per 100 words of each industry keyword the resume uses"""
+        if not scan.word_count:
+            return {}
+        return {
+            keyword: count / scan.word_count * 100
+            for keyword, count in scan.keyword_counts.items()
+        }
 
     def _calculate_keyword_density(self, text: str) -> Dict[str, float]:
         """Calculate density of industry keywords"""
-        word_count = len(text.split())
-        density = {}
-        
-        for keyword in self.industry_keywords:
-            matches = len(re.findall(
-                r'\b' + keyword + r'\b',
-                text,
-                re.IGNORECASE
-            ))
-            density[keyword] = matches / word_count * 100
-            
-        return density
+        return self._keyword_density(self._scan(text))
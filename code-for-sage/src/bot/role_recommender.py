@@ -2,10 +2,18 @@
 Role recommendation engine for career guidance
 """
 
-from typing import List, Dict, Any
+from collections import defaultdict
+from typing import List, Dict, Any, FrozenSet, Iterable, Mapping, Optional
+import heapq
 import json
+import logging
 from dataclasses import dataclass
 
+from .data_snapshot import get_data_snapshot
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+from .skill_similarity import SkillSimilarity
+from ..config import Config
+
 @dataclass
 class CareerRole:
     title: str
@@ -16,53 +24,177 @@ class CareerRole:
     job_demand: str
     remote_options: List[str]
 
+# Roles must score above this to be recommended
+MIN_MATCH_SCORE = 0.5
+
+class RoleIndex:
+    """
+    Inverted indexes over the role taxonomy, so a user is only scored
+    against roles that share a skill (or a related skill) with them:
+    - skill_roles: required skill ID -> role positions
+    - field_roles: related field -> role positions
+    """
+
+    def __init__(self, roles_data: Mapping[str, Any], skills: SkillDictionary, similarity: Optional[SkillSimilarity] = None):
+        self.skills = skills
+        self.similarity = similarity if similarity is not None else SkillSimilarity()
+        # Role details stay in roles_data (a lazy snapshot view when mapped); only titles and IDs are kept
+        self.roles_data = roles_data
+        self.titles: List[str] = []
+        self.required_ids: List[FrozenSet[int]] = []
+        self.field_counts: List[int] = []
+        self.skill_roles: Dict[int, List[int]] = defaultdict(list)
+        self.field_roles: Dict[str, List[int]] = defaultdict(list)
+        # Canonical name -> ID of every skill some role requires, for partial (substring) matches
+        self.required_by_name: Dict[str, int] = {}
+
+        for position, (title, details) in enumerate(roles_data.items()):
+            self.titles.append(title)
+            required_ids = frozenset(skills.ids(details.get('required_skills', [])))
+            self.required_ids.append(required_ids)
+            for skill_id in required_ids:
+                self.skill_roles[skill_id].append(position)
+                self.required_by_name[skills.names[skill_id]] = skill_id
+            fields = details.get('related_fields', [])
+            self.field_counts.append(len(fields))
+            for field in set(fields):
+                self.field_roles[field].append(position)
+
+        self.skill_roles = dict(self.skill_roles)
+        self.field_roles = dict(self.field_roles)
+        self.max_name_length = max(map(len, self.required_by_name), default=0)
+        self._partial_roles: Dict[int, FrozenSet[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def partial_roles(self, skill_id: int) -> FrozenSet[int]:
+        """Roles requiring a skill whose name is contained in this skill's name ("python" in "python django")"""
+        roles = self._partial_roles.get(skill_id)
+        if roles is None:
+            roles = self._partial_roles[skill_id] = self.roles_containing(self.skills.names[skill_id])
+        return roles
+
+    def roles_containing(self, name: str) -> FrozenSet[int]:
+        """Roles requiring a skill whose name is contained in `name`; not cached, for unknown skills"""
+        matched = set()
+        for start in range(len(name)):
+            for end in range(start + 1, min(len(name), start + self.max_name_length) + 1):
+                required_id = self.required_by_name.get(name[start:end])
+                if required_id is not None:
+                    matched.update(self.skill_roles[required_id])
+        return frozenset(matched)
+
+    def scores(
+        self,
+        user_skill_ids: FrozenSet[int],
+        interests: List[str],
+        weights: Dict[str, float],
+        unknown_skills: Iterable[str] = ()
+    ) -> Dict[int, float]:
+        """
+        Match score of every role that shares at least one exact, partial or
+        related skill with the user. Skills outside the dictionary
+        (`unknown_skills`, normalized names) can only match partially.
+        """
+        skill_scores: Dict[int, float] = defaultdict(float)
+        for skill_id in user_skill_ids:
+            exact = self.skill_roles.get(skill_id, ())
+            for position in exact:
+                skill_scores[position] += weights['exact_match']
+            partial = self.partial_roles(skill_id).difference(exact)
+            for position in partial:
+                skill_scores[position] += weights['partial_match']
+            related = set()
+            for related_id in self.similarity.neighbors(skill_id):
+                related.update(self.skill_roles.get(related_id, ()))
+            for position in related.difference(exact, partial):
+                skill_scores[position] += weights['related_match']
+        for name in unknown_skills:
+            for position in self.roles_containing(name):
+                skill_scores[position] += weights['partial_match']
+
+        interest_matches: Dict[int, int] = defaultdict(int)
+        for interest in interests:
+            for position in self.field_roles.get(interest, ()):
+                if position in skill_scores:
+                    interest_matches[position] += 1
+
+        return {
+            position: (skill_score * 0.6) + (
+                interest_matches[position] / self.field_counts[position] * 0.4 if self.field_counts[position] else 0.0
+            )
+            for position, skill_score in skill_scores.items()
+        }
+
 class RoleRecommender:
-    def __init__(self):
+    def __init__(self, skills: Optional[SkillDictionary] = None, similarity: Optional[SkillSimilarity] = None):
+        self.logger = logging.getLogger('sage.ai.roles')
+        self.skills = skills if skills is not None else get_skill_dictionary()
+        self.similarity = similarity if similarity is not None else SkillSimilarity.from_file(Config.SKILL_SIMILARITY_PATH, self.skills)
+        self.snapshot_version = 0
         self.roles_data = self._load_roles_data()
         self.skill_weights = {
             'exact_match': 1.0,
             'partial_match': 0.5,
             'related_match': 0.3
         }
+        self.index = RoleIndex(self.roles_data, self.skills, self.similarity)
 
-    def _load_roles_data(self) -> Dict[str, Any]:
-        """Load roles and their requirements from JSON"""
+    def _load_roles_data(self) -> Mapping[str, Any]:
+        """Load roles and their requirements from the data snapshot, or from JSON without one"""
+        snapshot = get_data_snapshot()
+        self.snapshot_version = snapshot.version
+        if snapshot.has_section('roles'):
+            return snapshot.view('roles')
         try:
             with open('data/roles/tech_roles.json', 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
+            self.logger.warning("No role data found (snapshot or data/roles/tech_roles.json)")
             return {}
 
+    def _refresh_roles(self):
+        """Re-index the roles when a rebuilt snapshot has been mapped"""
+        snapshot = get_data_snapshot()
+        snapshot.reload_if_changed()
+        if snapshot.version != self.snapshot_version and snapshot.has_section('roles'):
+            self.roles_data = self._load_roles_data()
+            self.index = RoleIndex(self.roles_data, self.skills, self.similarity)
+
     async def get_role_recommendations(
         self,
         user_skills: List[str],
         interests: List[str],
-        experience_level: str
+        experience_level: str,
+        k: int = 5
     ) -> List[Dict[str, Any]]:
-        """Get personalized role recommendations"""
-        matches = []
+        """Get personalized role recommendations, best `k` first"""
+        self._refresh_roles()
+        index = self.index
+        known_ids, unknown_skills = self.skills.split_known(user_skills)
+        scores = index.scores(frozenset(known_ids), interests, self.skill_weights, unknown_skills)
         
-        for role, details in self.roles_data.items():
-            score = self._calculate_match_score(
-                user_skills,
-                interests,
-                details
-            )
-            
-            if score > 0.5:  # Minimum match threshold
-                matches.append({
-                    'role': role,
-                    'match_score': score,
-                    'details': details,
-                    'skill_gaps': self._identify_skill_gaps(
-                        user_skills,
-                        details['required_skills']
-                    )
-                })
+        # Bounded heap over the candidates above the threshold; ties keep taxonomy order
+        top = heapq.nlargest(
+            k,
+            ((score, -position) for position, score in scores.items() if score > MIN_MATCH_SCORE)
+        )
         
-        # Sort by match score and return top 5
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:5]
+        matches = []
+        for score, negative_position in top:
+            role = index.titles[-negative_position]
+            details = index.roles_data[role]
+            matches.append({
+                'role': role,
+                'match_score': score,
+                'details': details,
+                'skill_gaps': self._identify_skill_gaps(
+                    user_skills,
+                    details['required_skills']
+                )
+            })
+        return matches
 
     def _calculate_match_score(
         self,
@@ -70,15 +202,22 @@ class RoleRecommender:
         interests: List[str],
         role_details: Dict
     ) -> float:
-        """Calculate how well user matches a role"""
+        """Calculate how well user matches a single role (RoleIndex.scores does this for all roles at once)"""
         skill_score = 0
-        required_skills = role_details['required_skills']
+        required_ids = self.skills.ids(role_details['required_skills'])
+        required_names = [self.skills.names[skill_id] for skill_id in required_ids]
         
-        # Calculate skill match
-        for skill in user_skills:
-            if skill in required_skills:
+        # Calculate skill match on canonical skills ("JS" counts for "JavaScript")
+        known_ids, unknown_skills = self.skills.split_known(user_skills)
+        for skill_id in frozenset(known_ids):
+            if skill_id in required_ids:
                 skill_score += self.skill_weights['exact_match']
-            elif any(s in skill for s in required_skills):
+            elif any(s in self.skills.names[skill_id] for s in required_names):
+                skill_score += self.skill_weights['partial_match']
+            elif any(self.similarity.similarity(skill_id, required_id) for required_id in required_ids):
+                skill_score += self.skill_weights['related_match']
+        for name in unknown_skills:
+            if any(s in name for s in required_names):
                 skill_score += self.skill_weights['partial_match']
         
         # Calculate interest match
@@ -96,7 +235,8 @@ class RoleRecommender:
         required_skills: List[str]
     ) -> List[str]:
         """Identify missing skills for a role"""
+        user_skill_ids = self.skills.lookup_ids(user_skills)
         return [
             skill for skill in required_skills
-            if skill not in user_skills
+            if self.skills.lookup(skill) not in user_skill_ids
         ]
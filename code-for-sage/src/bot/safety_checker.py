@@ -2,11 +2,12 @@
 AI Safety and Content Filtering for Sage
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import re
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 import logging
+from .moderation_lexicon import ModerationLexicon
+from .rate_limiter import SlidingWindowRateLimiter
 
 @dataclass
 class SafetyCheck:
@@ -14,14 +15,26 @@ class SafetyCheck:
     issues: List[str]
     filtered_content: str
 
+class FilterMatch(NamedTuple):
+    start: int
+    end: int
+    replacement: str
+    issue: str
+
 class SafetyChecker:
-    def __init__(self):
+    def __init__(
+        self,
+        rate_limit_store: Optional[object] = None,
+        lexicon: Optional[ModerationLexicon] = None
+    ):
         self.logger = logging.getLogger('sage.ai.safety')
-        self.request_history = {}
         self.rate_limits = {
             'user': 50,  # requests per hour
             'ip': 100    # requests per hour
         }
+        # Per-user and per-IP counters over a one-hour sliding window.
+        # Pass a shared store (see rate_limiter.SQLiteRateLimitStore) so limits hold across workers.
+        self.rate_limiter = rate_limit_store or SlidingWindowRateLimiter(window=3600)
         
         # Basic content filtering patterns
         self.filtered_patterns = [
@@ -29,48 +42,47 @@ class SafetyChecker:
             (r'(https?://\S+)', '[no-urls]'),
             (r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[no-phone-numbers]')
         ]
+        self._compiled_patterns = None
+        self._combined_pattern = None
+        
+        # Category-tagged blocklist for large term lists (hot-reloaded from its file)
+        self.lexicon = lexicon or ModerationLexicon()
     
     def check_rate_limit(self, user_id: str, ip: str) -> Tuple[bool, str]:
         """Check if request is within rate limits"""
-        current_time = datetime.now()
-        hour_ago = current_time - timedelta(hours=1)
-        
-        # Clean old entries
-        self.request_history = {
-            k: v for k, v in self.request_history.items()
-            if v['timestamp'] > hour_ago
-        }
-        
         # Check user limit
-        user_requests = len([
-            r for r in self.request_history.values()
-            if r['user_id'] == user_id and r['timestamp'] > hour_ago
-        ])
-        
-        if user_requests >= self.rate_limits['user']:
+        if self.rate_limiter.count(f"user:{user_id}") >= self.rate_limits['user']:
             return False, "User rate limit exceeded"
             
         # Check IP limit
-        ip_requests = len([
-            r for r in self.request_history.values()
-            if r['ip'] == ip and r['timestamp'] > hour_ago
-        ])
-        
-        if ip_requests >= self.rate_limits['ip']:
+        if self.rate_limiter.count(f"ip:{ip}") >= self.rate_limits['ip']:
             return False, "IP rate limit exceeded"
             
         return True, "OK"
     
+    def check_and_log(self, user_id: str, ip: str, request_type: str) -> Tuple[bool, str]:
+        """
+        Check the rate limits and count the request in one atomic step, so
+        concurrent requests (from any worker sharing the store) cannot all
+        pass the check before any of them is counted
+        """
+        user_key = f"user:{user_id}"
+        blocked = self.rate_limiter.hit_if_below([
+            (user_key, self.rate_limits['user']),
+            (f"ip:{ip}", self.rate_limits['ip'])
+        ])
+        if blocked is None:
+            return True, "OK"
+        if blocked == user_key:
+            return False, "User rate limit exceeded"
+        return False, "IP rate limit exceeded"
+    
     def filter_content(self, content: str) -> SafetyCheck:
         """Filter and check content for safety"""
-        issues = []
-        filtered_content = content
-        
-        # Apply content filters
-        for pattern, replacement in self.filtered_patterns:
-            if re.search(pattern, filtered_content):
-                issues.append(f"Found potentially unsafe content matching {pattern}")
-                filtered_content = re.sub(pattern, replacement, filtered_content)
+        # Detection and replacement in a single pass over the text
+        matches = self.find_matches(content)
+        issues = list(dict.fromkeys(match.issue for match in matches))
+        filtered_content = self.apply_matches(content, matches)
         
         # Check content length
         if len(content) > 4000:
@@ -83,12 +95,129 @@ class SafetyChecker:
             filtered_content=filtered_content
         )
     
+    def moderate(self, content: str) -> SafetyCheck:
+        """Check content against the moderation lexicon only (e.g. user input)"""
+        matches = self._lexicon_matches(content)
+        return SafetyCheck(
+            is_safe=not matches,
+            issues=list(dict.fromkeys(match.issue for match in matches)),
+            filtered_content=self.apply_matches(content, matches)
+        )
+    
+    def stream_filter(self, holdback: int = 64) -> 'StreamingContentFilter':
+        """Incremental filter for text that arrives in chunks (e.g. streamed completions)"""
+        return StreamingContentFilter(self, holdback)
+    
+    def find_matches(self, text: str) -> List[FilterMatch]:
+        """Non-overlapping pattern and lexicon matches in `text`, left to right"""
+        matches = self._lexicon_matches(text)
+        pattern = self._combined()
+        if pattern is not None:
+            for match in pattern.finditer(text):
+                if match.start() == match.end():
+                    continue
+                source, replacement = self._compiled_patterns[int(match.lastgroup[1:])]
+                matches.append(FilterMatch(
+                    match.start(),
+                    match.end(),
+                    replacement,
+                    f"Found potentially unsafe content matching {source}"
+                ))
+        if not matches:
+            return matches
+        
+        # Leftmost match wins, then the longest
+        matches.sort(key=lambda match: (match.start, -match.end))
+        selected = []
+        position = 0
+        for match in matches:
+            if match.start >= position:
+                selected.append(match)
+                position = match.end
+        return selected
+    
+    def _lexicon_matches(self, text: str) -> List[FilterMatch]:
+        return [
+            FilterMatch(start, end, '[filtered]', f"Matched moderation category: {category}")
+            for start, end, category in self.lexicon.find(text)
+        ]
+    
+    @staticmethod
+    def apply_matches(text: str, matches: List[FilterMatch]) -> str:
+        """Replace each matched span with its replacement"""
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for match in matches:
+            parts.append(text[position:match.start])
+            parts.append(match.replacement)
+            position = match.end
+        parts.append(text[position:])
+        return "".join(parts)
+    
+    def _combined(self) -> Optional[re.Pattern]:
+        """All filtered_patterns as one alternation, recompiled only when the list changes"""
+        patterns = tuple(self.filtered_patterns)
+        if patterns != self._compiled_patterns:
+            self._combined_pattern = re.compile('|'.join(
+                f'(?P<p{index}>{source})' for index, (source, _) in enumerate(patterns)
+            )) if patterns else None
+            self._compiled_patterns = patterns
+        return self._combined_pattern
+    
     def log_request(self, user_id: str, ip: str, request_type: str):
         """Log a request for rate limiting"""
-        request_id = f"{user_id}_{datetime.now().timestamp()}"
-        self.request_history[request_id] = {
-            'user_id': user_id,
-            'ip': ip,
-            'timestamp': datetime.now(),
-            'request_type': request_type
-        }
+        self.rate_limiter.hit(f"user:{user_id}")
+        self.rate_limiter.hit(f"ip:{ip}")
+
+
+class StreamingContentFilter:
+    """
+    Filters text chunk by chunk. Only the last `holdback` characters (rounded
+    back to a whitespace boundary) are held, so any match up to `holdback`
+    characters long, or any match within one whitespace-free token, is seen
+    whole before it is emitted.
+    """
+
+    def __init__(self, checker: SafetyChecker, holdback: int = 64):
+        self.checker = checker
+        self.holdback = holdback
+        self.max_buffer = holdback * 4
+        self.buffer = ""
+        self.issues: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the filtered text that is now safe to emit"""
+        self.buffer += chunk
+        if len(self.buffer) <= self.holdback:
+            return ""
+
+        cut = len(self.buffer) - self.holdback
+        boundary = max(self.buffer.rfind(' ', 0, cut + 1), self.buffer.rfind('\n', 0, cut + 1))
+        if boundary >= 0:
+            cut = boundary + 1
+        elif len(self.buffer) < self.max_buffer:
+            # One long token so far; wait for it to end unless the buffer is full
+            return ""
+        return self._emit(cut)
+
+    def flush(self) -> str:
+        """Filter and return whatever is still buffered"""
+        return self._emit(len(self.buffer))
+
+    def _emit(self, cut: int) -> str:
+        matches = self.checker.find_matches(self.buffer)
+        emitted = []
+        for match in matches:
+            if match.start >= cut:
+                break
+            # A match straddling the cut is already complete; emit it whole
+            cut = max(cut, match.end)
+            emitted.append(match)
+            if match.issue not in self.issues:
+                self.issues.append(match.issue)
+
+        text = self.checker.apply_matches(self.buffer[:cut], emitted)
+        self.buffer = self.buffer[cut:]
+        return text
@@ -0,0 +1,210 @@
+"""
+Central skill dictionary for Sage.
+Resolves free-text skills ("JS", "javascript", "Java Script") to one
+canonical name and a compact integer ID, so every matcher compares skills
+as ints instead of re-lowercasing strings.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import json
+import re
+import threading
+
+from ..config import Config
+from .data_snapshot import get_data_snapshot
+
+# Separators that never distinguish two skills: "Java Script", "java-script" and "javascript" are one key
+_KEY_SEPARATORS = re.compile(r"[\s\-_.]+")
+_WORD_CHARS = r"\w+#&"
+
+
+def skill_key(text: str) -> str:
+    """Lookup key for a skill string: lowercase with separators removed"""
+    return _KEY_SEPARATORS.sub('', str(text).lower())
+
+
+def display_name(text: str) -> str:
+    """Lowercase with whitespace collapsed"""
+    return " ".join(str(text).lower().split())
+
+
+def _spelling_pattern(alias: str) -> str:
+    """Regex for an alias that tolerates any separator where the alias has one ("node.js" ~ "Node JS")"""
+    parts = [re.escape(part) for part in _KEY_SEPARATORS.split(alias) if part]
+    return r"[\s\-_.]*".join(parts)
+
+
+class SkillDictionary:
+    """
+    Canonical skills with aliases and categories. Skills from trusted data
+    (catalog, roles, job listings) are interned on first sight, so they get
+    a stable ID for the life of the process. Request input only goes
+    through lookups (`lookup`, `lookup_ids`, `canonical`, `normalize_list`),
+    which never register anything, so user text cannot grow the dictionary.
+    Lookups of raw strings are cached.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None, raw_cache_size: int = 65536):
+        self.names: List[str] = []
+        self.categories: List[Optional[str]] = []
+        self._ids_by_key: Dict[str, int] = {}
+        self._aliases: Dict[int, List[str]] = {}
+        self._raw_cache: Dict[str, int] = {}
+        self._raw_cache_size = raw_cache_size
+        self._lock = threading.Lock()
+        self._text_pattern = None
+        self.known_count = 0
+
+        for name, entry in (entries or {}).items():
+            entry = entry or {}
+            skill_id = self._add(display_name(name), entry.get('category'))
+            self._aliases[skill_id] = [display_name(name)]
+            for alias in entry.get('aliases', []):
+                self._ids_by_key.setdefault(skill_key(alias), skill_id)
+                self._aliases[skill_id].append(display_name(alias))
+        self.known_count = len(self.names)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillDictionary':
+        """Load {"canonical": {"aliases": [...], "category": "..."}}; a missing file gives an empty dictionary"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, skill: str) -> int:
+        """ID for a skill string from trusted data, registering it if it has never been seen"""
+        skill_id = self._raw_cache.get(skill)
+        if skill_id is not None:
+            return skill_id
+        key = skill_key(skill)
+        skill_id = self._ids_by_key.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids_by_key.get(key)
+                if skill_id is None:
+                    skill_id = self._add(display_name(skill), None)
+        if len(self._raw_cache) >= self._raw_cache_size:
+            self._raw_cache.clear()
+        self._raw_cache[skill] = skill_id
+        return skill_id
+
+    def lookup(self, skill: str) -> Optional[int]:
+        """ID for a skill string, or None if it has never been seen"""
+        skill_id = self._raw_cache.get(skill)
+        if skill_id is not None:
+            return skill_id
+        return self._ids_by_key.get(skill_key(skill))
+
+    def canonical(self, skill: str) -> str:
+        """Canonical name for a skill string; unknown skills are only normalized, not registered"""
+        skill_id = self.lookup(skill)
+        return self.names[skill_id] if skill_id is not None else display_name(skill)
+
+    def ids(self, skills: Iterable[str]) -> Set[int]:
+        """IDs of skills from trusted data, interning new ones"""
+        return {self.intern(skill) for skill in skills}
+
+    def lookup_ids(self, skills: Iterable[str]) -> Set[int]:
+        """IDs of the known skills among request input; unknown skills are left out"""
+        found = (self.lookup(skill) for skill in skills)
+        return {skill_id for skill_id in found if skill_id is not None}
+
+    def split_known(self, skills: Iterable[str]) -> Tuple[Set[int], List[str]]:
+        """Request input as (IDs of known skills, normalized names of the unknown rest)"""
+        known: Set[int] = set()
+        unknown: Dict[str, str] = {}
+        for skill in skills:
+            skill_id = self.lookup(skill)
+            if skill_id is not None:
+                known.add(skill_id)
+            elif skill_key(skill):
+                unknown.setdefault(skill_key(skill), display_name(skill))
+        return known, list(unknown.values())
+
+    def canonical_list(self, skills: Iterable[str]) -> List[str]:
+        """Canonical names of skills from trusted data, de-duplicated, in first-seen order"""
+        return [self.names[skill_id] for skill_id in dict.fromkeys(self.intern(skill) for skill in skills)]
+
+    def normalize_list(self, skills: Iterable[str]) -> List[str]:
+        """Like canonical_list for request input: unknown skills are normalized but not registered"""
+        names: Dict[str, str] = {}
+        for skill in skills:
+            name = self.canonical(skill)
+            if name:
+                names.setdefault(skill_key(name), name)
+        return list(names.values())
+
+    def category(self, skill: str) -> Optional[str]:
+        skill_id = self.lookup(skill)
+        return self.categories[skill_id] if skill_id is not None else None
+
+    def parse_list(self, text: Optional[str]) -> List[str]:
+        """Canonical skills from comma-separated text (e.g. User.skills)"""
+        if not text:
+            return []
+        return self.normalize_list(part for part in text.split(',') if part.strip())
+
+    def aliases(self) -> Dict[int, List[str]]:
+        """Every spelling of every known (dictionary) skill, by ID"""
+        return self._aliases
+
+    def find_in_text(self, text: str) -> List[str]:
+        """Canonical names of the known skills mentioned in free text"""
+        pattern = self._text_matcher()
+        if pattern is None:
+            return []
+        return self.normalize_list(match.group(0) for match in pattern.finditer(text))
+
+    def _text_matcher(self):
+        if self._text_pattern is None and self._aliases:
+            spellings = sorted(
+                {alias for aliases in self._aliases.values() for alias in aliases},
+                key=len,
+                reverse=True
+            )
+            # Very short words ("go", "ai", "r") are only skills in text when written as acronyms
+            acronyms = [alias for alias in spellings if len(alias) <= 2 and alias.isalpha()]
+            words = [alias for alias in spellings if alias not in acronyms]
+            alternatives = []
+            if words:
+                alternatives.append("(?i:" + "|".join(_spelling_pattern(alias) for alias in words) + ")")
+            if acronyms:
+                alternatives.append("|".join(re.escape(alias.upper()) for alias in acronyms))
+            self._text_pattern = re.compile(
+                rf"(?<![{_WORD_CHARS}])(?:{'|'.join(alternatives)})(?![{_WORD_CHARS}])"
+            )
+        return self._text_pattern
+
+    def _add(self, name: str, category: Optional[str]) -> int:
+        skill_id = len(self.names)
+        self.names.append(name)
+        self.categories.append(category)
+        self._ids_by_key[skill_key(name)] = skill_id
+        return skill_id
+
+
+_default_dictionary: Optional[SkillDictionary] = None
+_default_lock = threading.Lock()
+
+
+def get_skill_dictionary() -> SkillDictionary:
+    """
+    The process-wide skill dictionary, loaded on first use from the data
+    snapshot or SKILL_DICTIONARY_PATH. Skill IDs are handed out for the
+    life of the process, so a rebuilt snapshot's skills apply on restart.
+    """
+    global _default_dictionary
+    if _default_dictionary is None:
+        with _default_lock:
+            if _default_dictionary is None:
+                snapshot = get_data_snapshot()
+                if snapshot.has_section('skills'):
+                    _default_dictionary = SkillDictionary(snapshot.section('skills'))
+                else:
+                    _default_dictionary = SkillDictionary.from_file(Config.SKILL_DICTIONARY_PATH)
+    return _default_dictionary
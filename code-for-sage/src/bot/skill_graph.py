@@ -0,0 +1,111 @@
+"""
+Prerequisite graph of skills for Sage.
+Edges and their transitive closure are computed once when the graph is
+loaded, so ordering a learner's missing skills is a small topological sort
+over the skills involved (and repeated orderings come from a cache).
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+import heapq
+import json
+
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+
+
+class SkillGraph:
+    """
+    Skill -> prerequisite skills, over skill dictionary IDs.
+    Cycles are rejected when the graph is built.
+    """
+
+    def __init__(
+        self,
+        prerequisites: Optional[Mapping[str, Iterable[str]]] = None,
+        skills: Optional[SkillDictionary] = None,
+        cache_size: int = 4096
+    ):
+        self.skills = skills if skills is not None else get_skill_dictionary()
+        self.direct: Dict[int, FrozenSet[int]] = {}
+        for skill, required in (prerequisites or {}).items():
+            skill_id = self.skills.intern(skill)
+            self.direct[skill_id] = self.direct.get(skill_id, frozenset()) | self.skills.ids(required)
+        self.closure = self._transitive_closure()
+        self._ordered_names = lru_cache(maxsize=cache_size)(self._topological_order)
+
+    @classmethod
+    def from_file(cls, path: str, skills: Optional[SkillDictionary] = None) -> 'SkillGraph':
+        """Load {"prerequisites": {"skill": ["prerequisite", ...]}}; a missing file gives an empty graph"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(skills=skills)
+        return cls(data.get('prerequisites', {}), skills)
+
+    def prerequisites_of(self, skill: str) -> FrozenSet[int]:
+        """IDs of every skill that must come before `skill`, directly or indirectly"""
+        return self.closure.get(self.skills.lookup(skill), frozenset())
+
+    def learning_order(self, durations: Mapping[str, float]) -> List[str]:
+        """
+        Skills in an order that respects prerequisites; among skills that are
+        ready to learn, shorter ones come first. Skills the dictionary does
+        not know have no prerequisites and are not registered.
+        """
+        by_name: Dict[str, List[str]] = {}
+        for skill in durations:
+            by_name.setdefault(self.skills.canonical(skill), []).append(skill)
+        key = tuple(sorted(
+            (name, min(durations[skill] for skill in skills)) for name, skills in by_name.items()
+        ))
+        return [skill for name in self._ordered_names(key) for skill in by_name[name]]
+
+    def _topological_order(self, weighted: Tuple[Tuple[str, float], ...]) -> Tuple[str, ...]:
+        weeks = dict(weighted)
+        names_by_id = {self.skills.lookup(name): name for name in weeks}
+        names_by_id.pop(None, None)
+        # Edges between the requested skills only; the closure keeps a -> x -> b as a -> b when x is absent
+        waiting_on = {
+            name: {names_by_id[prerequisite] for prerequisite in self.prerequisites_of(name) if prerequisite in names_by_id}
+            for name in weeks
+        }
+        unlocks: Dict[str, List[str]] = {}
+        for name, required in waiting_on.items():
+            for prerequisite in required:
+                unlocks.setdefault(prerequisite, []).append(name)
+        remaining = {name: len(required) for name, required in waiting_on.items()}
+
+        ready = [(weeks[name], name) for name, count in remaining.items() if not count]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, name = heapq.heappop(ready)
+            order.append(name)
+            for dependent in unlocks.get(name, ()):
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    heapq.heappush(ready, (weeks[dependent], dependent))
+        return tuple(order)
+
+    def _transitive_closure(self) -> Dict[int, FrozenSet[int]]:
+        closure: Dict[int, FrozenSet[int]] = {}
+        visiting = set()
+
+        def visit(skill_id: int) -> FrozenSet[int]:
+            if skill_id in closure:
+                return closure[skill_id]
+            if skill_id in visiting:
+                raise ValueError(f"Prerequisite cycle involving {self.skills.names[skill_id]!r}")
+            visiting.add(skill_id)
+            ancestors = set()
+            for prerequisite in self.direct.get(skill_id, ()):
+                ancestors.add(prerequisite)
+                ancestors.update(visit(prerequisite))
+            visiting.discard(skill_id)
+            closure[skill_id] = frozenset(ancestors)
+            return closure[skill_id]
+
+        for skill_id in list(self.direct):
+            visit(skill_id)
+        return closure
@@ -0,0 +1,55 @@
+"""
+Related-skill lookups for Sage.
+The similarity table is built offline (python -m src.batch.build_skill_similarity)
+and stored as fixed-width neighbor lists: skill names, neighbor indexes and
+float16 similarities in one .npz file. At request time this is a dict lookup.
+"""
+
+from typing import Dict, Optional
+
+from .skill_dictionary import SkillDictionary, get_skill_dictionary
+
+
+class SkillSimilarity:
+    """Nearest related skills of each skill, keyed by skill dictionary ID"""
+
+    def __init__(self, neighbors: Optional[Dict[int, Dict[int, float]]] = None):
+        self._neighbors = neighbors or {}
+
+    @classmethod
+    def from_file(cls, path: str, skills: Optional[SkillDictionary] = None) -> 'SkillSimilarity':
+        """Load a table written by the offline builder; a missing file gives an empty table"""
+        skills = skills if skills is not None else get_skill_dictionary()
+        try:
+            with open(path, 'rb') as f:
+                # numpy is only needed once a table exists
+                import numpy as np
+                data = np.load(f, allow_pickle=False)
+                names = data['names'].tolist()
+                neighbor_rows = data['neighbors'].tolist()
+                score_rows = data['scores'].astype('float32').tolist()
+        except FileNotFoundError:
+            return cls()
+
+        ids = [skills.intern(name) for name in names]
+        neighbors = {}
+        for skill_id, row, scores in zip(ids, neighbor_rows, score_rows):
+            related = {
+                ids[neighbor]: round(score, 3)
+                for neighbor, score in zip(row, scores)
+                if neighbor >= 0 and ids[neighbor] != skill_id
+            }
+            if related:
+                neighbors[skill_id] = related
+        return cls(neighbors)
+
+    def __len__(self) -> int:
+        return len(self._neighbors)
+
+    def neighbors(self, skill_id: int) -> Dict[int, float]:
+        """Related skill ID -> similarity, for the skills most related to `skill_id`"""
+        return self._neighbors.get(skill_id, {})
+
+    def similarity(self, skill_id: int, other_id: int) -> float:
+        """Similarity of `other_id` to `skill_id`, or 0.0 if it is not among its neighbors"""
+        return self._neighbors.get(skill_id, {}).get(other_id, 0.0)
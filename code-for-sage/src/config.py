@@ -3,6 +3,7 @@ Configuration settings for the application
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -44,6 +45,75 @@ class Config:
     
     # OpenAI Settings
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '100'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+    
+    # Adaptive concurrency and circuit breaker for OpenAI calls
+    OPENAI_CONCURRENCY_INITIAL = int(os.getenv('OPENAI_CONCURRENCY_INITIAL', '8'))
+    OPENAI_CONCURRENCY_MAX = int(os.getenv('OPENAI_CONCURRENCY_MAX', '64'))
+    OPENAI_LATENCY_TARGET = float(os.getenv('OPENAI_LATENCY_TARGET', '8'))
+    OPENAI_QUEUE_TIMEOUT = float(os.getenv('OPENAI_QUEUE_TIMEOUT', '30'))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
+    
+    # Model routing: JSON list of {"model", "base_url", "api_key", "timeout"},
+    # tried in order. Unset means gpt-3.5-turbo on the OpenAI API.
+    SAGE_MODEL_ROUTES = os.getenv('SAGE_MODEL_ROUTES')
+    OPENAI_HEDGE_ENABLED = os.getenv('OPENAI_HEDGE_ENABLED', 'false').lower() == 'true'
+    OPENAI_HEDGE_QUANTILE = float(os.getenv('OPENAI_HEDGE_QUANTILE', '0.95'))
+    OPENAI_HEDGE_MIN_DELAY = float(os.getenv('OPENAI_HEDGE_MIN_DELAY', '1.0'))
+    
+    # Rate-limit state: 'sqlite' is shared by all workers on a host, 'memory' is per process
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'sqlite')
+    RATE_LIMIT_DB_PATH = os.getenv(
+        'RATE_LIMIT_DB_PATH',
+        os.path.join(tempfile.gettempdir(), 'sage_rate_limits.db')
+    )
+    
+    # Run SafetyChecker's content filter over model output (streamed replies are filtered incrementally)
+    FILTER_MODEL_OUTPUT = os.getenv('FILTER_MODEL_OUTPUT', 'false').lower() == 'true'
+    
+    # Moderation lexicon (JSON or category<TAB>term lines); re-read when the file changes
+    MODERATION_LEXICON_PATH = os.getenv('MODERATION_LEXICON_PATH', 'data/moderation/lexicon.txt')
+    
+    # Skill dictionary: canonical skills with their aliases and categories
+    SKILL_DICTIONARY_PATH = os.getenv('SKILL_DICTIONARY_PATH', 'data/skills/dictionary.json')
+    
+    # Skill prerequisites used to order learning plans
+    SKILL_GRAPH_PATH = os.getenv('SKILL_GRAPH_PATH', 'data/skills/prerequisites.json')
+    
+    # Related-skill neighbor lists (built offline by src.batch.build_skill_similarity)
+    SKILL_SIMILARITY_PATH = os.getenv('SKILL_SIMILARITY_PATH', 'data/skills/related_skills.npz')
+    
+    # Compiled roles/prompts/skills snapshot (built by src.batch.build_snapshot), re-checked every few seconds
+    DATA_SNAPSHOT_PATH = os.getenv('DATA_SNAPSHOT_PATH', 'data/snapshot/sage_data.snap')
+    DATA_SNAPSHOT_CHECK_INTERVAL = float(os.getenv('DATA_SNAPSHOT_CHECK_INTERVAL', '5'))
+    
+    # Resume action verbs and industry keywords
+    RESUME_LEXICON_PATH = os.getenv('RESUME_LEXICON_PATH', 'data/resume/lexicon.json')
+    
+    # Bulk resume analysis results by content hash (src.batch.resumes)
+    RESUME_CACHE_PATH = os.getenv('RESUME_CACHE_PATH', 'instance/resume_cache.db')
+    
+    # Course catalog (JSON list or JSONL of courses)
+    COURSE_CATALOG_PATH = os.getenv('COURSE_CATALOG_PATH', 'data/courses/catalog.json')
+    
+    # Career roadmap cache (keyed by canonical skills, target job and weekly hours bucket)
+    ROADMAP_CACHE_SIZE = int(os.getenv('ROADMAP_CACHE_SIZE', '4096'))
+    ROADMAP_CACHE_TTL = float(os.getenv('ROADMAP_CACHE_TTL', '3600'))
+    ROADMAP_HOURS_BUCKET = float(os.getenv('ROADMAP_HOURS_BUCKET', '5'))
+    
+    # Conversation memory (estimated tokens per user)
+    CHAT_MEMORY_MAX_TOKENS = int(os.getenv('CHAT_MEMORY_MAX_TOKENS', '1500'))
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv('CHAT_SUMMARY_MAX_TOKENS', '300'))
+    CHAT_MAX_SESSIONS = int(os.getenv('CHAT_MAX_SESSIONS', '10000'))
+    
+    # Response cache for standalone questions
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2048'))
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', str(6 * 3600)))
+    RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.85'))
+    RESPONSE_CACHE_ORDER_SIMILARITY = float(os.getenv('RESPONSE_CACHE_ORDER_SIMILARITY', '0.8'))
     
     @classmethod
     def validate_config(cls):
@@ -0,0 +1,19 @@
+"""
+Stored recommendations for a user (written by the batch roadmap job)
+"""
+
+from sqlalchemy import ForeignKey
+from src.database import db
+
+class Recommendation(db.Model):
+    """Courses, companies and career paths recommended to a user, as JSON text"""
+    __tablename__ = 'recommendations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, ForeignKey('users.id'), nullable=False)
+    courses = db.Column(db.Text, nullable=True)
+    companies = db.Column(db.Text, nullable=True)
+    career_paths = db.Column(db.Text, nullable=True)
+
+    def __repr__(self):
+        return f"<Recommendation(user_id={self.user_id})>"
@@ -3,6 +3,7 @@ User model for Sage
 """
 
 from src.database import db
+from src.bot.skill_dictionary import get_skill_dictionary
 from sqlalchemy.orm import relationship
 
 class User(db.Model):
@@ -26,5 +27,9 @@ class User(db.Model):
     # Add the relationship to ChatHistory
     chat_history = relationship("ChatHistory", back_populates="user")
 
+    def skill_list(self):
+        """Canonical skill names from the comma-separated skills column"""
+        return get_skill_dictionary().parse_list(self.skills)
+
     def __repr__(self):
         return f"<User(username={self.email})>"
@@ -0,0 +1,126 @@
+"""
+Lazy service registry shared by the Flask app and the Sage blueprint.
+Each service is constructed once, on first use, so importing the app does
+no network calls and pulls in none of the heavy client libraries.
+"""
+
+from typing import Any, Callable, Dict, List
+import threading
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register a factory; the service is built on the first `get`"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def override(self, name: str, instance: Any):
+        """Install a ready-made instance (used by tests and scripts)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_created(self, name: str) -> bool:
+        return name in self._instances
+
+    def created(self) -> List[str]:
+        """Names of services that have been built so far"""
+        return list(self._instances)
+
+    def reset(self):
+        """Drop all built instances; factories stay registered"""
+        with self._lock:
+            self._instances.clear()
+
+
+registry = ServiceRegistry()
+
+
+def _create_sage_ai():
+    from src.bot.openai_handler import SageAI
+    return SageAI(
+        performance_monitor=get_performance_monitor(),
+        safety_checker=get_safety_checker()
+    )
+
+
+def _create_safety_checker():
+    from src.bot.moderation_lexicon import ModerationLexicon
+    from src.bot.rate_limiter import create_rate_limit_store
+    from src.bot.safety_checker import SafetyChecker
+    from src.config import Config
+    return SafetyChecker(
+        rate_limit_store=create_rate_limit_store(Config.RATE_LIMIT_BACKEND, Config.RATE_LIMIT_DB_PATH),
+        lexicon=ModerationLexicon(Config.MODERATION_LEXICON_PATH)
+    )
+
+
+def _create_performance_monitor():
+    from src.bot.performance_monitor import PerformanceMonitor
+    return PerformanceMonitor()
+
+
+def _create_course_recommender():
+    from src.bot.course_recommender import CourseRecommender
+    return CourseRecommender()
+
+
+def _create_linkedin_handler():
+    from src.bot.integrations.linkedin_handler import LinkedInDataHandler
+    return LinkedInDataHandler()
+
+
+def _create_market_insights():
+    from src.bot.market_insights import MarketInsights
+    return MarketInsights()
+
+
+registry.register('sage_ai', _create_sage_ai)
+registry.register('safety_checker', _create_safety_checker)
+registry.register('performance_monitor', _create_performance_monitor)
+registry.register('course_recommender', _create_course_recommender)
+registry.register('linkedin_handler', _create_linkedin_handler)
+registry.register('market_insights', _create_market_insights)
+
+
+def get_sage_ai():
+    return registry.get('sage_ai')
+
+
+def get_safety_checker():
+    return registry.get('safety_checker')
+
+
+def get_performance_monitor():
+    return registry.get('performance_monitor')
+
+
+def get_course_recommender():
+    return registry.get('course_recommender')
+
+
+def get_linkedin_handler():
+    return registry.get('linkedin_handler')
+
+
+def get_market_insights():
+    return registry.get('market_insights')
@@ -3,7 +3,24 @@ Utility functions for time calculations and schedule management
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import re
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MINUTES_PER_DAY = 24 * 60
+
+_DAY_GROUPS = {
+    'daily': range(7),
+    'everyday': range(7),
+    'weekdays': range(5),
+    'weekends': (5, 6)
+}
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+_INTERVAL_PATTERN = re.compile(rf"^\s*(?P<days>[a-z,\s\-]+?)\s+{_TIME}\s*-\s*{_TIME}", re.IGNORECASE)
+
+# (day index, start minute, end minute) within one day
+BusyInterval = Tuple[int, int, int]
 
 def calculate_study_blocks(
     total_hours: int,
@@ -13,55 +30,291 @@ def calculate_study_blocks(
     """Calculate optimal study block sizes"""
     if total_hours < 1:
         return [30]  # Minimum 30-minute blocks
-        
+
     hours_in_minutes = total_hours * 60
     optimal_block_size = min(max(min_block_size, hours_in_minutes // 3), max_block_size)
-    
+
     return [optimal_block_size] * (hours_in_minutes // optimal_block_size)
 
 def generate_weekly_schedule(
     available_hours: int,
-    preferred_times: List[str] = None
+    preferred_times: List[str] = None,
+    busy_intervals: Iterable[Union[str, Tuple]] = ()
 ) -> Dict:
-    """Generate a weekly schedule template"""
+    """Generate a weekly schedule that fits study blocks around commitments"""
     if not preferred_times:
         preferred_times = ['morning', 'evening']
-        
-    blocks = calculate_study_blocks(available_hours)
-    
+
+    plan = optimize_weekly_schedule(available_hours, busy_intervals, preferred_times)
+
     schedule = {
-        'recommended_blocks': blocks,
-        'daily_distribution': _distribute_hours(available_hours, 7),
-        'weekly_structure': _create_weekly_template(blocks, preferred_times)
+        'recommended_blocks': [block['minutes'] for block in plan['blocks']],
+        'daily_distribution': plan['daily_distribution'],
+        'weekly_structure': _create_weekly_template(plan['blocks'], preferred_times),
+        'unscheduled_hours': plan['unscheduled_hours']
     }
-    
-    return schedule
 
-def _distribute_hours(total_hours: int, days: int) -> List[float]:
-    """Distribute hours across days"""
-    base_hours = total_hours / days
-    return [round(base_hours, 1)] * days
+    return schedule
 
 def _create_weekly_template(
-    blocks: List[int],
+    blocks: List[Dict],
     preferred_times: List[str]
 ) -> Dict:
-    """Create a weekly schedule template"""
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    """Group the scheduled blocks by day"""
     schedule = {}
-    
-    for day in days:
+
+    for day in DAYS:
+        day_blocks = [block for block in blocks if block['day'] == day]
         schedule[day] = {
-            'recommended_blocks': len(blocks) // 7 or 1,
+            'recommended_blocks': len(day_blocks),
+            'blocks': [f"{block['start']}-{block['end']}" for block in day_blocks],
             'preferred_times': preferred_times,
             'flexibility': 'Adjust based on daily energy levels'
         }
-    
+
     return schedule
 
+def parse_time(value: Union[str, int]) -> int:
+    """Minutes after midnight for "HH:MM", "7pm", "7:30 am" or a minute count"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(_TIME, value.strip(), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Unrecognized time: {value!r}")
+    return _to_minutes(*match.groups())
+
+def _to_minutes(hours: str, minutes: Optional[str], meridiem: Optional[str]) -> int:
+    hour = int(hours)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+    total = hour * 60 + int(minutes or 0)
+    if not 0 <= total <= MINUTES_PER_DAY:
+        raise ValueError(f"Time out of range: {hours}:{minutes or '00'}")
+    return total
+
+def _parse_day(name: str) -> int:
+    name = name.strip().lower()
+    for index, day in enumerate(DAYS):
+        if len(name) >= 3 and day.lower().startswith(name):
+            return index
+    raise ValueError(f"Unrecognized day: {name!r}")
+
+def _parse_days(text: str) -> List[int]:
+    days = []
+    for part in text.lower().split(','):
+        part = part.strip()
+        if part in _DAY_GROUPS:
+            days.extend(_DAY_GROUPS[part])
+        elif '-' in part:
+            first, last = (_parse_day(name) for name in part.split('-', 1))
+            days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+        elif part:
+            days.append(_parse_day(part))
+    return days
+
+def parse_busy_interval(text: str) -> List[BusyInterval]:
+    """
+    Busy intervals from a commitment such as "Weekdays 9:00-17:00 work",
+    "Mon-Thu 6pm-8pm", "Weekdays 9-5" or "Sat, Sun 10:00-12:00". Intervals
+    that run past midnight continue on the next day.
+    """
+    match = _INTERVAL_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Unrecognized commitment: {text!r}")
+    groups = match.groups()
+    start = _to_minutes(*groups[1:4])
+    end = _to_minutes(*groups[4:7])
+    if end < start <= 12 * 60:
+        # "9-5" ends at 5pm; a morning start that ends before it otherwise is ambiguous
+        if groups[3] or groups[6] or int(groups[4]) == 0:
+            raise ValueError(f"Unrecognized commitment: {text!r}")
+        end += 12 * 60
+    intervals = []
+    for day in _parse_days(match.group('days')):
+        if end > start:
+            intervals.append((day, start, end))
+        else:
+            intervals.append((day, start, MINUTES_PER_DAY))
+            intervals.append(((day + 1) % 7, 0, end))
+    return intervals
+
+def _normalize_busy(busy_intervals: Iterable[Union[str, Tuple]]) -> List[List[Tuple[int, int]]]:
+    """Merged busy intervals per day"""
+    by_day: List[List[Tuple[int, int]]] = [[] for _ in DAYS]
+    for interval in busy_intervals:
+        if isinstance(interval, str):
+            parsed = parse_busy_interval(interval)
+        else:
+            day, start, end = interval
+            parsed = [(day if isinstance(day, int) else _parse_day(day), parse_time(start), parse_time(end))]
+        for day, start, end in parsed:
+            by_day[day].append((start, end))
+
+    merged = []
+    for intervals in by_day:
+        day_merged: List[Tuple[int, int]] = []
+        for start, end in sorted(intervals):
+            if day_merged and start <= day_merged[-1][1]:
+                day_merged[-1] = (day_merged[-1][0], max(day_merged[-1][1], end))
+            else:
+                day_merged.append((start, end))
+        merged.append(day_merged)
+    return merged
+
+@lru_cache(maxsize=64)
+def _preferred_windows(preferred_times: Tuple[str, ...], energy_patterns: Optional[Tuple]) -> Tuple[Tuple[int, int, str], ...]:
+    """(start, end, name) of each preferred time of day, in order of preference"""
+    if energy_patterns is None:
+        # Imported here so the scheduler stays usable without the rest of the learning tools
+        from .learning_utils import LearningUtils
+        patterns = LearningUtils().energy_patterns
+    else:
+        patterns = {name: {'peak_hours': peak_hours} for name, peak_hours in energy_patterns}
+    windows = []
+    for name in preferred_times:
+        if name in patterns:
+            start, end = patterns[name]['peak_hours']
+            windows.append((parse_time(start), parse_time(end), name))
+    return tuple(windows)
+
+def _split_by_windows(start: int, end: int, windows: Sequence[Tuple[int, int, str]]) -> List[Tuple[int, int, int, Optional[str]]]:
+    """Cut a free slot into (rank, start, end, window name); rank is the preference order, non-preferred last"""
+    cuts = {start, end}
+    for window_start, window_end, _ in windows:
+        cuts.update(point for point in (window_start, window_end) if start < point < end)
+    points = sorted(cuts)
+    pieces = []
+    for piece_start, piece_end in zip(points, points[1:]):
+        rank, name = len(windows), None
+        for index, (window_start, window_end, window_name) in enumerate(windows):
+            if window_start <= piece_start and piece_end <= window_end:
+                rank, name = index, window_name
+                break
+        pieces.append((rank, piece_start, piece_end, name))
+    return pieces
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def optimize_weekly_schedule(
+    available_hours: float,
+    busy_intervals: Iterable[Union[str, Tuple]] = (),
+    preferred_times: Optional[Sequence[str]] = None,
+    energy_patterns: Optional[Dict] = None,
+    min_block: int = 30,
+    max_block: int = 120,
+    break_minutes: int = 15,
+    day_start: str = '06:00',
+    day_end: str = '23:00',
+    max_daily_hours: float = 4,
+    max_steps: int = 20000
+) -> Dict:
+    """
+    Pack `available_hours` of study blocks into the free time around
+    `busy_intervals` (commitment strings or (day, start, end) tuples).
+
+    Greedy, in rounds: each round gives every day (least loaded first) one
+    block in its best free slot, preferring the user's peak energy windows
+    in order of preference. Blocks are `min_block`..`max_block` minutes with
+    a break between them. Solving stops after looking at `max_steps` free
+    slots, so the same input always gives the same plan; whatever was
+    placed by then is returned with `truncated` set.
+    """
+    preferred_times = tuple(preferred_times or ('morning', 'evening'))
+    patterns_key = tuple(sorted(
+        (name, tuple(pattern['peak_hours'])) for name, pattern in energy_patterns.items()
+    )) if energy_patterns else None
+    windows = _preferred_windows(preferred_times, patterns_key)
+    busy = _normalize_busy(busy_intervals)
+    first_minute, last_minute = parse_time(day_start), parse_time(day_end)
+
+    # Free slots per day, cut at window edges and ordered best first; each is [rank, cursor, end, name]
+    free_slots: List[List[List]] = []
+    for day in range(7):
+        slots = []
+        cursor = first_minute
+        for busy_start, busy_end in busy[day] + [(last_minute, last_minute)]:
+            if busy_start > cursor:
+                slots.extend(_split_by_windows(cursor, min(busy_start, last_minute), windows))
+            cursor = max(cursor, busy_end)
+            if cursor >= last_minute:
+                break
+        free_slots.append([list(slot) for slot in sorted(slots)])
+
+    remaining = int(round(max(available_hours, 0) * 60))
+    requested = remaining
+    daily_cap = int(max_daily_hours * 60)
+    used = [0] * 7
+    blocks: List[Dict] = []
+    steps = 0
+    truncated = False
+
+    while remaining > 0:
+        placed = False
+        for day in sorted(range(7), key=lambda index: used[index]):
+            if remaining <= 0:
+                break
+            wanted = min(max_block, remaining, daily_cap - used[day])
+            if wanted < min(min_block, remaining):
+                continue
+            for slot in free_slots[day]:
+                steps += 1
+                if steps > max_steps:
+                    truncated = True
+                    break
+                rank, cursor, end, name = slot
+                length = min(wanted, end - cursor)
+                if length < min(min_block, remaining):
+                    continue
+                slot[1] = cursor + length + break_minutes
+                used[day] += length
+                remaining -= length
+                blocks.append({
+                    'day': DAYS[day],
+                    'start': _format_minutes(cursor),
+                    'end': _format_minutes(cursor + length),
+                    'minutes': length,
+                    'time_of_day': name,
+                    '_order': (day, cursor)
+                })
+                placed = True
+                break
+            if truncated:
+                break
+        if truncated or not placed:
+            break
+
+    blocks.sort(key=lambda block: block.pop('_order'))
+    scheduled = requested - remaining
+    preferred_minutes = sum(block['minutes'] for block in blocks if block['time_of_day'])
+    return {
+        'blocks': blocks,
+        'requested_hours': round(requested / 60, 2),
+        'scheduled_hours': round(scheduled / 60, 2),
+        'unscheduled_hours': round(remaining / 60, 2),
+        'daily_distribution': [round(minutes / 60, 2) for minutes in used],
+        'preferred_share': round(preferred_minutes / scheduled, 2) if scheduled else 0.0,
+        'complete': remaining == 0,
+        'truncated': truncated
+    }
+
+def optimize_schedules(requests: Iterable[Dict], **defaults) -> List[Dict]:
+    """
+    Solve many users' weeks in one call. Each request holds the keyword
+    arguments of `optimize_weekly_schedule`; `defaults` fill in the rest.
+    A request that cannot be parsed gets {'error': ...} instead of a plan.
+    """
+    plans = []
+    for request in requests:
+        try:
+            plans.append(optimize_weekly_schedule(**{**defaults, **request}))
+        except (TypeError, ValueError) as e:
+            plans.append({'error': str(e)})
+    return plans
+
 def calculate_job_readiness_date(weeks_needed: int) -> str:
     """
     Calculate estimated date of job readiness
     """
     target_date = datetime.now() + timedelta(weeks=weeks_needed)
-    return target_date.strftime('%Y-%m-%d')
\ No newline at end of file
+    return target_date.strftime('%Y-%m-%d')
@@ -0,0 +1,130 @@
+"""
+Thread-safe LRU cache with per-entry expiry
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire after `ttl` seconds.
+    `on_evict(key, value)` is called whenever an entry leaves the cache
+    (eviction, expiry, explicit removal or clear).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 3600,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        timer: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry and mark it as recently used"""
+        with self._lock:
+            value = self._get_live(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry without touching recency or counters"""
+        with self._lock:
+            value = self._get_live(key)
+            return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Insert or replace an entry, evicting the least recently used if full"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._timer() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                old_value, _ = self._data.pop(key)
+                self._notify(key, old_value)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self.evictions += 1
+                self._notify(old_key, old_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, _ = self._data.pop(key)
+            self._notify(key, value)
+            return value
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            items = list(self._data.items())
+            self._data.clear()
+            for key, (value, _) in items:
+                self._notify(key, value)
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were removed"""
+        now = self._timer()
+        with self._lock:
+            expired = [
+                key for key, (_, expires_at) in self._data.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for key in expired:
+                value, _ = self._data.pop(key)
+                self._notify(key, value)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters for tuning"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get_live(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._timer():
+            del self._data[key]
+            self._notify(key, value)
+            return _MISSING
+        return value
+
+    def _notify(self, key: Hashable, value: Any):
+        if self.on_evict is not None:
+            self.on_evict(key, value)
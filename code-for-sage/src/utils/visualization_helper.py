@@ -2,12 +2,20 @@
 Data visualization utilities for market insights with interactive features
 """
 
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, List, Any, Optional
-import pandas as pd
 import json
 
+def _plotly():
+    """plotly is imported on first use to keep application startup fast"""
+    import plotly.graph_objects as go
+    return go
+
+
+def _pandas():
+    """pandas is imported on first use to keep application startup fast"""
+    import pandas as pd
+    return pd
+
 class MarketVisualizer:
     def __init__(self):
         self.color_scheme = {
@@ -34,6 +42,7 @@ class MarketVisualizer:
         add_annotations: bool = True
     ) -> str:
         """Create interactive salary comparison chart across regions"""
+        pd, go = _pandas(), _plotly()
         df = pd.DataFrame(salary_data)
         
         fig = go.Figure()
@@ -116,6 +125,7 @@ class MarketVisualizer:
         colorscale: Optional[str] = 'Viridis'
     ) -> str:
         """Create interactive heatmap of skill demand across regions"""
+        pd, go = _pandas(), _plotly()
         df = pd.DataFrame(skill_data)
         
         fig = go.Figure(data=go.Heatmap(
@@ -183,6 +193,7 @@ class MarketVisualizer:
         time_range: Optional[str] = 'YTD'
     ) -> str:
         """Create interactive trend chart with time range selector"""
+        pd, go = _pandas(), _plotly()
         df = pd.DataFrame(trend_data)
         
         fig = go.Figure()
@@ -265,6 +276,7 @@ class MarketVisualizer:
         enable_animation: bool = True
     ) -> str:
         """Create interactive radar chart of tech stack popularity"""
+        go = _plotly()
         fig = go.Figure()
         
         for i, region in enumerate(regions):
@@ -341,6 +353,7 @@ class MarketVisualizer:
         filename: Optional[str] = None
     ) -> str:
         """Export visualization to various formats"""
+        go = _plotly()
         fig = go.Figure(json.loads(fig_json))
         
         if format == 'html':
@@ -0,0 +1,103 @@
+"""
+Tests for the bulk resume analysis job
+"""
+
+import json
+from datetime import date
+
+from src.batch import resumes
+from src.batch.resumes import analyzer_fingerprint, main, resume_key
+from src.bot.resume_analyzer import ResumeAnalyzer
+from src.bot.skill_dictionary import SkillDictionary
+
+RESUME = """Data analyst with 3 years of experience.
+Built dashboards in SQL and Excel; automated reporting with Python, cutting prep time by 30%.
+Led, designed, analyzed and presented quarterly forecasts."""
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_directory_run_caches_duplicates_and_reuploads(tmp_path):
+    uploads = tmp_path / "uploads"
+    (uploads / "b").mkdir(parents=True)
+    (uploads / "a.txt").write_text(RESUME)
+    (uploads / "b" / "copy.txt").write_text("  " + RESUME.replace("\n", "\n\n") + "\n")
+    (uploads / "c.md").write_text("Junior developer. Built a React app with JavaScript.")
+    (uploads / "empty.txt").write_text("")
+    (uploads / "photo.png").write_bytes(b"\x89PNG")
+    output = tmp_path / "analyses.jsonl"
+    cache = tmp_path / "cache.db"
+    args = ['--input', str(uploads), '--output', str(output), '--cache', str(cache), '--batch-size', '2']
+
+    assert main(args + ['--workers', '1', '--target-role', 'Data Analyst']) == 0
+    records = _read(output)
+    assert [record['id'] for record in records] == ['a.txt', 'c.md', 'empty.txt', 'b/copy.txt']
+    first, second, empty, copy = records
+    assert first['success'] and not first['cached']
+    assert 'sql' in [skill.lower() for skill in first['analysis']['extracted_skills']]
+    assert first['analysis']['experience_level'] == 'mid'
+    assert 'missing_skills' in first['analysis']['skill_gaps']
+    assert not empty['success']
+    assert copy['cached'] and copy['analysis'] == first['analysis']
+    assert copy['content_hash'] == first['content_hash']
+
+    # A re-upload is served from the cache, even in a fresh run
+    assert main(args + ['--workers', '1', '--target-role', 'Data Analyst', '--restart']) == 0
+    assert all(record['cached'] for record in _read(output) if record['success'])
+    assert [record['analysis'] for record in _read(output)[:2]] == [first['analysis'], second['analysis']]
+
+
+def test_jsonl_run_in_a_process_pool_resumes_from_checkpoint(tmp_path):
+    documents = [
+        {'id': i, 'text': f"{RESUME}\nAlso knows skill number {i % 3}.", 'target_role': 'Data Scientist'}
+        for i in range(7)
+    ]
+    source = tmp_path / "resumes.jsonl"
+    source.write_text("".join(json.dumps(document) + "\n" for document in documents))
+    output = tmp_path / "analyses.jsonl"
+    args = ['--input', str(source), '--output', str(output), '--no-cache', '--batch-size', '2']
+
+    assert main(args + ['--workers', '1', '--limit', '3']) == 0
+    with open(output, 'a') as f:
+        f.write('{"id": 3, "partial')
+
+    assert main(args + ['--workers', '2']) == 0
+    records = _read(output)
+    assert [record['id'] for record in records] == list(range(7))
+    assert all(record['success'] for record in records)
+    # Three distinct texts; without a cache only repeats within a run are free (6 is a repeat of 3)
+    assert [record['id'] for record in records if record['cached']] == [6]
+    assert len({record['content_hash'] for record in records}) == 3
+
+
+def test_resume_key_normalizes_whitespace_but_not_case():
+    assert resume_key("Python  and\nSQL ", "Data Analyst", "f") == resume_key("Python and SQL", " data  analyst", "f")
+    assert resume_key("R and Go", None, "f") != resume_key("r and go", None, "f")
+    assert resume_key("Python", None, "f") != resume_key("Python", None, "g")
+
+
+def test_fingerprint_changes_with_the_role_taxonomy():
+    analyzer = ResumeAnalyzer(skills=SkillDictionary())
+    before = analyzer_fingerprint(analyzer)
+    assert analyzer_fingerprint(analyzer) == before
+
+    roles = analyzer.role_recommender.roles_data
+    analyzer.role_recommender.roles_data = dict(roles, **{'Data Wrangler': {'required_skills': ['SQL'], 'related_fields': []}})
+
+    assert analyzer_fingerprint(analyzer) != before
+
+
+def test_fingerprint_changes_with_the_year(monkeypatch):
+    analyzer = ResumeAnalyzer(skills=SkillDictionary())
+    before = analyzer_fingerprint(analyzer)
+
+    class NextYear(date):
+        @classmethod
+        def today(cls):
+            return date(date.today().year + 1, 1, 1)
+
+    monkeypatch.setattr(resumes, 'date', NextYear)
+
+    assert analyzer_fingerprint(analyzer) != before
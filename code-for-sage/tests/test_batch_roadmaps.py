@@ -0,0 +1,60 @@
+"""
+Tests for the batch roadmap job
+"""
+
+import json
+import sqlite3
+
+from src.batch.roadmaps import main
+
+USERS = [
+    {'id': 1, 'skills': 'python, statistics', 'job_preference': 'Data Analyst', 'available_hours': 8},
+    {'id': 2, 'skills': ['JS', 'HTML'], 'target_job': 'Web Developer'},
+    {'id': 3, 'skills': '', 'job_preference': 'Data Scientist', 'interests': 'ai'},
+    {'id': 4, 'skills': 'excel', 'short_term_career_goals': 'Business Analyst'},
+    {'id': 5, 'skills': 'sql', 'job_preference': 'Data Engineer'}
+]
+
+
+def test_jsonl_run_resumes_from_checkpoint(tmp_path):
+    users_file = tmp_path / "users.jsonl"
+    users_file.write_text("".join(json.dumps(user) + "\n" for user in USERS))
+    output = tmp_path / "roadmaps.jsonl"
+    args = ['--input', str(users_file), '--output', str(output), '--batch-size', '2']
+
+    assert main(args + ['--workers', '1', '--limit', '3']) == 0
+    first_run = output.read_text().splitlines()
+    assert [json.loads(line)['user_id'] for line in first_run] == [1, 2, 3]
+
+    # Simulate a crash after the checkpoint: half-written output past the saved offset is dropped
+    with open(output, 'a') as f:
+        f.write('{"user_id": 3, "partial')
+
+    assert main(args + ['--workers', '2']) == 0
+    plans = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [plan['user_id'] for plan in plans] == [1, 2, 3, 4, 5]
+    assert all(plan['success'] for plan in plans)
+    assert plans[0]['roadmap']['recommended_courses']['recommendations']
+    assert plans[1]['target_job'] == 'Web Developer'
+
+
+def test_users_table_to_recommendations_table(tmp_path):
+    database = str(tmp_path / "sage.db")
+    connection = sqlite3.connect(database)
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, skills TEXT, interests TEXT, job_preference TEXT)")
+    connection.executemany(
+        "INSERT INTO users (id, skills, job_preference) VALUES (?, ?, ?)",
+        [(user['id'], user['skills'] if isinstance(user['skills'], str) else ", ".join(user['skills']),
+          user.get('job_preference', 'Software Engineer')) for user in USERS]
+    )
+    connection.commit()
+
+    args = ['--from-db', database, '--to-db', database, '--workers', '1', '--batch-size', '2']
+    assert main(args) == 0
+    assert main(args + ['--restart']) == 0
+
+    rows = connection.execute("SELECT user_id, courses, career_paths FROM recommendations ORDER BY user_id").fetchall()
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert json.loads(rows[0][1])
+    assert json.loads(rows[0][2])['target_job'] == 'Data Analyst'
+    connection.close()
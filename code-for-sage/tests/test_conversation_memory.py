@@ -0,0 +1,44 @@
+"""
+Tests for per-user conversation memory
+"""
+
+from src.bot.conversation_memory import ConversationMemory
+
+
+def test_sessions_are_isolated():
+    memory = ConversationMemory()
+    memory.record_exchange("alice", "I like data science.", "Great choice!")
+
+    bob_messages = memory.build_messages("bob", "You are Sage.", "Hi")
+
+    assert bob_messages == [
+        {"role": "system", "content": "You are Sage."},
+        {"role": "user", "content": "Hi"}
+    ]
+    assert memory.has_history("alice")
+    assert not memory.has_history("bob")
+
+
+def test_window_stays_within_budget():
+    memory = ConversationMemory(max_tokens=200, summary_max_tokens=60)
+    long_answer = "Here is a detailed answer. " + "More detail. " * 40
+
+    for i in range(50):
+        memory.record_exchange("alice", f"Question number {i}?", long_answer)
+
+    assert memory.prompt_tokens("alice") <= 200 + 60 + 200
+    messages = memory.build_messages("alice", "You are Sage.", "And now?")
+    assert messages[1]["content"].startswith("Summary of the earlier conversation")
+    assert messages[-1] == {"role": "user", "content": "And now?"}
+    # The latest exchange is always kept verbatim
+    assert messages[-2]["content"] == long_answer
+
+
+def test_least_recent_sessions_are_evicted():
+    memory = ConversationMemory(max_sessions=2)
+    memory.record_exchange("a", "hi", "hello")
+    memory.record_exchange("b", "hi", "hello")
+    memory.record_exchange("c", "hi", "hello")
+
+    assert not memory.has_history("a")
+    assert memory.has_history("b") and memory.has_history("c")
@@ -3,8 +3,10 @@ Tests for the enhanced course recommender
 """
 
 import pytest
-from src.bot.course_recommender import CourseRecommender, LearningPace
+from src.bot.course_catalog import Course, CourseCatalog
+from src.bot.course_recommender import CourseRecommender, JobMatchLevel, LearningPace
 import asyncio
+import random
 
 @pytest.fixture
 def recommender():
@@ -71,9 +73,146 @@ async def test_course_recommendations():
     assert 'recommendations' in recommendations
     assert 'time_commitment_breakdown' in recommendations
 
+def _synthetic_catalog(size):
+    topics = ['web development', 'data science', 'cloud', 'cybersecurity', 'mobile development']
+    careers = ['frontend developer', 'data scientist', 'cloud engineer', 'security analyst', 'ios developer']
+    return CourseCatalog(
+        Course(
+            course_id=f"c{i}",
+            title=f"Course {i}",
+            provider="Test",
+            skills=[f"skill{i % 500}", f"skill{(i * 7) % 500}"],
+            topics=[topics[i % 5]],
+            careers=[careers[i % 5]],
+            level=('beginner', 'intermediate', 'advanced')[i % 3],
+            duration_weeks=4 + i % 8,
+            weekly_hours=2 + i % 10,
+            rating=(i % 50) / 10
+        )
+        for i in range(size)
+    )
+
+
+def test_catalog_ranks_courses_for_goal_and_hours():
+    recommender = CourseRecommender()
+
+    result = asyncio.run(recommender.get_personalized_courses(
+        user_skills=['Python'],
+        career_goal='Data Scientist',
+        available_hours_per_week=5,
+        learning_pace=LearningPace.MODERATE,
+        k=3
+    ))
+
+    assert result['success']
+    names = [course['course_name'] for course in result['recommendations']]
+    assert len(names) == 3
+    assert 'Introduction to Python' not in names  # already known
+    scores = [course['match_score'] for course in result['recommendations']]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_roadmap_gets_course_recommendations():
+    recommender = CourseRecommender()
+
+    roadmap = asyncio.run(recommender.get_career_roadmap(
+        ['python'],
+        {'title': 'Data Analyst', 'required_skills': ['python', 'sql', 'excel']},
+        6
+    ))
+
+    assert roadmap['success']
+    assert roadmap['recommended_courses']['recommendations']
+
+
+def test_roadmaps_are_cached_by_canonical_skills_and_hours_bucket():
+    recommender = CourseRecommender()
+    job = {'title': 'Data Analyst', 'required_skills': ['Python', 'SQL', 'Excel']}
+
+    first = asyncio.run(recommender.get_career_roadmap(['py', 'statistics'], job, 11))
+    again = asyncio.run(recommender.get_career_roadmap(['Statistics', 'Python'], dict(job), 14))
+    other_bucket = asyncio.run(recommender.get_career_roadmap(['python', 'statistics'], job, 16))
+
+    assert first['success']
+    assert again is first
+    assert other_bucket is not first
+    # A hit is exactly what a cold call for the bucket would plan
+    cold = asyncio.run(CourseRecommender().get_career_roadmap(['python', 'statistics'], job, 10))
+    assert cold == first
+    assert first['recommended_courses']['time_commitment_breakdown'] == recommender._generate_time_breakdown(10, 'moderate')
+    assert recommender.roadmap_cache.stats()['hits'] == 1
+
+    # New job listings do not touch roadmaps
+    asyncio.run(recommender.match_jobs_to_skills(['python'], _random_jobs(10)))
+    assert asyncio.run(recommender.get_career_roadmap(['python', 'statistics'], job, 12)) is first
+
+    recommender.reload_catalog(recommender.catalog)
+    assert asyncio.run(recommender.get_career_roadmap(['python', 'statistics'], job, 12)) is not first
+
+
+def test_large_catalog_only_ranks_goal_relevant_courses():
+    catalog = _synthetic_catalog(30000)
+
+    relevance = catalog._goal_relevance('Data Scientist', set())
+    top = catalog.top_courses(['skill1', 'skill2'], 'Data Scientist', 6, 'moderate', k=5)
+
+    # Only the data science fifth of the catalog shares a goal token; the rest is never scored
+    assert len(relevance) == 6000
+    assert all('data science' in catalog.courses[position].topics for position in relevance)
+    assert len(top) == 5
+    assert all('data science' in course.topics for _, course in top)
+
+
+def _random_jobs(count, seed=7):
+    rng = random.Random(seed)
+    skills = [f"Skill{i}" for i in range(300)] + ['Python', 'SQL', 'JavaScript']
+    return [
+        {
+            'title': f"Job {i}",
+            'company': f"Company {i % 50}",
+            'required_skills': rng.sample(skills, rng.randint(1, 6))
+        }
+        for i in range(count)
+    ]
+
+
+def test_vectorized_job_matching_agrees_with_per_job_scoring():
+    recommender = CourseRecommender()
+    jobs = _random_jobs(2000)
+    user_skills = ['python', 'SQL', 'javascript'] + [f"skill{i}" for i in range(0, 300, 3)]
+
+    for level in JobMatchLevel:
+        result = asyncio.run(recommender.match_jobs_to_skills(user_skills, jobs, level))
+
+        expected = [
+            (job['title'], recommender._calculate_job_match(user_skills, job['required_skills'], level))
+            for job in jobs
+        ]
+        expected = [(title, match) for title, match in expected if match['match_percentage'] > 50]
+        expected.sort(key=lambda item: item[1]['match_percentage'], reverse=True)
+
+        assert result['success']
+        assert result['total_matches'] == len(expected)
+        assert [(job['job_title'], job['match_score']) for job in result['matched_jobs']] == expected[:5]
+
+
+def test_job_matrix_is_built_once_per_listing():
+    recommender = CourseRecommender()
+    jobs = _random_jobs(20000)
+    matrix = recommender.index_jobs(jobs)
+
+    result = asyncio.run(recommender.match_jobs_to_skills(['python', 'sql', 'skill1', 'skill2'], jobs))
+
+    assert result['success'] and len(result['matched_jobs']) == 5
+    # Repeated matching against the same listings reuses one sparse row per job
+    assert recommender.index_jobs(jobs) is matrix
+    assert matrix.matrix.shape[0] == len(jobs)
+    assert matrix.matrix.nnz == sum(len(job['required_skills']) for job in jobs)
+
+
 if __name__ == "__main__":
     # Run async tests
     asyncio.run(test_course_recommendations())
     
     # Run sync tests
-    test_time_breakdown()
\ No newline at end of file
+    test_time_breakdown()
@@ -0,0 +1,111 @@
+"""
+Tests for the memory-mapped data snapshot
+"""
+
+import asyncio
+import os
+
+from src.batch.build_snapshot import build_sections
+from src.bot import data_snapshot
+from src.bot.data_snapshot import DataSnapshot, write_snapshot
+from src.bot.prompt_manager import PromptManager
+from src.bot.role_recommender import RoleRecommender
+from src.bot.skill_dictionary import SkillDictionary
+from src.bot.skill_similarity import SkillSimilarity
+
+ROLES = {
+    'Data Analyst': {'required_skills': ['SQL', 'Excel'], 'related_fields': ['data']},
+    'Backend Developer': {'required_skills': ['Python', 'SQL'], 'related_fields': ['web']}
+}
+
+
+def _touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_round_trip_keeps_order_and_finds_keys(tmp_path):
+    path = str(tmp_path / "data.snap")
+    records = {f"key{i}": {'value': i, 'name': f"é{i}"} for i in range(500, 0, -1)}
+    write_snapshot(path, {'roles': ROLES, 'big': records, 'empty': {}})
+
+    snapshot = DataSnapshot(path)
+
+    assert snapshot.section('roles') == ROLES
+    assert snapshot.keys('big') == list(records)
+    assert snapshot.get('big', 'key250') == {'value': 250, 'name': "é250"}
+    assert snapshot.get('big', 'key0') is None and snapshot.get('missing', 'key1', 'x') == 'x'
+    assert snapshot.section('empty') == {} and not snapshot.has_section('missing')
+
+
+def test_missing_or_corrupt_file_is_an_empty_snapshot(tmp_path):
+    snapshot = DataSnapshot(str(tmp_path / "missing.snap"))
+    assert snapshot.version == 0 and snapshot.section('roles') == {}
+
+    corrupt = tmp_path / "corrupt.snap"
+    corrupt.write_bytes(b"not a snapshot at all, just some bytes")
+    assert DataSnapshot(str(corrupt)).version == 0
+
+
+def test_rebuilt_file_is_picked_up_by_mtime(tmp_path):
+    path = str(tmp_path / "data.snap")
+    write_snapshot(path, {'prompts': {'greeting': {'template': "Hi {name}"}}})
+    snapshot = DataSnapshot(path, check_interval=0)
+    old_prompts = snapshot.section('prompts')
+
+    write_snapshot(path, {'prompts': {'greeting': {'template': "Hello {name}"}}})
+    _touch_later(path)
+
+    assert snapshot.reload_if_changed() and snapshot.version == 2
+    assert snapshot.get('prompts', 'greeting')['template'] == "Hello {name}"
+    assert old_prompts['greeting']['template'] == "Hi {name}"
+    assert not snapshot.reload_if_changed()
+
+
+def test_view_decodes_records_on_access_and_keeps_its_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.snap")
+    write_snapshot(path, {'roles': ROLES})
+    snapshot = DataSnapshot(path, check_interval=0)
+    view = snapshot.view('roles')
+    decoded = []
+    value = data_snapshot._Mapping.value
+    monkeypatch.setattr(data_snapshot._Mapping, 'value', lambda self, *args: decoded.append(args) or value(self, *args))
+
+    assert list(view) == list(ROLES) and len(view) == 2 and not decoded
+    assert view['Backend Developer'] == ROLES['Backend Developer'] and len(decoded) == 1
+    assert 'Astronaut' not in view and snapshot.view('missing') == {}
+
+    write_snapshot(path, {'roles': {'Astronaut': {'required_skills': [], 'related_fields': []}}})
+    _touch_later(path)
+    assert snapshot.reload_if_changed()
+    assert view == ROLES and list(snapshot.view('roles')) == ['Astronaut']
+
+
+def test_workers_reindex_roles_and_prompts_from_a_new_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.snap")
+    write_snapshot(path, {'roles': ROLES, 'prompts': {'advice': {'template': "Learn {skill}"}}})
+    snapshot = DataSnapshot(path, check_interval=0)
+    monkeypatch.setattr(data_snapshot, '_default_snapshot', snapshot)
+
+    recommender = RoleRecommender(skills=SkillDictionary(), similarity=SkillSimilarity())
+    prompts = PromptManager()
+    assert recommender.roles_data == ROLES
+    assert prompts.get_prompt('advice', {'skill': "SQL"}) == "Learn SQL"
+
+    updated = dict(ROLES, **{'Python Developer': {'required_skills': ['Python'], 'related_fields': ['web']}})
+    write_snapshot(path, {'roles': updated, 'prompts': {'advice': {'template': "Practice {skill}"}}})
+    _touch_later(path)
+
+    result = asyncio.run(recommender.get_role_recommendations(['python'], ['web'], 'entry'))
+    assert [match['role'] for match in result] == ['Backend Developer', 'Python Developer']
+    assert prompts.get_prompt('advice', {'skill': "SQL"}) == "Practice SQL"
+
+
+def test_builder_skips_missing_sources(tmp_path):
+    roles_path = tmp_path / "roles.json"
+    roles_path.write_text('{"Data Analyst": {"required_skills": ["SQL"], "related_fields": []}}')
+
+    sections = build_sections(str(roles_path), str(tmp_path / "prompts.json"), 'data/skills/dictionary.json')
+
+    assert list(sections) == ['roles', 'skills']
+    assert 'javascript' in sections['skills']
@@ -0,0 +1,115 @@
+"""
+Tests for the Prometheus /metrics endpoint and the chat path's counters
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import src.app as sage_app
+from src.bot.performance_monitor import PerformanceMonitor
+from src.bot.safety_checker import SafetyCheck
+from src.database import db
+from src.services import registry
+
+project_root = Path(__file__).parent.parent
+
+
+class FakeSafetyChecker:
+    def __init__(self, allowed=True):
+        self.allowed = allowed
+
+    def check_and_log(self, user_id, ip, request_type):
+        return (True, "OK") if self.allowed else (False, "User rate limit exceeded")
+
+    def moderate(self, content):
+        return SafetyCheck(is_safe=True, issues=[], filtered_content=content)
+
+
+class FakeSageAI:
+    async def chat_async(self, message, user_id):
+        return f"echo: {message}"
+
+
+def _in_memory_db(app):
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('FLASK_ENV', 'testing')
+    monkeypatch.setattr(sage_app, 'init_db', _in_memory_db)
+    registry.reset()
+    registry.override('performance_monitor', PerformanceMonitor())
+    registry.override('sage_ai', FakeSageAI())
+    registry.override('safety_checker', FakeSafetyChecker())
+    app = sage_app.create_app()
+    yield app.test_client()
+    registry.reset()
+
+
+def _metric(client, line_prefix):
+    body = client.get('/metrics').get_data(as_text=True)
+    for line in body.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_request_latency_is_recorded_per_route(client):
+    response = client.post('/api/sage/chat', json={'message': 'hi'})
+
+    assert response.status_code == 200
+    assert _metric(
+        client,
+        'sage_request_latency_seconds_count{method="POST",route="/api/sage/chat",status="200"}'
+    ) == 1.0
+
+
+def test_rate_limit_rejections_are_counted(client):
+    registry.override('safety_checker', FakeSafetyChecker(allowed=False))
+
+    response = client.post('/api/sage/chat', json={'message': 'hi'})
+
+    assert response.status_code == 429
+    assert _metric(client, 'sage_rate_limit_rejections_total{route="chat"}') == 1.0
+
+
+def test_db_errors_are_counted(client, monkeypatch):
+    monkeypatch.setattr(db.session, 'commit', _fail)
+
+    response = client.post('/api/sage/chat', json={'message': 'hi'})
+
+    assert response.status_code == 500
+    assert _metric(client, 'sage_db_errors_total{operation="save_chat_history"}') == 1.0
+
+
+def _fail():
+    raise RuntimeError("database is locked")
+
+
+def _run(script, env):
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=project_root, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_workers_share_metrics_in_multiprocess_mode(tmp_path):
+    # Each subprocess stands in for one gunicorn worker
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2):
+        _run("from src.bot.performance_monitor import PerformanceMonitor\n"
+             "PerformanceMonitor().record_cache_hit('response')", env)
+
+    body = _run("from src.bot.performance_monitor import PerformanceMonitor\n"
+                "print(PerformanceMonitor().export()[0].decode())", env)
+
+    assert 'sage_cache_hits_total{cache="response"} 2.0' in body.splitlines()
@@ -0,0 +1,119 @@
+"""
+Tests for model routing: fallback, per-model timeouts and hedged requests
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from src.bot.model_router import ModelEndpoint, ModelRoute, ModelRouter, parse_model_routes
+from src.bot.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+
+
+class FakeModel:
+    """Completions for one endpoint; `delays` are used call by call"""
+
+    def __init__(self, name, delays=(0.0,), fail=False):
+        self.name = name
+        self.delays = list(delays)
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise APIConnectionError(request=httpx.Request('POST', 'http://test'))
+        if kwargs.get('stream'):
+            return self._stream()
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"{self.name} #{self.calls}"))]
+        )
+
+    async def _stream(self):
+        for delta in (self.name, " says hi"):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+
+def make_router(models, timeout=5.0, **kwargs):
+    routes = [
+        ModelRoute(ModelEndpoint(model=name, timeout=timeout), AdaptiveConcurrencyLimiter(), CircuitBreaker())
+        for name in models
+    ]
+    return ModelRouter(
+        routes,
+        client_factory=lambda endpoint: SimpleNamespace(
+            chat=SimpleNamespace(completions=models[endpoint.model])
+        ),
+        **kwargs
+    )
+
+
+def test_parse_routes_defaults_and_local_endpoint():
+    assert parse_model_routes(None, "gpt-3.5-turbo", 30) == [ModelEndpoint("gpt-3.5-turbo", timeout=30)]
+
+    endpoints = parse_model_routes(
+        '[{"model": "gpt-4o-mini", "timeout": 10},'
+        ' {"model": "llama3", "base_url": "http://localhost:8000/v1", "api_key": "local"}]',
+        "gpt-3.5-turbo",
+        30
+    )
+    assert [e.model for e in endpoints] == ["gpt-4o-mini", "llama3"]
+    assert endpoints[0].timeout == 10
+    assert endpoints[1].base_url == "http://localhost:8000/v1"
+
+    with pytest.raises(ValueError):
+        parse_model_routes('[{"base_url": "http://x"}]', "gpt-3.5-turbo", 30)
+
+
+def test_falls_back_on_error_and_timeout():
+    models = {
+        'primary': FakeModel('primary', fail=True),
+        'slow': FakeModel('slow', delays=[1.0]),
+        'local': FakeModel('local')
+    }
+    router = make_router(models, timeout=0.1)
+
+    completion = asyncio.run(router.complete([{"role": "user", "content": "hi"}]))
+
+    assert completion.model == 'local'
+    assert completion.content == 'local #1'
+    assert router.fallbacks == 2
+    assert router.routes[0].circuit_breaker.consecutive_failures == 1
+    assert router.routes[1].circuit_breaker.consecutive_failures == 1
+
+
+def test_hedged_request_takes_the_first_answer():
+    # First call hangs past the hedge delay; the duplicate answers quickly
+    models = {'primary': FakeModel('primary', delays=[1.0, 0.0])}
+    router = make_router(models, hedge_enabled=True, hedge_min_delay=0.05)
+    router.routes[0].latencies.extend([0.01] * 20)
+
+    completion = asyncio.run(router.complete([{"role": "user", "content": "hi"}]))
+
+    assert completion.content == 'primary #2'
+    # The hung first call is cancelled rather than awaited
+    assert models['primary'].calls == 2 and models['primary'].cancelled == 1
+    assert router.hedged_requests == 1
+    assert router.hedge_wins == 1
+    assert router.routes[0].limiter.in_flight == 0
+
+
+def test_stream_falls_back_before_first_token():
+    models = {'primary': FakeModel('primary', fail=True), 'local': FakeModel('local')}
+    router = make_router(models)
+
+    async def collect():
+        return [delta async for delta in router.stream([{"role": "user", "content": "hi"}])]
+
+    assert asyncio.run(collect()) == ['local', ' says hi']
+    assert all(route.limiter.in_flight == 0 for route in router.routes)
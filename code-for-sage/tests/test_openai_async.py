@@ -0,0 +1,141 @@
+"""
+Tests for the non-blocking OpenAI chat path
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot import openai_handler
+from src.bot.openai_handler import SageAI
+from src.bot.personality import SAGE_PERSONALITY
+from src.bot.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker
+
+
+class FakeCompletions:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.stream_deltas = ["Learn ", "Python ", "first."]
+
+    async def create(self, **kwargs):
+        if kwargs.get('stream'):
+            return self._stream(self.stream_deltas)
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        content = f"echo: {kwargs['messages'][-1]['content']}"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        )
+
+    async def _stream(self, deltas):
+        for delta in deltas:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))]
+            )
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(openai_handler, 'OpenAI', lambda api_key: SimpleNamespace(
+        models=SimpleNamespace(list=lambda: [])
+    ))
+    fake = FakeCompletions(delay=0.2)
+    monkeypatch.setattr(
+        openai_handler,
+        'get_async_client',
+        lambda api_key, base_url=None: SimpleNamespace(chat=SimpleNamespace(completions=fake))
+    )
+    return fake
+
+
+def test_concurrent_chats_share_one_loop(completions):
+    """Many chats from one caller should overlap instead of queueing"""
+    sage = SageAI()
+    sage.router.primary.limiter = AdaptiveConcurrencyLimiter(initial_limit=32)
+
+    async def run_many():
+        return await asyncio.gather(*[
+            sage.chat_async(f"question {i}") for i in range(20)
+        ])
+
+    responses = asyncio.run(run_many())
+
+    assert responses == [f"echo: question {i}" for i in range(20)]
+    assert completions.max_in_flight == 20
+
+
+def test_identical_questions_share_one_upstream_call(completions):
+    sage = SageAI()
+
+    async def ask_together():
+        return await asyncio.gather(*[
+            sage.chat_async("What skills do I need for data science?", f"user_{i}")
+            for i in range(10)
+        ])
+
+    responses = asyncio.run(ask_together())
+
+    assert len(set(responses)) == 1
+    assert completions.calls == 1
+    assert sage.single_flight.stats()['coalesced'] == 9
+
+
+def test_blocking_chat_uses_async_path(completions):
+    sage = SageAI()
+
+    assert sage.chat("hello") == "echo: hello"
+
+
+def test_stream_chat_yields_deltas(completions):
+    sage = SageAI()
+
+    deltas = list(sage.stream_chat("where do I start?"))
+
+    assert deltas == ["Learn ", "Python ", "first."]
+    history = sage.memory.build_messages("default", "system", "next")
+    assert history[-2] == {"role": "assistant", "content": "Learn Python first."}
+
+
+def test_open_circuit_returns_personality_error(completions):
+    sage = SageAI()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    sage.router.primary.circuit_breaker = breaker
+
+    response = sage.chat("Is anyone there?")
+
+    assert response == " ".join(SAGE_PERSONALITY['error_messages']['api_error'].split())
+    assert completions.calls == 0
+
+
+def test_completions_are_recorded_in_metrics(completions):
+    sage = SageAI()
+
+    sage.chat("How do I become a data analyst?", "user_a")
+    sage.chat("How do I become a data analyst?", "user_b")
+
+    registry = sage.performance_monitor.registry
+    labels = {'model': 'gpt-3.5-turbo', 'request_type': 'chat'}
+    assert registry.get_sample_value('sage_openai_latency_seconds_count', labels) == 1.0
+    assert registry.get_sample_value('sage_prompt_tokens_sum', {'model': 'gpt-3.5-turbo'}) == 10.0
+    assert registry.get_sample_value('sage_cache_hits_total', {'cache': 'response'}) == 1.0
+
+
+def test_streamed_output_is_filtered_when_enabled(completions, monkeypatch):
+    monkeypatch.setattr(openai_handler.Config, 'FILTER_MODEL_OUTPUT', True)
+    sage = SageAI()
+    completions.stream_deltas = ["Apply at https://jobs.", "example.com/apply ", "today."]
+
+    reply = "".join(sage.stream_chat("where do I apply?"))
+
+    assert reply == "Apply at [no-urls] today."
@@ -0,0 +1,86 @@
+"""
+Tests for the sliding-window rate limiter and SafetyChecker's limits
+"""
+
+import multiprocessing
+
+from src.bot.rate_limiter import SQLiteRateLimitStore, SlidingWindowRateLimiter
+from src.bot.safety_checker import SafetyChecker
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_previous_window_is_weighted_by_overlap():
+    clock = FakeClock(0.0)
+    limiter = SlidingWindowRateLimiter(window=100, timer=clock)
+    for _ in range(10):
+        limiter.hit('alice')
+
+    clock.now = 125  # a quarter into the next window: 75% of the old hits still count
+    assert limiter.count('alice') == 7.5
+
+    clock.now = 250  # two windows later nothing is left
+    assert limiter.count('alice') == 0
+
+
+def test_memory_is_bounded():
+    limiter = SlidingWindowRateLimiter(window=100, max_keys=3, timer=FakeClock())
+    for key in 'abcde':
+        limiter.hit(key)
+
+    assert len(limiter) == 3
+    assert limiter.count('a') == 0
+    assert limiter.count('e') == 1
+
+
+def test_safety_checker_enforces_user_and_ip_limits():
+    checker = SafetyChecker()
+    checker.rate_limits = {'user': 2, 'ip': 3}
+
+    for _ in range(2):
+        assert checker.check_rate_limit('alice', '10.0.0.1') == (True, "OK")
+        checker.log_request('alice', '10.0.0.1', 'chat')
+    assert checker.check_rate_limit('alice', '10.0.0.1') == (False, "User rate limit exceeded")
+
+    checker.log_request('bob', '10.0.0.1', 'chat')
+    assert checker.check_rate_limit('carol', '10.0.0.1') == (False, "IP rate limit exceeded")
+    assert checker.check_rate_limit('carol', '10.0.0.2') == (True, "OK")
+
+
+def _hammer(path, attempts, results):
+    store = SQLiteRateLimitStore(path)
+    allowed = sum(
+        store.hit_if_below([('user:alice', 100), ('ip:10.0.0.1', 1000)]) is None
+        for _ in range(attempts)
+    )
+    results.put(allowed)
+
+
+def test_sqlite_store_holds_the_limit_across_processes(tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    SQLiteRateLimitStore(path)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_hammer, args=(path, 50, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert sum(results.get(timeout=5) for _ in workers) == 100
+    assert SQLiteRateLimitStore(path).count('user:alice') == 100
+
+
+def test_check_and_log_reports_which_limit_was_hit(tmp_path):
+    checker = SafetyChecker(rate_limit_store=SQLiteRateLimitStore(str(tmp_path / 'limits.db')))
+    checker.rate_limits = {'user': 1, 'ip': 2}
+
+    assert checker.check_and_log('alice', '10.0.0.1', 'chat') == (True, "OK")
+    assert checker.check_and_log('alice', '10.0.0.1', 'chat') == (False, "User rate limit exceeded")
+    assert checker.check_and_log('bob', '10.0.0.1', 'chat') == (True, "OK")
+    assert checker.check_and_log('carol', '10.0.0.1', 'chat') == (False, "IP rate limit exceeded")
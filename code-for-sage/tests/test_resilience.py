@@ -0,0 +1,74 @@
+"""
+Tests for the adaptive concurrency limiter and circuit breaker
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    CircuitState,
+    UpstreamUnavailableError
+)
+
+
+def test_limit_grows_when_healthy_and_halves_on_overload():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=16, decrease_cooldown=0)
+        for _ in range(40):
+            await limiter.acquire()
+            limiter.release(latency=0.1)
+        grown = limiter.limit
+
+        await limiter.acquire()
+        limiter.release(latency=None, overloaded=True)
+        return grown, limiter.limit
+
+    grown, after_overload = asyncio.run(scenario())
+
+    assert grown > 4
+    assert after_overload < grown
+
+
+def test_callers_queue_beyond_the_limit():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, queue_timeout=0.05)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        with pytest.raises(UpstreamUnavailableError):
+            await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.release(latency=0.1)
+        await asyncio.wait_for(waiter, 1)
+        return limiter.in_flight
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_breaker_opens_then_recovers_after_a_trial_call():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0)
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    # reset_timeout has elapsed: exactly one trial is allowed through
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_open_breaker_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    assert not breaker.allow_request()
+    assert breaker.stats()['short_circuited'] == 1
@@ -0,0 +1,70 @@
+"""
+Tests for the response cache and the LRU/TTL cache underneath it
+"""
+
+from src.bot.response_cache import ResponseCache, content_words, word_order_similarity
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts():
+    clock = FakeClock()
+    evicted = []
+    cache = TTLCache(maxsize=2, ttl=10, on_evict=lambda k, v: evicted.append(k), timer=clock)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)  # 'b' is least recently used
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    clock.now = 11
+    assert cache.get('a') is None
+    assert evicted == ['b', 'a']
+
+
+def test_exact_match_ignores_case_and_punctuation():
+    cache = ResponseCache()
+    cache.set("What skills do I need for data science?", "Python, statistics and SQL.")
+
+    assert cache.get("what skills do i need for DATA SCIENCE") == "Python, statistics and SQL."
+    assert cache.stats()['exact_hits'] == 1
+
+
+def test_paraphrase_hits_semantic_layer():
+    cache = ResponseCache(similarity_threshold=0.8)
+    cache.set("What skills do I need for data science?", "Python, statistics and SQL.")
+    cache.set("How do I become a UX designer?", "Build a portfolio.")
+
+    assert cache.get("Which skills are needed for data science") == "Python, statistics and SQL."
+    assert cache.get("What skills do I need for web development?") is None
+
+    stats = cache.stats()
+    assert stats['semantic_hits'] == 1
+    assert stats['misses'] == 1
+
+
+def test_reordered_question_is_not_a_paraphrase():
+    cache = ResponseCache(similarity_threshold=0.8)
+    cache.set("Should I move from data science to web dev?", "Start with JavaScript.")
+
+    assert cache.get("should I move from web dev to data science") is None
+    assert cache.get("Should I move from data science to web dev now?") == "Start with JavaScript."
+    assert word_order_similarity(content_words("move from data science to web dev"), content_words("move from web dev to data science")) == 4 / 6
+
+
+def test_evicted_entries_leave_the_index():
+    cache = ResponseCache(maxsize=1)
+    cache.set("data science skills", "Python")
+    cache.set("ux designer portfolio", "Figma")
+
+    assert cache.get("data science skills") is None
+    assert cache.get("ux designer portfolio") == "Figma"
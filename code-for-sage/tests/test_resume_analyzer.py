@@ -0,0 +1,75 @@
+"""
+Tests for single-pass resume analysis
+"""
+
+import asyncio
+import json
+
+from src.bot.resume_analyzer import ResumeAnalyzer
+from src.bot.skill_dictionary import SkillDictionary
+
+RESUME = """
+Jane Doe - Backend Developer
+Senior engineer with 6+ years of experience building APIs in Python and Node.js.
+Led the migration to microservices on AWS; reduced latency by 40%.
+Designed CI/CD pipelines and mentored juniors. Built dashboards with SQL, R and Go.
+Skills: nodejs, machine learning, scikit-learn, react.js, going places, agile, Agile.
+"""
+
+
+def _analyzer(tmp_path, verbs, keywords):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({'action_verbs': verbs, 'industry_keywords': keywords}))
+    return ResumeAnalyzer(skills=SkillDictionary.from_file('data/skills/dictionary.json'), lexicon_path=str(path))
+
+
+def test_scan_finds_the_same_skills_as_the_dictionary(tmp_path):
+    analyzer = _analyzer(tmp_path, [], [])
+    texts = [RESUME, "go to the r&d lab", "GO, R and C++ or C# with .NET", "Node JS / react-js / UI/UX design"]
+
+    for text in texts:
+        assert analyzer._extract_skills(text) == analyzer.skills.find_in_text(text)
+
+
+def test_analysis_collects_verbs_keywords_and_experience(tmp_path):
+    analyzer = _analyzer(tmp_path, ["Led", "designed", "built", "mentored", "reduced", "shipped"], ["agile", "microservices", "ci/cd"])
+
+    analysis = asyncio.run(analyzer.analyze_resume(RESUME, target_role="Backend Developer"))
+
+    assert analysis.action_verbs == ["led", "designed", "built", "mentored", "reduced"]
+    assert analysis.keyword_density == {
+        'microservices': 100 / len(RESUME.split()),
+        'ci/cd': 100 / len(RESUME.split()),
+        'agile': 200 / len(RESUME.split())
+    }
+    assert analysis.experience_level == "senior"
+    assert analysis.improvement_suggestions == []
+    assert set(analysis.skill_gaps) == {'matched_skills', 'missing_skills'}
+    assert 'python' in [skill.lower() for skill in analysis.skill_gaps['matched_skills']]
+    assert asyncio.run(analyzer.analyze_resume("Shipped things", "Astronaut")).skill_gaps == {}
+
+
+def test_years_of_experience():
+    analyzer = ResumeAnalyzer(skills=SkillDictionary())
+
+    assert analyzer._extract_years_experience("3 yrs of Java, 1.5 years of Go") == 3
+    assert analyzer._extract_years_experience("Acme 2015 - 2018\nInitech 2019 – 2020") == 5
+    assert analyzer._determine_experience_level("No dates here") == "entry"
+
+
+def test_one_automaton_pass_however_large_the_lexicons(tmp_path):
+    small = _analyzer(tmp_path, ["led"], ["agile"])
+    large = _analyzer(
+        tmp_path,
+        ["led"] + [f"verb{i}ed" for i in range(5000)],
+        ["agile"] + [f"keyword {i}" for i in range(5000)]
+    )
+    text = RESUME * 20
+    passes = []
+    iter_matches = large.lexicon.automaton.iter_matches
+    large.lexicon.automaton.iter_matches = lambda text: passes.append(text) or iter_matches(text)
+
+    scan = large._scan(text)
+
+    assert len(passes) == 1
+    assert scan == small._scan(text)
@@ -0,0 +1,126 @@
+"""
+Tests for indexed role matching
+"""
+
+import asyncio
+import random
+
+import numpy as np
+
+from src.batch.build_skill_similarity import build_similarity_table
+from src.bot.role_recommender import MIN_MATCH_SCORE, RoleIndex, RoleRecommender
+from src.bot.skill_dictionary import SkillDictionary
+from src.bot.skill_similarity import SkillSimilarity
+
+SKILLS = [f"skill{i}" for i in range(400)] + ["python", "python django", "sql", "java", "javascript"]
+FIELDS = [f"field{i}" for i in range(40)]
+
+
+def _taxonomy(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    return {
+        f"Role {i}": {
+            'required_skills': rng.sample(SKILLS, rng.randint(3, 8)),
+            'related_fields': rng.sample(FIELDS, rng.randint(1, 4))
+        }
+        for i in range(size)
+    }
+
+
+def _recommender(roles_data, similarity=None):
+    recommender = RoleRecommender(skills=SkillDictionary(), similarity=similarity or SkillSimilarity())
+    recommender.roles_data = roles_data
+    recommender.index = RoleIndex(roles_data, recommender.skills, recommender.similarity)
+    return recommender
+
+
+def _brute_force(recommender, user_skills, interests, k=5):
+    matches = []
+    for role, details in recommender.roles_data.items():
+        score = recommender._calculate_match_score(user_skills, interests, details)
+        if score > MIN_MATCH_SCORE:
+            matches.append((role, score))
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return matches[:k]
+
+
+def test_indexed_matching_equals_scoring_every_role():
+    recommender = _recommender(_taxonomy(2000))
+    rng = random.Random(11)
+
+    for _ in range(50):
+        user_skills = rng.sample(SKILLS, rng.randint(1, 6)) + ["Python Django"]
+        interests = rng.sample(FIELDS, rng.randint(0, 3))
+        result = asyncio.run(recommender.get_role_recommendations(user_skills, interests, 'entry'))
+
+        assert [(match['role'], match['match_score']) for match in result] == _brute_force(recommender, user_skills, interests)
+
+
+def test_partial_matches_count_for_contained_skill_names():
+    recommender = _recommender({
+        'Backend': {'required_skills': ['python', 'sql'], 'related_fields': ['web']},
+        'Data': {'required_skills': ['sql'], 'related_fields': ['data']}
+    })
+
+    result = asyncio.run(recommender.get_role_recommendations(['python django'], ['web'], 'entry'))
+
+    assert [match['role'] for match in result] == ['Backend']
+    assert result[0]['match_score'] == 0.5 * 0.6 + 0.4
+    assert result[0]['skill_gaps'] == ['python', 'sql']
+
+
+def test_large_taxonomy_only_scores_roles_sharing_a_skill():
+    recommender = _recommender(_taxonomy(20000))
+    index = recommender.index
+    user_skills = ['python', 'sql', 'skill1', 'skill2']
+    known_ids, unknown_skills = recommender.skills.split_known(user_skills)
+
+    scores = index.scores(frozenset(known_ids), ['field1'], recommender.skill_weights, unknown_skills)
+    sharing = {
+        position for position, role in enumerate(index.titles)
+        if any(required.lower() in skill for required in index.roles_data[role]['required_skills'] for skill in user_skills)
+    }
+
+    assert set(scores) == sharing
+    assert len(sharing) < len(index) / 10
+    result = asyncio.run(recommender.get_role_recommendations(user_skills, ['field1'], 'entry'))
+    assert {index.titles[position] for position in sharing} >= {match['role'] for match in result}
+
+
+def _similarity_file(tmp_path, documents):
+    path = tmp_path / "related.npz"
+    table = build_similarity_table(documents, neighbors=3, min_similarity=0.2)
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, **table)
+    return str(path), table
+
+
+def test_similarity_table_is_compact_and_loads_as_neighbors(tmp_path):
+    documents = [["react", "javascript", "css"], ["react", "javascript"], ["vue", "javascript", "css"], ["sql", "excel"]]
+    path, table = _similarity_file(tmp_path, documents)
+    skills = SkillDictionary()
+
+    similarity = SkillSimilarity.from_file(path, skills)
+
+    assert table['neighbors'].dtype == np.int16 and table['scores'].dtype == np.float16
+    assert set(similarity.neighbors(skills.intern("react"))) == skills.ids(["javascript", "css"])
+    assert similarity.similarity(skills.intern("react"), skills.intern("javascript")) > 0.5
+    assert similarity.similarity(skills.intern("react"), skills.intern("sql")) == 0.0
+    assert len(SkillSimilarity.from_file(str(tmp_path / "missing.npz"), skills)) == 0
+
+
+def test_related_skills_use_the_related_match_weight(tmp_path):
+    path, _ = _similarity_file(tmp_path, [["react", "javascript"], ["react", "javascript", "html"]])
+    roles_data = {
+        'Frontend': {'required_skills': ['React', 'HTML'], 'related_fields': ['web']},
+        'Backend': {'required_skills': ['SQL'], 'related_fields': ['web']}
+    }
+    recommender = _recommender(roles_data)
+    recommender.similarity = SkillSimilarity.from_file(path, recommender.skills)
+    recommender.index = RoleIndex(roles_data, recommender.skills, recommender.similarity)
+
+    result = asyncio.run(recommender.get_role_recommendations(['JavaScript'], ['web'], 'entry'))
+
+    assert [match['role'] for match in result] == ['Frontend']
+    assert result[0]['match_score'] == recommender.skill_weights['related_match'] * 0.6 + 0.4
+    assert result[0]['match_score'] == recommender._calculate_match_score(['JavaScript'], ['web'], roles_data['Frontend'])
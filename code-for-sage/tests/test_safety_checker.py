@@ -0,0 +1,93 @@
+"""
+Tests for SafetyChecker's content filter
+"""
+
+import json
+import os
+import time
+
+from src.bot.moderation_lexicon import AhoCorasick, ModerationLexicon
+from src.bot.safety_checker import SafetyChecker
+
+TEXT = (
+    "Call me at 555-123-4567 or read https://example.com/careers/data-science "
+    "before the interview. No hate please, just explicit goals."
+)
+
+
+def test_filter_content_replaces_every_pattern_in_one_pass():
+    result = SafetyChecker().filter_content(TEXT)
+
+    assert not result.is_safe
+    assert len(result.issues) == 3
+    assert result.filtered_content == (
+        "Call me at [no-phone-numbers] or read [no-urls] "
+        "before the interview. No [filtered] please, just [filtered] goals."
+    )
+
+
+def test_pattern_changes_are_picked_up():
+    checker = SafetyChecker()
+    checker.filter_content(TEXT)
+    checker.filtered_patterns.append((r'\binterview\b', '[meeting]'))
+
+    assert "[meeting]" in checker.filter_content(TEXT).filtered_content
+
+
+def test_streaming_filter_matches_whole_text_filter_for_any_chunking():
+    checker = SafetyChecker()
+    expected = checker.filter_content(TEXT)
+
+    for size in (1, 3, 7, 20):
+        stream_filter = checker.stream_filter(holdback=16)
+        output = []
+        for start in range(0, len(TEXT), size):
+            chunk = stream_filter.feed(TEXT[start:start + size])
+            # Never hold back more than one token plus the holdback window
+            assert len(stream_filter.buffer) <= stream_filter.max_buffer
+            output.append(chunk)
+        output.append(stream_filter.flush())
+
+        assert "".join(output) == expected.filtered_content
+        assert sorted(stream_filter.issues) == sorted(expected.issues)
+
+
+def test_lexicon_reports_categories_and_prefers_longest_term(tmp_path):
+    lexicon_file = tmp_path / "lexicon.txt"
+    lexicon_file.write_text(
+        "# category<TAB>term\n"
+        "harassment\tidiot\n"
+        "hate_speech\thate speech\n"
+        "self_harm\thurt myself\n"
+    )
+    checker = SafetyChecker(lexicon=ModerationLexicon(str(lexicon_file)))
+
+    result = checker.filter_content("Is Hate Speech ok? My boss is an idiot. Idiotic, really.")
+
+    assert result.filtered_content == "Is [filtered] ok? My boss is an [filtered]. Idiotic, really."
+    assert result.issues == [
+        "Matched moderation category: hate_speech",
+        "Matched moderation category: harassment"
+    ]
+    assert checker.moderate("I want to hurt myself").issues == ["Matched moderation category: self_harm"]
+    assert checker.moderate("How do I get into data science?").is_safe
+
+
+def test_lexicon_is_hot_swapped_when_the_file_changes(tmp_path):
+    lexicon_file = tmp_path / "lexicon.json"
+    lexicon_file.write_text(json.dumps({"scam": ["wire me money"]}))
+    lexicon = ModerationLexicon(str(lexicon_file), check_interval=0)
+    assert lexicon.find("please wire me money")[0][2] == "scam"
+
+    lexicon_file.write_text(json.dumps({"spam": ["buy followers", "cheap likes"]}))
+    os.utime(lexicon_file, (time.time() + 10, time.time() + 10))
+
+    assert lexicon.find("please wire me money") == []
+    assert lexicon.find("cheap likes here") == [(0, 11, "spam")]
+    assert lexicon.size == 2
+
+
+def test_aho_corasick_finds_overlapping_terms():
+    automaton = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+
+    assert sorted(automaton.iter_matches("ushers")) == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
@@ -0,0 +1,103 @@
+"""
+Tests for the skill dictionary and the matchers that use it
+"""
+
+import asyncio
+
+from src.bot.course_recommender import CourseRecommender, JobMatchLevel
+from src.bot.integrations.linkedin_handler import LinkedInDataHandler
+from src.bot.role_recommender import RoleRecommender
+from src.bot.skill_dictionary import SkillDictionary
+
+ENTRIES = {
+    "javascript": {"category": "programming", "aliases": ["js", "java script"]},
+    "node.js": {"category": "web", "aliases": ["node", "nodejs"]},
+    "python": {"category": "programming", "aliases": ["py"]},
+    "artificial intelligence": {"category": "data", "aliases": ["ai"]},
+    "go": {"category": "programming", "aliases": ["golang"]}
+}
+
+
+def test_aliases_and_spellings_share_one_id():
+    skills = SkillDictionary(ENTRIES)
+
+    assert {skills.intern(s) for s in ("JS", "javascript", "Java Script", "java-script")} == {skills.intern("JavaScript")}
+    assert skills.canonical("NodeJS") == skills.canonical("Node.js") == "node.js"
+    assert skills.category("py") == "programming"
+    assert skills.parse_list("Python, js , JavaScript,, Underwater  Basket Weaving") == [
+        "python", "javascript", "underwater basket weaving"
+    ]
+
+
+def test_unknown_skills_are_interned_once():
+    skills = SkillDictionary(ENTRIES)
+    known = len(skills)
+
+    first = skills.intern("Quantum Knitting")
+    assert skills.intern("quantum  knitting") == first
+    assert skills.lookup("Quantum-Knitting") == first
+    assert skills.lookup("never seen") is None
+    assert len(skills) == known + 1 == skills.known_count + 1
+
+
+def test_request_input_never_grows_the_dictionary():
+    skills = SkillDictionary(ENTRIES)
+    recommender = CourseRecommender(skills=skills)
+    roles = RoleRecommender(skills=skills)
+    known = len(skills)
+    user_skills = [f"made up skill {i}" for i in range(100)] + ["js"]
+
+    asyncio.run(recommender.get_career_roadmap(user_skills, {'title': 'Web Dev', 'required_skills': ['Rust', 'JS']}, 10))
+    asyncio.run(recommender.match_jobs_to_skills(user_skills, [{'title': 'Web Dev', 'required_skills': ['JavaScript']}]))
+    asyncio.run(roles.get_role_recommendations(user_skills, ['web'], 'entry'))
+    skills.parse_list("Python, Basket Weaving")
+
+    assert len(skills) == known
+    assert skills.lookup("made up skill 1") is None and skills.lookup("rust") is None
+    assert skills.split_known(["JS", "Made-Up  Skill", "made-up skill"]) == ({skills.lookup("js")}, ["made-up skill"])
+
+
+def test_find_in_text_treats_short_words_as_acronyms():
+    skills = SkillDictionary(ENTRIES)
+
+    found = skills.find_in_text("Built APIs in Node JS and Python 3; AI team. Go to R&D, py-curious, go home.")
+
+    assert found == ["node.js", "python", "artificial intelligence"]
+
+
+def test_matchers_agree_on_aliases():
+    skills = SkillDictionary(ENTRIES)
+    recommender = CourseRecommender(skills=skills)
+    jobs = [{'title': 'Web Dev', 'company': 'Acme', 'required_skills': ['JavaScript', 'Node.js']}]
+
+    match = recommender._calculate_job_match(['js', 'NodeJS'], jobs[0]['required_skills'], JobMatchLevel.INTERMEDIATE)
+    assert match['match_percentage'] == 100.0
+    assert match['missing_skills'] == []
+
+    matched = asyncio.run(recommender.match_jobs_to_skills(['Java Script', 'nodejs'], jobs, JobMatchLevel.INTERMEDIATE))
+    assert matched['matched_jobs'][0]['match_score']['matching_skills'] == ['javascript', 'node.js']
+
+    roles = RoleRecommender(skills=skills)
+    assert roles._identify_skill_gaps(['JS'], ['JavaScript', 'Python']) == ['Python']
+    score = roles._calculate_match_score(['js', 'py'], [], {'required_skills': ['JavaScript', 'Python'], 'related_fields': ['web']})
+    assert score == 2 * roles.skill_weights['exact_match'] * 0.6
+
+
+def test_linkedin_jobs_are_processed_with_canonical_skills():
+    handler = LinkedInDataHandler(skills=SkillDictionary(ENTRIES))
+    jobs = [
+        {'id': '1', 'title': 'Backend', 'company': 'Acme', 'location': 'Remote',
+         'description': 'Python services with some Golang', 'required_skills': ['py'], 'salary': '$100K-$150K'},
+        {'id': '2', 'title': 'Frontend', 'company': 'Acme', 'location': 'NYC',
+         'description': 'React and JS', 'salary': '$90,000'},
+        {'id': '3', 'title': 'Broken', 'company': 'Nope'}
+    ]
+
+    result = asyncio.run(handler.process_scraped_data(jobs))
+
+    data = result['data']
+    assert result['metrics']['status'] == 'partial'
+    assert data['jobs'][0]['required_skills'] == ['python', 'go']
+    assert data['skills'] == {'python': 1, 'go': 1, 'javascript': 1}
+    assert data['companies'] == {'Acme': 2}
+    assert data['salary_ranges'] == {'min': 90000.0, 'max': 150000.0, 'average': 107500.0, 'count': 2}
@@ -0,0 +1,51 @@
+"""
+Tests for the skill prerequisite graph and learning order
+"""
+
+import pytest
+
+from src.bot.course_recommender import CourseRecommender
+from src.bot.skill_dictionary import SkillDictionary
+from src.bot.skill_graph import SkillGraph
+
+PREREQUISITES = {
+    "machine learning": ["python", "statistics"],
+    "deep learning": ["machine learning"],
+    "statistics": ["excel"]
+}
+
+
+def test_closure_includes_indirect_prerequisites():
+    skills = SkillDictionary({"python": {"aliases": ["py"]}})
+    graph = SkillGraph(PREREQUISITES, skills)
+
+    assert graph.prerequisites_of("Deep Learning") == skills.ids(["machine learning", "py", "statistics", "excel"])
+    assert graph.prerequisites_of("python") == frozenset()
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError):
+        SkillGraph({"a": ["b"], "b": ["c"], "c": ["a"]}, SkillDictionary())
+
+
+def test_learning_order_respects_prerequisites_then_duration():
+    graph = SkillGraph(PREREQUISITES, SkillDictionary())
+    durations = {"deep learning": 2, "excel": 6, "python": 4, "git": 1, "machine learning": 3}
+
+    # statistics is not missing, but excel still has to come before deep learning through it
+    assert graph.learning_order(durations) == ["git", "python", "excel", "machine learning", "deep learning"]
+
+    graph.learning_order(dict(reversed(list(durations.items()))))
+    assert graph._ordered_names.cache_info().hits == 1
+
+
+def test_roadmap_timeline_uses_the_graph():
+    skills = SkillDictionary({"machine learning": {"aliases": ["ml"]}})
+    recommender = CourseRecommender(skills=skills, skill_graph=SkillGraph(PREREQUISITES, skills))
+
+    timeline = recommender._estimate_skill_acquisition_time(["ML", "Python", "Docker"])
+
+    assert timeline['total_weeks'] == 6 + 4 + 4
+    assert timeline['skill_breakdown']["ML"]['category'] == 'data_science'
+    assert [step['skill'] for step in timeline['recommended_order']] == ["Docker", "Python", "ML"]
+    assert timeline['recommended_order'][2]['prerequisites'] == ["Python"]
@@ -0,0 +1,41 @@
+"""
+Startup check: building the app must not construct services, call the
+network, or import heavy client libraries.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+STARTUP_SCRIPT = """
+import json, sys
+import src.app as sage_app
+sage_app.init_db = lambda app: None  # keep the check off the database file
+app = sage_app.create_app()
+from src.services import registry
+print(json.dumps({
+    'created': registry.created(),
+    'heavy_modules': [m for m in ('openai', 'aiohttp', 'plotly', 'pandas', 'sklearn') if m in sys.modules]
+}))
+"""
+
+
+def test_app_startup_is_lazy():
+    env = dict(os.environ, OPENAI_API_KEY='test-key', FLASK_ENV='testing')
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT],
+        cwd=project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report['created'] == []
+    assert report['heavy_modules'] == []
@@ -0,0 +1,96 @@
+"""
+Tests for the weekly study schedule optimizer
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.course_recommender import CourseRecommender
+from src.utils.time_calculator import (
+    _preferred_windows,
+    generate_weekly_schedule,
+    optimize_schedules,
+    optimize_weekly_schedule,
+    parse_busy_interval
+)
+
+
+def _minutes(clock: str) -> int:
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def test_parse_busy_interval():
+    assert parse_busy_interval("Mon-Wed 6pm-8:30pm class") == [(0, 1080, 1230), (1, 1080, 1230), (2, 1080, 1230)]
+    assert parse_busy_interval("Sat, Sun 10:00-12:00") == [(5, 600, 720), (6, 600, 720)]
+    assert parse_busy_interval("Fri 22:00-02:00") == [(4, 1320, 1440), (5, 0, 120)]
+    assert len(parse_busy_interval("weekdays 9:00-17:00 work")) == 5
+
+
+def test_parse_busy_interval_reads_short_day_ranges_as_pm():
+    assert parse_busy_interval("Weekdays 9-5 work") == [(day, 540, 1020) for day in range(5)]
+    assert parse_busy_interval("Sat 11:30-1") == [(5, 690, 780)]
+    for text in ["Mon 9am-5", "Tue 10-2am", "Wed 9-0"]:
+        with pytest.raises(ValueError):
+            parse_busy_interval(text)
+
+
+def test_blocks_avoid_commitments_and_prefer_peak_hours():
+    busy = ["Weekdays 9:00-17:00", "Mon-Thu 18:00-20:00", (5, "06:00", "23:00")]
+    plan = optimize_weekly_schedule(12, busy, preferred_times=['evening'])
+
+    assert plan['complete'] and plan['scheduled_hours'] == 12
+    assert plan['preferred_share'] >= 0.5
+    assert not any(block['day'] == 'Saturday' for block in plan['blocks'])
+    for block in plan['blocks']:
+        start, end = _minutes(block['start']), _minutes(block['end'])
+        assert 30 <= block['minutes'] <= 120 and end - start == block['minutes']
+        if block['day'] in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'):
+            assert end <= 9 * 60 or start >= 17 * 60
+        if block['day'] in ('Monday', 'Tuesday', 'Wednesday', 'Thursday'):
+            assert end <= 18 * 60 or start >= 20 * 60
+    assert max(plan['daily_distribution']) <= 4
+
+
+def test_step_cap_truncates_the_same_way_every_time():
+    busy = ["Weekdays 9:00-17:00", "Mon-Thu 18:00-20:00"]
+    plans = [optimize_weekly_schedule(12, busy, max_steps=5) for _ in range(3)]
+
+    assert all(plan == plans[0] for plan in plans)
+    assert plans[0]['truncated'] and not plans[0]['complete']
+    assert len(plans[0]['blocks']) == 5
+    assert not optimize_weekly_schedule(12, busy)['truncated']
+
+
+def test_overbooked_week_reports_unscheduled_hours():
+    plan = optimize_weekly_schedule(10, ["Daily 6:00-22:00"])
+
+    assert not plan['complete']
+    assert plan['scheduled_hours'] == 7
+    assert plan['unscheduled_hours'] == 3
+
+
+def test_batch_solving_shares_preferred_windows():
+    requests = [
+        {'available_hours': 2 + i % 15, 'busy_intervals': ["Weekdays 9:00-17:00", f"Sat {8 + i % 6}:00-14:00"]}
+        for i in range(1000)
+    ] + [{'available_hours': 5, 'busy_intervals': ["whenever"]}]
+    _preferred_windows.cache_clear()
+
+    plans = optimize_schedules(requests, preferred_times=['morning', 'evening'])
+
+    assert _preferred_windows.cache_info().misses == 1
+    assert all(plan['complete'] and not plan['truncated'] for plan in plans[:-1])
+    assert 'error' in plans[-1]
+
+
+def test_schedule_analysis_uses_commitments():
+    analysis = asyncio.run(CourseRecommender().analyze_user_schedule(
+        6, 'moderate', ["Weekdays 8:00-18:00 work", "gym sometimes"], ['evening']
+    ))
+
+    assert analysis['weekly_schedule']['complete']
+    assert analysis['unrecognized_commitments'] == ["gym sometimes"]
+    assert "Weekdays 9:00-17:00" in analysis['suggestions']
+    assert generate_weekly_schedule(6)['weekly_structure']['Monday']['blocks'] == ['06:00-08:00']
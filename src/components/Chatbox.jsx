@@ -36,10 +36,12 @@ function Chatbox() {
     setIsLoading(true);
 
     try {
-        const response = await fetch(import.meta.env.VITE_API_URL || 'http://localhost:5000/api/sage/chat', {
+        const chatUrl = import.meta.env.VITE_API_URL || 'http://localhost:5000/api/sage/chat';
+        const response = await fetch(`${chatUrl}/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
             },
             body: JSON.stringify({ message: newMessage }),
         });
@@ -51,13 +53,43 @@ function Chatbox() {
             throw new Error(errorMessage);
         }
 
-        const data = await response.json();
-        
-        // Add Sage's response
-        setMessages(prev => [...prev, { 
-            text: data.response, 
-            sender: 'sage' 
-        }]);
+        // Read Server-Sent Events and grow Sage's reply as deltas arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let started = false;
+
+        const appendDelta = (delta) => {
+            if (!started) {
+                started = true;
+                setIsLoading(false);
+                setMessages(prev => [...prev, { text: delta, sender: 'sage' }]);
+                return;
+            }
+            setMessages(prev => {
+                const updated = [...prev];
+                const last = updated[updated.length - 1];
+                updated[updated.length - 1] = { ...last, text: last.text + delta };
+                return updated;
+            });
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            for (const frame of frames) {
+                const dataLine = frame.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+                const payload = JSON.parse(dataLine.slice(6));
+                if (payload.delta) {
+                    appendDelta(payload.delta);
+                }
+            }
+        }
 
     } catch (error) {
         console.error('Chat error:', error);